@@ -0,0 +1,191 @@
+"""Latency, memory and startup benchmark for the dashboard callbacks.
+
+Generates synthetic data (gen_dashboard_data.py) for each requested size,
+then imports dashboard.py in a fresh process per size and replays a fixed
+set of filter combinations through the callbacks with the result cache
+disabled, i.e. the server work of one uncached filter change.
+
+    python pdf-assistant-ui/bench/bench_dashboard.py --rows 10000,100000,1000000
+    python pdf-assistant-ui/bench/bench_dashboard.py --check        # compare to the baseline
+    python pdf-assistant-ui/bench/bench_dashboard.py --save-baseline
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+UI_DIR = BENCH_DIR.parent / "ui"
+BASELINE = BENCH_DIR / "baseline_dashboard.json"
+# metric -> higher is worse; compared against the baseline with --tolerance
+CHECKED = ["callback_p50_ms", "callback_p95_ms", "startup_s", "peak_rss_mb"]
+
+
+def _pct(xs: list[float], p: float) -> float:
+    xs = sorted(xs)
+    return xs[min(len(xs) - 1, int(round(p / 100 * (len(xs) - 1))))]
+
+def _peak_rss_mb() -> float:
+    # VmHWM belongs to this process image; ru_maxrss would carry over the parent's peak across exec
+    try:
+        with open("/proc/self/status") as fh:
+            for line in fh:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+# ==================== Child: one dataset, one fresh process ====================
+def _combos(D, per_year_names: int = 4) -> list[tuple]:
+    """Representative filters: every year unfiltered, per region, a few people and RIZIV numbers."""
+    out = []
+    for year in sorted(int(y) for y in D.df["year"].unique()):
+        out.append((year, "Alle", "Alle", "Alle"))
+        regions = [o["value"] for o in D.filter_options("region", year)[0][1:]]
+        out += [(year, r, "Alle", "Alle") for r in regions]
+        names = [o["value"] for o in D.filter_options("name", year, "Alle")[0][1:]]
+        for name in names[:: max(1, len(names) // per_year_names)][:per_year_names]:
+            out.append((year, "Alle", name, "Alle"))
+            rizivs = [o["value"] for o in D.filter_options("riziv", year, "Alle", name)[0][1:]]
+            if rizivs:
+                out.append((year, "Alle", "Alle", rizivs[0]))
+    return out
+
+def run_child(iterations: int) -> dict:
+    sys.path.insert(0, str(UI_DIR))
+    t0 = time.perf_counter()
+    import dashboard as D
+    from dashboard_cache import clear_result_cache
+    startup = time.perf_counter() - t0
+
+    combos = _combos(D)
+    traces = {c: D.monthly_traces(D.summarize(*c)) for c in combos}
+    callback, filter_df = [], []
+    for _ in range(iterations):
+        for c in combos:
+            clear_result_cache()
+            t = time.perf_counter()
+            D.update_kpis(*c)
+            D.update_monthly(*c, traces[c])
+            D.update_comparison(*c)
+            D.update_breakdowns(*c)
+            callback.append(time.perf_counter() - t)
+            t = time.perf_counter()
+            D.filter_df(*c)
+            filter_df.append(time.perf_counter() - t)
+    return {
+        "rows": len(D.df),
+        "combos": len(combos),
+        "samples": len(callback),
+        "startup_s": round(startup, 3),
+        "callback_p50_ms": round(_pct(callback, 50) * 1000, 2),
+        "callback_p95_ms": round(_pct(callback, 95) * 1000, 2),
+        "callback_mean_ms": round(statistics.mean(callback) * 1000, 2),
+        "filter_df_p95_ms": round(_pct(filter_df, 95) * 1000, 2),
+        "peak_rss_mb": round(_peak_rss_mb(), 1),
+    }
+
+
+# ==================== Parent ====================
+def _dataset(data_dir: Path, rows: int, regions: int, psychologists: int) -> tuple[Path, Path]:
+    sys.path.insert(0, str(BENCH_DIR))
+    from gen_dashboard_data import generate
+    out = data_dir / f"rows-{rows}-r{regions}-p{psychologists}"
+    ts, ag = out / "epz_timesheet_demo.csv", out / "epz_agreed_hours.csv"
+    if not (ts.exists() and ag.exists()):
+        generate(out, rows, regions=regions, psychologists=psychologists)
+    return ts, ag
+
+def _run(ts: Path, ag: Path, iterations: int, data_format: str) -> dict:
+    env = {**os.environ,
+           "DASH_TIMESHEET_CSV": str(ts), "DASH_AGREED_CSV": str(ag),
+           "DASH_CACHE_DIR": "", "DASH_REFRESH_S": "1e9",
+           "DASH_PARQUET": "1" if data_format == "parquet" else "0",
+           "DASH_ARROW_MMAP": "1" if data_format == "arrow" else "0"}
+    out = subprocess.run([sys.executable, __file__, "--child", "--iterations", str(iterations)],
+                         env=env, cwd=UI_DIR, check=True, capture_output=True, text=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+def bench(sizes: list[int], iterations: int, data_format: str, data_dir: Path,
+          regions: int, psychologists: int) -> dict:
+    results = {}
+    for rows in sizes:
+        ts, ag = _dataset(data_dir, rows, regions, psychologists)
+        for side in (".parquet", ".arrow"):
+            ts.with_suffix(side).unlink(missing_ok=True)
+        cold = _run(ts, ag, 1, data_format)       # includes the one-off sidecar conversion
+        r = _run(ts, ag, iterations, data_format)
+        r["cold_startup_s"] = cold["startup_s"]
+        results[str(rows)] = r
+    return results
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    bad = []
+    for rows, r in results.items():
+        base = baseline.get("results", {}).get(rows)
+        if not base:
+            continue
+        for k in CHECKED:
+            if k in base and r[k] > base[k] * (1 + tolerance):
+                bad.append(f"{rows} rows: {k} {r[k]} > baseline {base[k]} (+{tolerance:.0%})")
+    return bad
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--rows", default="10000,100000", help="comma separated dataset sizes")
+    ap.add_argument("--iterations", type=int, default=5, help="passes over the filter combinations")
+    ap.add_argument("--format", choices=["parquet", "arrow", "csv"], default="parquet")
+    ap.add_argument("--regions", type=int, default=12)
+    ap.add_argument("--psychologists", type=int, default=400)
+    ap.add_argument("--data-dir", type=Path, default=Path(tempfile.gettempdir()) / "epz-bench")
+    ap.add_argument("--baseline", type=Path, default=BASELINE)
+    ap.add_argument("--save-baseline", action="store_true")
+    ap.add_argument("--check", action="store_true", help="exit 1 when a metric regressed")
+    ap.add_argument("--tolerance", type=float, default=0.25)
+    ap.add_argument("--json", action="store_true", help="print a single JSON line")
+    ap.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.child:
+        print(json.dumps(run_child(args.iterations)))
+        return 0
+
+    sizes = [int(x) for x in args.rows.split(",") if x.strip()]
+    results = bench(sizes, args.iterations, args.format, args.data_dir, args.regions, args.psychologists)
+    if args.json:
+        print(json.dumps(results))
+    else:
+        cols = ["startup_s", "cold_startup_s", "callback_p50_ms", "callback_p95_ms", "filter_df_p95_ms", "peak_rss_mb"]
+        print(f"{'rows':>10} " + " ".join(f"{c:>16}" for c in cols))
+        for rows, r in results.items():
+            print(f"{rows:>10} " + " ".join(f"{r[c]:>16}" for c in cols))
+
+    if args.save_baseline:
+        meta = {"python": platform.python_version(), "machine": platform.machine(),
+                "cpus": os.cpu_count(), "format": args.format, "iterations": args.iterations,
+                "regions": args.regions, "psychologists": args.psychologists}
+        args.baseline.write_text(json.dumps({"meta": meta, "results": results}, indent=2) + "\n")
+        print(f"saved {args.baseline}")
+        return 0
+    if args.baseline.exists():
+        bad = compare(results, json.loads(args.baseline.read_text()), args.tolerance)
+        for line in bad:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        if bad and args.check:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,73 @@
+"""Per-rerun cost of the Streamlit UI script.
+
+Drives userinterface.py headlessly with streamlit's AppTest and times
+repeated reruns of one session that already has a processed document,
+i.e. the work Streamlit does on every widget interaction.
+
+    python pdf-assistant-ui/bench/bench_rerun.py --runs 200
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+UI_DIR = Path(__file__).resolve().parents[1] / "ui"
+
+
+def _pct(xs: list[float], p: float) -> float:
+    xs = sorted(xs)
+    return xs[min(len(xs) - 1, int(round(p / 100 * (len(xs) - 1))))]
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--runs", type=int, default=100)
+    ap.add_argument("--warmup", type=int, default=5)
+    ap.add_argument("--json", action="store_true", help="print a single JSON line")
+    args = ap.parse_args()
+
+    os.chdir(UI_DIR)
+    sys.path.insert(0, str(UI_DIR))
+    os.environ.setdefault("API_BASE_URL", "http://127.0.0.1:9")  # no backend needed for a plain rerun
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file("userinterface.py", default_timeout=60)
+    at.session_state["public_user_id"] = "bench-user"
+    at.session_state["doc_id"] = "bench-doc"
+    at.session_state["processed_name"] = "bench.pdf"
+    at.session_state["can_query_right"] = True
+    at.session_state["can_upload_right"] = True
+
+    for _ in range(args.warmup):
+        at.run()
+    if at.exception:
+        print(at.exception, file=sys.stderr)
+        return 1
+
+    wall, cpu = [], []
+    for _ in range(args.runs):
+        w0, c0 = time.perf_counter(), time.process_time()
+        at.run()
+        wall.append(time.perf_counter() - w0)
+        cpu.append(time.process_time() - c0)
+
+    out = {
+        "runs": args.runs,
+        "wall_ms_mean": round(statistics.mean(wall) * 1000, 2),
+        "wall_ms_p50": round(_pct(wall, 50) * 1000, 2),
+        "wall_ms_p95": round(_pct(wall, 95) * 1000, 2),
+        "cpu_ms_mean": round(statistics.mean(cpu) * 1000, 2),
+    }
+    if args.json:
+        print(json.dumps(out))
+    else:
+        for k, v in out.items():
+            print(f"{k:>14}: {v}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
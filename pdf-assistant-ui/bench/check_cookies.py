@@ -0,0 +1,58 @@
+"""Check that users sharing the process-wide HTTP session never share cookies.
+
+Starts mock_backend.py with --set-cookies (every response sets a cookie
+naming its X-User-Id) and makes interleaved calls as several users from
+several threads through helpers._req, as concurrent Streamlit sessions do.
+Fails when any request sent a cookie back.
+
+    python pdf-assistant-ui/bench/check_cookies.py
+"""
+import argparse
+import json
+import os
+import sys
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+UI_DIR = Path(__file__).resolve().parents[1] / "ui"
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--users", default="alice,bob,carol")
+    ap.add_argument("--calls", type=int, default=20, help="calls per user")
+    args = ap.parse_args()
+    users = [u for u in args.users.split(",") if u]
+
+    sys.path.insert(0, str(Path(__file__).resolve().parent))
+    from mock_backend import start_in_thread
+    srv, base = start_in_thread(port=0, set_cookies=True, users=args.users,
+                                query_latency="0.005", form_latency="0", keys_latency="0")
+    os.environ["API_BASE_URL"] = base
+    sys.path.insert(0, str(UI_DIR))
+    from helpers import _req
+
+    def call(i: int) -> int:
+        uid = users[i % len(users)]
+        if i % 2:
+            r = _req("POST", "/forms/submit", user_id=uid, json={"user_id": uid})
+        else:
+            r = _req("POST", "/documents/query", user_id=uid,
+                     json={"doc_id": "D1", "question": f"cookie check {i}?"})
+        return getattr(r, "status_code", 0)
+
+    with ThreadPoolExecutor(max_workers=len(users) * 2) as pool:
+        statuses = list(pool.map(call, range(args.calls * len(users))))
+    with urllib.request.urlopen(f"{base}/_mock/stats") as fh:
+        stats = json.load(fh)
+    srv.shutdown()
+
+    replayed, foreign = stats.get("cookie:replayed", 0), stats.get("cookie:foreign", 0)
+    print(f"{len(statuses)} calls as {len(users)} users ({sum(s == 200 for s in statuses)} ok): "
+          f"{replayed} sent a cookie back, {foreign} of them another user's")
+    return 1 if replayed or not all(s == 200 for s in statuses) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
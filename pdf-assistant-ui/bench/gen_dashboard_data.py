@@ -0,0 +1,97 @@
+"""Synthetic timesheet and agreed-hours data for the dashboard.
+
+Writes epz_timesheet_demo.csv and epz_agreed_hours.csv with the same
+columns as the demo files, at any scale. Psychologists belong to one
+region and have their own RIZIV number and workload; rows are in date
+order, like an append-only export.
+
+    python pdf-assistant-ui/bench/gen_dashboard_data.py --rows 1000000 --out /tmp/epz
+"""
+import argparse
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+FUNCTIONS   = ["functie1", "functie2", "functie3"]
+CARE_PLACES = ["praktijk", "online", "school", "thuis"]
+CLIENT_TYPES = ["kind", "jongere", "volwassene"]
+CHUNK_ROWS  = 1_000_000
+
+
+def _weights(n: int, rng, skew: float) -> np.ndarray:
+    w = rng.pareto(skew, n) + 1
+    return w / w.sum()
+
+def generate(out_dir: Path, rows: int, regions: int = 12, psychologists: int = 400,
+             years: int = 3, start: str = "2023-01-01", seed: int = 0) -> tuple[Path, Path]:
+    """Write both CSVs into out_dir; returns (timesheet, agreed) paths."""
+    rng = np.random.default_rng(seed)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    region_names = np.array([f"Regio {i + 1:02d}" for i in range(regions)])
+    psy_names = np.array([f"Psycholoog {i + 1:04d}" for i in range(psychologists)])
+    psy_riziv = np.array([f"{rng.integers(1, 10)}{i + 1:07d}{rng.integers(0, 100):02d}" for i in range(psychologists)])
+    psy_region = rng.choice(regions, psychologists, p=_weights(regions, rng, 3.0))
+    psy_weight = _weights(psychologists, rng, 2.5)
+    function_p = [0.5, 0.3, 0.2]
+    care_p     = [0.55, 0.25, 0.12, 0.08]
+    client_p   = [0.25, 0.35, 0.40]
+
+    start_ts = pd.Timestamp(start)
+    days = int((start_ts + pd.DateOffset(years=years) - start_ts).days)
+    timesheet = out_dir / "epz_timesheet_demo.csv"
+    header = True
+    # sessions are spread over the whole period and written in date order, chunk by chunk
+    for lo in range(0, rows, CHUNK_ROWS):
+        n = min(CHUNK_ROWS, rows - lo)
+        day0 = days * lo // rows
+        day1 = max(day0 + 1, days * (lo + n) // rows)
+        offs = np.sort(rng.integers(day0, day1, n))
+        dates = start_ts + pd.to_timedelta(offs, unit="D")
+        psy = rng.choice(psychologists, n, p=psy_weight)
+        chunk = pd.DataFrame({
+            "date": dates.strftime("%Y-%m-%d"),
+            "month": dates.month,
+            "region": region_names[psy_region[psy]],
+            "psychologist_name": psy_names[psy],
+            "riziv_number": psy_riziv[psy],
+            "function": rng.choice(FUNCTIONS, n, p=function_p),
+            "care_place": rng.choice(CARE_PLACES, n, p=care_p),
+            "client_type": rng.choice(CLIENT_TYPES, n, p=client_p),
+            "hours": rng.choice([0.5, 1.0, 1.0, 1.5, 2.0, 3.0, 4.0], n),
+        })
+        chunk.to_csv(timesheet, mode="w" if header else "a", header=header, index=False)
+        header = False
+
+    # agreed hours: roughly what each region is expected to deliver, +-20%
+    per_region = np.bincount(psy_region, weights=psy_weight, minlength=regions)
+    mean_hours = 1.86
+    agreed_rows = []
+    for y in range(start_ts.year, start_ts.year + years):
+        for r in range(regions):
+            expected = rows / years * per_region[r] * mean_hours
+            agreed_rows.append({"year": y, "region": region_names[r],
+                                "agreed_hours": int(round(expected * rng.uniform(0.8, 1.2), -1))})
+    agreed = out_dir / "epz_agreed_hours.csv"
+    pd.DataFrame(agreed_rows).to_csv(agreed, index=False)
+    return timesheet, agreed
+
+
+def main(argv: list[str]) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--rows", type=int, default=100_000, help="timesheet rows (10k to 10M)")
+    ap.add_argument("--regions", type=int, default=12)
+    ap.add_argument("--psychologists", type=int, default=400)
+    ap.add_argument("--years", type=int, default=3)
+    ap.add_argument("--start", default="2023-01-01")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--out", type=Path, required=True, help="directory for the two CSVs")
+    args = ap.parse_args(argv)
+    ts, ag = generate(args.out, args.rows, args.regions, args.psychologists, args.years, args.start, args.seed)
+    print(f"wrote {ts} ({args.rows} rows) and {ag}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,357 @@
+"""Concurrent-session load test for the Streamlit UI.
+
+Starts mock_backend.py and a headless ``streamlit run userinterface.py``,
+then drives N scripted sessions over Streamlit's own websocket protocol,
+the way N browser tabs would: start a session, upload a PDF through the
+file uploader, process it, ask a question, click a follow-up and ask it.
+Every N gets a fresh server. Reported per N:
+
+- rerun latency percentiles (all reruns, and only the UI reruns that do
+  not wait on the backend)
+- script-thread saturation: CPU cores the server process used while the
+  sessions ran, the share of 100 ms samples in which it used a full core
+  (one GIL), and the peak number of extra server threads
+- server memory per session
+
+(AppTest cannot be used here: it swaps process-global runtime state on
+every run, so concurrent AppTest sessions in one process deadlock.)
+
+    python pdf-assistant-ui/bench/load_sessions.py --sessions 1,5,10,25
+    python pdf-assistant-ui/bench/load_sessions.py --sessions 20 --think 1 --query-latency lognormal:1.5,0.6
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+import uuid
+from pathlib import Path
+
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.Common_pb2 import FileURLs, UploadedFileInfo
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from tornado.httpclient import AsyncHTTPClient
+from tornado.websocket import websocket_connect
+
+BENCH_DIR = Path(__file__).resolve().parent
+UI_DIR = BENCH_DIR.parent / "ui"
+sys.path.insert(0, str(UI_DIR))
+from i18n import I18N  # noqa: E402
+
+QUESTION = "What are the payment terms and the notice period in this agreement?"
+# steps that wait on the backend; the rest are plain UI reruns
+BACKEND_STEPS = {"start", "process", "ask", "ask_followup"}
+_FINISHED_EARLY = ForwardMsg.ScriptFinishedStatus.Value("FINISHED_EARLY_FOR_RERUN")
+_CLK_TCK = os.sysconf("SC_CLK_TCK")
+
+
+def _pct(xs: list[float], p: float) -> float:
+    xs = sorted(xs)
+    return xs[min(len(xs) - 1, int(round(p / 100 * (len(xs) - 1))))]
+
+def _labels(key: str) -> set[str]:
+    return set(I18N[key].values())
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def _wait_http(url: str, timeout: float) -> None:
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            with urllib.request.urlopen(url, timeout=2):
+                return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"{url} did not come up within {timeout:.0f}s")
+            time.sleep(0.2)
+
+
+# ==================== One browser tab ====================
+class Session:
+    """A websocket to the Streamlit server plus the widget state a browser would keep."""
+
+    def __init__(self, base: str, ws):
+        self.base = base
+        self.ws = ws
+        self.session_id = ""
+        self.widgets: dict[str, tuple[str, str, str]] = {}   # id -> (type, label, fragment_id)
+        self.values: dict[str, dict] = {}                     # id -> WidgetState fields
+        self.errors: list[str] = []
+        self._done = asyncio.Event()
+        self._file_urls: asyncio.Future | None = None
+        self._reader = asyncio.ensure_future(self._read())
+
+    @classmethod
+    async def open(cls, base: str) -> "Session":
+        ws = await websocket_connect(base.replace("http", "ws", 1) + "/_stcore/stream",
+                                     subprotocols=["streamlit"], max_message_size=64 << 20)
+        return cls(base, ws)
+
+    async def close(self) -> None:
+        self.ws.close()
+        await asyncio.gather(self._reader, return_exceptions=True)
+
+    async def _read(self) -> None:
+        while True:
+            raw = await self.ws.read_message()
+            if raw is None:
+                self._done.set()
+                return
+            msg = ForwardMsg()
+            msg.ParseFromString(raw)
+            kind = msg.WhichOneof("type")
+            if kind == "new_session" and msg.new_session.initialize.session_id:
+                self.session_id = msg.new_session.initialize.session_id
+            elif kind == "delta" and msg.delta.WhichOneof("type") == "new_element":
+                self._element(msg.delta.new_element, msg.delta.fragment_id)
+            elif kind == "file_urls_response" and self._file_urls and not self._file_urls.done():
+                self._file_urls.set_result(msg.file_urls_response.file_urls[0])
+            elif kind == "script_finished" and msg.script_finished != _FINISHED_EARLY:
+                self._done.set()
+
+    def _element(self, el, fragment_id: str) -> None:
+        etype = el.WhichOneof("type")
+        if etype == "exception":
+            self.errors.append(f"{el.exception.type}: {el.exception.message}")
+            return
+        proto = getattr(el, etype)
+        wid = getattr(proto, "id", "")
+        if not wid or not isinstance(wid, str):
+            return
+        self.widgets.pop(wid, None)
+        self.widgets[wid] = (etype, getattr(proto, "label", ""), fragment_id)   # most recent last
+        if wid in self.values and etype in ("text_input", "text_area") and proto.set_value:
+            self.values[wid] = {"string_value": proto.value}   # the script changed a value we typed
+
+    def find(self, key: str | None = None, labels: set[str] | None = None, prefix: str | None = None) -> str:
+        for wid, (_, label, _) in reversed(self.widgets.items()):
+            user_key = wid.rsplit("-", 1)[-1]
+            if (key and user_key == key) or (prefix and user_key.startswith(prefix)) or (labels and label in labels):
+                return wid
+        raise LookupError(f"widget not on the page: {key or prefix or sorted(labels or [])}")
+
+    async def rerun(self, trigger: str | None = None, timeout: float = 120) -> float:
+        """Send the widget state (plus a one-shot trigger) and wait for the run to finish."""
+        msg = BackMsg()
+        cs = msg.rerun_script
+        cs.SetInParent()   # an all-default ClientState would otherwise leave the oneof unset
+        for wid, fields in self.values.items():
+            ws = cs.widget_states.widgets.add(id=wid)
+            for name, v in fields.items():
+                if name == "file_uploader_state_value":
+                    ws.file_uploader_state_value.uploaded_file_info.extend(v)
+                else:
+                    setattr(ws, name, v)
+        if trigger:
+            cs.widget_states.widgets.add(id=trigger, trigger_value=True)
+            cs.fragment_id = self.widgets[trigger][2]
+        self._done.clear()
+        t0 = time.perf_counter()
+        await self.ws.write_message(msg.SerializeToString(), binary=True)
+        await asyncio.wait_for(self._done.wait(), timeout)
+        return time.perf_counter() - t0
+
+    async def set_text(self, wid: str, text: str) -> float:
+        self.values[wid] = {"string_value": text}
+        return await self.rerun()
+
+    async def upload(self, wid: str, name: str, data: bytes) -> float:
+        """Upload through /_stcore/upload_file like the frontend, then rerun with the uploader's new value."""
+        self._file_urls = asyncio.get_running_loop().create_future()
+        msg = BackMsg()
+        msg.file_urls_request.request_id = uuid.uuid4().hex
+        msg.file_urls_request.session_id = self.session_id
+        msg.file_urls_request.file_names.append(name)
+        await self.ws.write_message(msg.SerializeToString(), binary=True)
+        urls = await asyncio.wait_for(self._file_urls, 30)
+        boundary = uuid.uuid4().hex
+        body = (f"--{boundary}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"{name}\"\r\n"
+                f"Content-Type: application/pdf\r\n\r\n").encode() + data + f"\r\n--{boundary}--\r\n".encode()
+        t0 = time.perf_counter()
+        await AsyncHTTPClient().fetch(self.base + urls.upload_url, method="PUT", body=body,
+                                      headers={"Content-Type": f"multipart/form-data; boundary={boundary}"})
+        info = UploadedFileInfo(name=name, size=len(data), file_id=urls.file_id,
+                                file_urls=FileURLs(file_id=urls.file_id, upload_url=urls.upload_url,
+                                                   delete_url=urls.delete_url))
+        self.values[wid] = {"file_uploader_state_value": [info]}
+        return (time.perf_counter() - t0) + await self.rerun()
+
+
+async def run_session(i: int, base: str, user_id: str, pdf_kb: int, think: float, seed: int) -> dict:
+    """Scripted flow of one user; returns {"steps": [(name, seconds)], "errors": [...], "session"}."""
+    rng = random.Random(seed + i)
+    steps: list[tuple[str, float]] = []
+    s = await Session.open(base)
+
+    async def step(name: str, coro) -> None:
+        steps.append((name, await coro))
+        if think:
+            await asyncio.sleep(rng.uniform(0, 2 * think))
+
+    try:
+        await step("load", s.rerun())
+        await step("set_user", s.set_text(s.find(key="user_id_input"), user_id))
+        await step("start", s.rerun(trigger=s.find(labels=_labels("btn_start"))))
+        pdf = b"%PDF-1.4\n" + rng.randbytes(pdf_kb * 1024)   # unique bytes: no hash dedup between sessions
+        await step("upload", s.upload(s.find(key="pdf_uploader"), f"load-{i:04d}.pdf", pdf))
+        await step("process", s.rerun(trigger=s.find(labels=_labels("btn_process"))))
+        await step("type_question", s.set_text(s.find(key="q_text"), QUESTION))
+        await step("ask", s.rerun(trigger=s.find(labels=_labels("btn_answer"))))
+        await step("followup", s.rerun(trigger=s.find(prefix="clarify_")))
+        await step("ask_followup", s.rerun(trigger=s.find(labels=_labels("btn_answer"))))
+    except Exception as e:
+        s.errors.append(f"{type(e).__name__}: {e}")
+    return {"steps": steps, "errors": list(s.errors), "session": s}
+
+
+# ==================== Server process sampling ====================
+def _proc_sample(pid: int) -> tuple[float, float, int]:
+    """(cpu seconds, rss MB, threads) of a process from /proc."""
+    with open(f"/proc/{pid}/stat") as fh:
+        fields = fh.read().rsplit(")", 1)[1].split()
+    cpu = (int(fields[11]) + int(fields[12])) / _CLK_TCK
+    rss, threads = 0.0, 0
+    with open(f"/proc/{pid}/status") as fh:
+        for line in fh:
+            if line.startswith("VmRSS:"):
+                rss = int(line.split()[1]) / 1024
+            elif line.startswith("Threads:"):
+                threads = int(line.split()[1])
+    return cpu, rss, threads
+
+async def _sample(pid: int, out: list, stop: asyncio.Event, every: float = 0.1) -> None:
+    while not stop.is_set():
+        out.append((time.monotonic(), *_proc_sample(pid)))
+        try:
+            await asyncio.wait_for(stop.wait(), every)
+        except asyncio.TimeoutError:
+            pass
+    out.append((time.monotonic(), *_proc_sample(pid)))
+
+
+# ==================== One load level ====================
+def _start_servers(args, n: int) -> tuple[subprocess.Popen | None, subprocess.Popen, str]:
+    users = [f"{args.user_prefix}{i:04d}" for i in range(n + 1)]
+    mock = None
+    backend = args.backend
+    if not backend:
+        port = _free_port()
+        mock = subprocess.Popen(
+            [sys.executable, str(BENCH_DIR / "mock_backend.py"), "--port", str(port), "--seed", str(args.seed),
+             "--users", ",".join(users), "--query-latency", args.query_latency,
+             "--upload-latency", args.upload_latency, "--token-interval", args.token_interval],
+            stdout=subprocess.DEVNULL)
+        backend = f"http://127.0.0.1:{port}"
+        _wait_http(backend + "/_mock/health", 30)
+    ui_port = _free_port()
+    env = {**os.environ, "API_BASE_URL": backend,
+           "UI_ADMIN_API_KEY": os.getenv("UI_ADMIN_API_KEY", "mock-admin-key")}
+    ui = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", "userinterface.py", "--server.headless", "true",
+         "--server.port", str(ui_port), "--server.enableXsrfProtection", "false",
+         "--server.fileWatcherType", "none", "--browser.gatherUsageStats", "false"],
+        cwd=UI_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    base = f"http://127.0.0.1:{ui_port}"
+    _wait_http(base + "/_stcore/health", 60)
+    return mock, ui, base
+
+async def _level(args, n: int) -> dict:
+    mock, ui, base = _start_servers(args, n)
+    try:
+        # warm-up tab: imports, caches and the access index, so the baseline is a warm idle server
+        warm = await run_session(n, base, f"{args.user_prefix}{n:04d}", args.pdf_kb, 0, args.seed)
+        await warm["session"].close()
+        await asyncio.sleep(1)
+        _, rss_idle, threads_idle = _proc_sample(ui.pid)
+
+        samples: list = []
+        stop = asyncio.Event()
+        sampler = asyncio.ensure_future(_sample(ui.pid, samples, stop))
+        t0 = time.perf_counter()
+        results = await asyncio.gather(*(
+            run_session(i, base, f"{args.user_prefix}{i:04d}", args.pdf_kb, args.think, args.seed)
+            for i in range(n)))
+        wall = time.perf_counter() - t0
+        stop.set()
+        await sampler
+        _, rss_after, _ = _proc_sample(ui.pid)   # every session still connected
+        for r in results:
+            await r["session"].close()
+    finally:
+        for p in (ui, mock):
+            if p:
+                p.terminate()
+                p.wait(10)
+
+    all_s = [t for r in results for _, t in r["steps"]]
+    ui_s = [t for r in results for name, t in r["steps"] if name not in BACKEND_STEPS]
+    per_step: dict[str, list[float]] = {}
+    for r in results:
+        for name, t in r["steps"]:
+            per_step.setdefault(name, []).append(t)
+    busy = [(c1 - c0) / (t1 - t0) for (t0, c0, *_), (t1, c1, *_) in zip(samples, samples[1:]) if t1 > t0]
+    errors = [e for r in results for e in r["errors"]]
+    ms = lambda x: round(x * 1000, 1)  # noqa: E731
+    return {
+        "sessions": n,
+        "completed": sum(1 for r in results if len(r["steps"]) == 9 and not r["errors"]),
+        "errors": len(errors),
+        "first_error": errors[0] if errors else None,
+        "wall_s": round(wall, 2),
+        "reruns": len(all_s),
+        "rerun_p50_ms": ms(_pct(all_s, 50)) if all_s else None,
+        "rerun_p95_ms": ms(_pct(all_s, 95)) if all_s else None,
+        "rerun_p99_ms": ms(_pct(all_s, 99)) if all_s else None,
+        "ui_rerun_p50_ms": ms(_pct(ui_s, 50)) if ui_s else None,
+        "ui_rerun_p95_ms": ms(_pct(ui_s, 95)) if ui_s else None,
+        "steps_p95_ms": {k: ms(_pct(v, 95)) for k, v in per_step.items()},
+        "cpu_cores": round(statistics.mean(busy), 2) if busy else None,
+        "gil_saturated_pct": round(100 * sum(b >= 0.9 for b in busy) / len(busy), 1) if busy else None,
+        "threads_peak_extra": max(s[3] for s in samples) - threads_idle,
+        "rss_idle_mb": round(rss_idle, 1),
+        "rss_peak_mb": round(max(s[2] for s in samples), 1),
+        "rss_per_session_mb": round((rss_after - rss_idle) / n, 2),
+    }
+
+
+def main(argv: list[str]) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--sessions", default="1,5,10,25", help="comma separated concurrent session counts")
+    ap.add_argument("--think", type=float, default=0.0, help="mean pause between a user's actions (s)")
+    ap.add_argument("--pdf-kb", type=int, default=256, help="size of each uploaded PDF")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--user-prefix", default="load-", help="session i signs in as <prefix><i:04d>")
+    ap.add_argument("--backend", default="", help="use this backend instead of starting mock_backend.py")
+    ap.add_argument("--query-latency", default="lognormal:0.8,0.5")
+    ap.add_argument("--upload-latency", default="uniform:0.05,0.2")
+    ap.add_argument("--token-interval", default="0.02")
+    ap.add_argument("--json", action="store_true", help="print one JSON line per level")
+    args = ap.parse_args(argv)
+
+    levels = [int(x) for x in args.sessions.split(",") if x.strip()]
+    cols = ["sessions", "completed", "errors", "rerun_p50_ms", "rerun_p95_ms", "ui_rerun_p95_ms",
+            "cpu_cores", "gil_saturated_pct", "threads_peak_extra", "rss_per_session_mb", "wall_s"]
+    if not args.json:
+        print(" ".join(f"{c:>18}" for c in cols))
+    for n in levels:
+        r = asyncio.run(_level(args, n))
+        if args.json:
+            print(json.dumps(r), flush=True)
+        else:
+            print(" ".join(f"{str(r[c]):>18}" for c in cols), flush=True)
+            if r["first_error"]:
+                print(f"  first error: {r['first_error']}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,444 @@
+"""Local stand-in for the PDF assistant backend, for offline load tests.
+
+Implements the contracts the UI relies on (stdlib only):
+
+    GET  /admin/keys                      X-API-Key; ETag / If-None-Match -> 304
+    POST /documents                       multipart upload -> {"doc_id"}
+    POST /documents/uploads               resumable session -> {"upload_id", "offset"}
+    HEAD|PATCH /documents/uploads/{id}    Upload-Offset protocol
+    POST /documents/uploads/{id}/complete -> {"doc_id"}
+    HEAD|GET /documents/by-hash/{sha}     X-Doc-Id header / {"doc_id"}
+    POST /documents/query                 JSON, or SSE / NDJSON when "stream" is set
+    POST /forms/submit                    -> {"ok": true}
+    GET  /_mock/stats                     request counts per route
+
+With --set-cookies every response sets a per-user cookie, and requests that
+send one back are counted as "cookie:replayed" ("cookie:foreign" when it
+belongs to another X-User-Id).
+
+Latencies are distributions ("0.2", "uniform:0.1,0.5", "normal:0.8,0.2",
+"lognormal:0.8,0.5" = median,sigma, "exp:0.3"); with --seed the sequence of
+draws, errors and payloads is reproducible.
+
+    python pdf-assistant-ui/bench/mock_backend.py --port 8000 --keys 5000 \\
+        --query-latency lognormal:0.8,0.5 --error-rate 0.01
+    API_BASE_URL=http://127.0.0.1:8000 UI_ADMIN_API_KEY=mock-admin-key streamlit run pdf-assistant-ui/ui/userinterface.py
+"""
+import argparse
+import hashlib
+import json
+import math
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+WORDS = ("the document states that payments are due within thirty days of the invoice date and "
+         "late fees apply after a written reminder while either party may terminate the agreement "
+         "with three months notice subject to the conditions in the annex").split()
+
+
+# ==================== Distributions ====================
+def parse_dist(spec: str):
+    """Latency spec -> callable(rng) returning seconds (never negative)."""
+    spec = str(spec).strip()
+    kind, _, args = spec.partition(":") if ":" in spec else ("const", "", spec)
+    a = [float(x) for x in args.split(",") if x.strip()] if args else []
+    if kind == "const":
+        return lambda rng: a[0]
+    if kind == "uniform":
+        return lambda rng: rng.uniform(a[0], a[1])
+    if kind == "normal":
+        return lambda rng: max(0.0, rng.gauss(a[0], a[1]))
+    if kind == "lognormal":
+        return lambda rng: rng.lognormvariate(math.log(a[0]), a[1])
+    if kind == "exp":
+        return lambda rng: rng.expovariate(1 / a[0])
+    raise ValueError(f"unknown latency distribution: {spec}")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8000)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--admin-key", default="mock-admin-key")
+    # key list
+    ap.add_argument("--keys", type=int, default=1000, help="entries returned by /admin/keys")
+    ap.add_argument("--users", default="demo", help="comma separated user ids that always get upload+query")
+    # latencies
+    ap.add_argument("--keys-latency", default="0.05")
+    ap.add_argument("--upload-latency", default="uniform:0.2,0.6", help="per upload request")
+    ap.add_argument("--query-latency", default="lognormal:0.8,0.5", help="until the first byte")
+    ap.add_argument("--token-interval", default="0.02", help="between streamed answer chunks")
+    ap.add_argument("--form-latency", default="0.1")
+    # payloads
+    ap.add_argument("--answer-words", type=int, default=120)
+    ap.add_argument("--chunk-words", type=int, default=4, help="words per streamed answer event")
+    ap.add_argument("--citations", type=int, default=5)
+    ap.add_argument("--snippet-words", type=int, default=40)
+    ap.add_argument("--followups", type=int, default=3)
+    ap.add_argument("--stream-format", choices=["auto", "sse", "ndjson", "json"], default="auto")
+    # failures
+    ap.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with --error-status")
+    ap.add_argument("--error-status", type=int, default=503)
+    ap.add_argument("--drop-rate", type=float, default=0.0, help="share of requests whose connection is cut")
+    ap.add_argument("--no-resumable", action="store_true", help="answer 404 on /documents/uploads (multipart only)")
+    ap.add_argument("--strict-docs", action="store_true", help="404 for doc_ids this server did not issue")
+    ap.add_argument("--set-cookies", action="store_true", help="Set-Cookie per user on every response")
+    return ap
+
+
+# ==================== State ====================
+class MockState:
+    def __init__(self, cfg):
+        self.cfg = cfg
+        self.lock = threading.Lock()
+        self.rng = random.Random(cfg.seed)
+        self.dist = {name: parse_dist(getattr(cfg, f"{name}_latency"))
+                     for name in ("keys", "upload", "query", "form")}
+        self.dist["token"] = parse_dist(cfg.token_interval)
+        self.keys = self._make_keys()
+        self.keys_etag = '"' + hashlib.sha1(json.dumps(self.keys).encode()).hexdigest()[:16] + '"'
+        self.docs: set[str] = set()
+        self.by_hash: dict[tuple[str, str], str] = {}
+        self.uploads: dict[str, dict] = {}
+        self.stats: dict[str, int] = {}
+
+    def _make_keys(self) -> list[dict]:
+        rights = [["query"], ["upload", "query"], ["upload", "query"], ["*"]]
+        keys = [{"user_id": u, "rights": ["upload", "query"], "role": "user", "enabled": True}
+                for u in self.cfg.users.split(",") if u]
+        for i in range(self.cfg.keys):
+            keys.append({"user_id": f"user-{i:06d}", "key_id": f"k{i:06d}",
+                         "rights": self.rng.choice(rights), "role": "user",
+                         "enabled": self.rng.random() > 0.05})
+        return keys
+
+    def draw(self, name: str) -> float:
+        with self.lock:
+            return self.dist[name](self.rng)
+
+    def roll(self, p: float) -> bool:
+        if p <= 0:
+            return False
+        with self.lock:
+            return self.rng.random() < p
+
+    def count(self, route: str) -> None:
+        with self.lock:
+            self.stats[route] = self.stats.get(route, 0) + 1
+
+    def new_doc(self, user_id: str, sha: str | None) -> str:
+        doc_id = f"doc-{uuid.uuid4().hex[:12]}"
+        with self.lock:
+            self.docs.add(doc_id)
+            if sha:
+                self.by_hash[(user_id, sha)] = doc_id
+        return doc_id
+
+    def answer(self, question: str, doc_id: str) -> dict:
+        cfg = self.cfg
+        with self.lock:
+            rng = self.rng
+            words = [rng.choice(WORDS) for _ in range(cfg.answer_words)]
+            cits = [{"id": i + 1, "page": rng.randint(1, 80), "section": f"§ {rng.randint(1, 20)}",
+                     "snippet": " ".join(rng.choice(WORDS) for _ in range(cfg.snippet_words))}
+                    for i in range(cfg.citations)]
+            conf = round(rng.uniform(0.55, 0.98), 2)
+        follow = [f"{question.rstrip('?')} ({k + 1})?" for k in range(cfg.followups)]
+        return {
+            "doc_id": doc_id,
+            "answer": " ".join(words).capitalize() + ".",
+            "confidence_score": conf,
+            "model": "mock-llm",
+            "citations": cits,
+            "verification": {"is_accurate": conf > 0.7, "confidence": conf,
+                             "explanation": "Checked against the cited passages.", "issues_found": []},
+            "followups": {"clarify": follow[: (cfg.followups + 1) // 2], "deepen": follow[(cfg.followups + 1) // 2:]},
+        }
+
+
+# ==================== Handler ====================
+_UPLOAD_RE = re.compile(r"^/documents/uploads/([^/]+)(/complete)?$")
+_HASH_RE = re.compile(r"^/documents/by-hash/([^/]+)$")
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "MockBackend/1.0"
+
+    @property
+    def state(self) -> MockState:
+        return self.server.state
+
+    def log_message(self, *args):
+        pass
+
+    # ---- plumbing ----
+    def _body(self) -> bytes:
+        n = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(n) if n else b""
+
+    def _json_body(self) -> dict:
+        try:
+            return json.loads(self._body() or b"{}")
+        except ValueError:
+            return {}
+
+    def _send(self, status: int, payload=None, headers: dict | None = None, head: bool = False):
+        body = b"" if payload is None else json.dumps(payload).encode()
+        self.send_response(status)
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        if payload is not None:
+            self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if body and not head:
+            self.wfile.write(body)
+
+    def _chunk(self, data: bytes) -> None:
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+    def _fault(self, route: str) -> bool:
+        """Count the request and maybe inject a failure; True when it was answered already."""
+        st = self.state
+        st.count(route)
+        if st.roll(st.cfg.drop_rate):
+            self.close_connection = True
+            self.connection.shutdown(2)
+            return True
+        if st.roll(st.cfg.error_rate):
+            self._body()
+            self._send(st.cfg.error_status, {"detail": "injected failure"})
+            return True
+        return False
+
+    def _user(self) -> str:
+        return self.headers.get("X-User-Id", "")
+
+    def end_headers(self):
+        if self.state.cfg.set_cookies:
+            self.send_header("Set-Cookie", f"mock_session={self._user() or '-'}; Path=/")
+        super().end_headers()
+
+    def _check_cookie(self) -> None:
+        cookie = self.headers.get("Cookie")
+        if not cookie:
+            return
+        self.state.count("cookie:replayed")
+        if f"mock_session={self._user() or '-'}" not in cookie.split("; "):
+            self.state.count("cookie:foreign")
+
+    # ---- routing ----
+    def do_GET(self):
+        self._route("GET")
+
+    def do_HEAD(self):
+        self._route("HEAD")
+
+    def do_POST(self):
+        self._route("POST")
+
+    def do_PATCH(self):
+        self._route("PATCH")
+
+    def _route(self, method: str):
+        path = self.path.split("?", 1)[0]
+        self._check_cookie()
+        if path == "/_mock/stats":
+            with self.state.lock:
+                return self._send(200, dict(self.state.stats))
+        if path == "/_mock/health":
+            return self._send(200, {"ok": True})
+        if path == "/admin/keys" and method == "GET":
+            return self._admin_keys()
+        if path == "/documents/query" and method == "POST":
+            return self._query()
+        if path == "/forms/submit" and method == "POST":
+            return self._form()
+        if path == "/documents" and method == "POST":
+            return self._multipart()
+        if path == "/documents/uploads" and method == "POST":
+            return self._upload_create()
+        m = _UPLOAD_RE.match(path)
+        if m:
+            return self._upload_session(method, m.group(1), bool(m.group(2)))
+        m = _HASH_RE.match(path)
+        if m and method in ("GET", "HEAD"):
+            return self._by_hash(method, m.group(1))
+        self._body()
+        self._send(404, {"detail": "not found"})
+
+    # ---- endpoints ----
+    def _admin_keys(self):
+        if self._fault("/admin/keys"):
+            return
+        st = self.state
+        if self.headers.get("X-API-Key") != st.cfg.admin_key:
+            return self._send(401, {"detail": "invalid admin key"})
+        time.sleep(st.draw("keys"))
+        if self.headers.get("If-None-Match") == st.keys_etag:
+            return self._send(304, headers={"ETag": st.keys_etag})
+        self._send(200, {"keys": st.keys}, headers={"ETag": st.keys_etag})
+
+    def _form(self):
+        if self._fault("/forms/submit"):
+            return
+        data = self._json_body()
+        time.sleep(self.state.draw("form"))
+        self._send(200, {"ok": True, "request_id": uuid.uuid4().hex[:10], "received": sorted(data)})
+
+    def _multipart(self):
+        if self._fault("/documents"):
+            return
+        if not self._user():
+            self._body()
+            return self._send(401, {"detail": "missing X-User-Id"})
+        size = len(self._body())
+        time.sleep(self.state.draw("upload"))
+        doc_id = self.state.new_doc(self._user(), self.headers.get("X-Content-SHA256"))
+        self._send(200, {"doc_id": doc_id, "bytes": size})
+
+    def _upload_create(self):
+        if self._fault("/documents/uploads"):
+            return
+        data = self._json_body()
+        if self.state.cfg.no_resumable:
+            return self._send(404, {"detail": "not found"})
+        upload_id = uuid.uuid4().hex
+        with self.state.lock:
+            self.state.uploads[upload_id] = {"size": int(data.get("size") or 0), "offset": 0, "user": self._user(),
+                                             "sha": self.headers.get("X-Content-SHA256")}
+        self._send(201, {"upload_id": upload_id, "offset": 0}, headers={"Upload-Offset": "0"})
+
+    def _upload_session(self, method: str, upload_id: str, complete: bool):
+        if self._fault("/documents/uploads/{id}"):
+            return
+        st = self.state
+        with st.lock:
+            up = st.uploads.get(upload_id)
+        if up is None:
+            self._body()
+            return self._send(404, {"detail": "unknown upload"}, head=method == "HEAD")
+        if method == "HEAD":
+            return self._send(200, headers={"Upload-Offset": str(up["offset"]), "Upload-Length": str(up["size"])},
+                              head=True)
+        if method == "PATCH":
+            data = self._body()
+            if int(self.headers.get("Upload-Offset", -1)) != up["offset"]:
+                return self._send(409, {"detail": "offset mismatch"}, headers={"Upload-Offset": str(up["offset"])})
+            time.sleep(st.draw("upload"))
+            with st.lock:
+                up["offset"] += len(data)
+            return self._send(204, headers={"Upload-Offset": str(up["offset"])})
+        if method == "POST" and complete:
+            self._body()
+            if up["offset"] < up["size"]:
+                return self._send(409, {"detail": "upload incomplete"}, headers={"Upload-Offset": str(up["offset"])})
+            doc_id = st.new_doc(up["user"], up["sha"] or self.headers.get("X-Content-SHA256"))
+            with st.lock:
+                st.uploads.pop(upload_id, None)
+            return self._send(200, {"doc_id": doc_id})
+        self._body()
+        self._send(405, {"detail": "method not allowed"})
+
+    def _by_hash(self, method: str, sha: str):
+        if self._fault("/documents/by-hash/{sha}"):
+            return
+        with self.state.lock:
+            doc_id = self.state.by_hash.get((self._user(), sha))
+        if not doc_id:
+            return self._send(404, {"detail": "unknown hash"}, head=method == "HEAD")
+        self._send(200, {"doc_id": doc_id}, headers={"X-Doc-Id": doc_id}, head=method == "HEAD")
+
+    def _query(self):
+        if self._fault("/documents/query"):
+            return
+        st = self.state
+        data = self._json_body()
+        if not self._user():
+            return self._send(401, {"detail": "missing X-User-Id"})
+        doc_id = data.get("doc_id")
+        if not doc_id or (st.cfg.strict_docs and doc_id not in st.docs):
+            return self._send(404, {"detail": "unknown doc_id"})
+        res = st.answer(str(data.get("question") or ""), doc_id)
+        if not data.get("do_verify", True):
+            res.pop("verification")
+        if not data.get("do_followups", True):
+            res["followups"] = {"clarify": [], "deepen": []}
+        time.sleep(st.draw("query"))
+
+        fmt = st.cfg.stream_format
+        accept = self.headers.get("Accept", "")
+        if fmt == "auto":
+            fmt = ("sse" if "text/event-stream" in accept else
+                   "ndjson" if "ndjson" in accept else "json") if data.get("stream") else "json"
+        if fmt == "json":
+            return self._send(200, res)
+        self._stream(res, fmt)
+
+    def _stream(self, res: dict, fmt: str):
+        st = self.state
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream" if fmt == "sse" else "application/x-ndjson")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        def emit(event: str, data):
+            if fmt == "sse":
+                self._chunk(f"event: {event}\ndata: {json.dumps(data)}\n\n".encode())
+            else:
+                body = {"event": event, **data} if isinstance(data, dict) else {"event": event, event: data}
+                self._chunk((json.dumps(body) + "\n").encode())
+
+        words = res["answer"].split(" ")
+        n = max(1, st.cfg.chunk_words)
+        for i in range(0, len(words), n):
+            emit("token", {"text": (" " if i else "") + " ".join(words[i:i + n])})
+            time.sleep(st.draw("token"))
+        if "verification" in res:
+            emit("verification", {"verification": res["verification"]})
+        emit("citations", {"citations": res["citations"]})
+        emit("followups", {"followups": res["followups"]})
+        emit("done", {k: res[k] for k in ("confidence_score", "model", "doc_id")})
+        self._chunk(b"")
+
+
+def make_server(**overrides) -> ThreadingHTTPServer:
+    """Mock server bound per the config (``port=0`` picks a free port); call serve_forever() to run it."""
+    cfg = build_parser().parse_args([])
+    for k, v in overrides.items():
+        setattr(cfg, k, v)
+    srv = ThreadingHTTPServer((cfg.host, cfg.port), MockHandler)
+    srv.daemon_threads = True
+    srv.state = MockState(cfg)
+    return srv
+
+def start_in_thread(**overrides) -> tuple[ThreadingHTTPServer, str]:
+    """Start a mock server on a background thread; returns (server, base_url)."""
+    srv = make_server(**overrides)
+    threading.Thread(target=srv.serve_forever, name="mock-backend", daemon=True).start()
+    host, port = srv.server_address[:2]
+    return srv, f"http://{host}:{port}"
+
+
+def main(argv: list[str]) -> int:
+    cfg = build_parser().parse_args(argv)
+    srv = make_server(**vars(cfg))
+    print(f"mock backend on http://{cfg.host}:{srv.server_address[1]} "
+          f"({cfg.keys} keys, admin key {cfg.admin_key!r})", flush=True)
+    try:
+        srv.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
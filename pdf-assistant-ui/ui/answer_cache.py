@@ -0,0 +1,122 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+# ==================== Config ====================
+ANSWER_CACHE_SIZE  = int(os.getenv("UI_ANSWER_CACHE_SIZE", "512"))
+ANSWER_CACHE_TTL_S = float(os.getenv("UI_ANSWER_CACHE_TTL", str(24 * 3600)))
+ANSWER_CACHE_DB    = os.getenv("UI_ANSWER_CACHE_DB", "")  # empty = memory only; created 0600
+ANSWER_CACHE_DB_ROWS = int(os.getenv("UI_ANSWER_CACHE_DB_ROWS", "10000"))
+_PRUNE_EVERY = 64  # puts between expiry/size passes over the SQLite file
+
+
+def _normalize_question(q: str) -> str:
+    return " ".join((q or "").split()).casefold()
+
+def answer_cache_key(user_id: str, doc_id: str, question: str, lang_code: str, context_id: str,
+                     do_verify: bool, do_followups: bool) -> str:
+    """Per user: a hit must never hand one user an answer fetched with another user's access."""
+    raw = json.dumps([user_id, doc_id, _normalize_question(question), lang_code, context_id,
+                      bool(do_verify), bool(do_followups)], ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class _AnswerCache:
+    """LRU + TTL cache of QUERY_PATH results shared by every session in the process.
+
+    With UI_ANSWER_CACHE_DB set, entries are also written to a local SQLite
+    file so they survive restarts; memory stays the first lookup tier. The
+    file drops expired rows and keeps at most `db_rows` (newest first), checked
+    at start and every _PRUNE_EVERY puts.
+    """
+    def __init__(self, size: int, ttl_s: float, db_path: str = "", db_rows: int = ANSWER_CACHE_DB_ROWS):
+        self._size = size
+        self._ttl = ttl_s
+        self._db_rows = db_rows
+        self._puts = 0
+        self._lock = threading.Lock()
+        self._mem: "OrderedDict[str, tuple[float, str, dict]]" = OrderedDict()
+        self._db = None
+        if db_path:
+            # user answers: readable by this user only
+            os.close(os.open(db_path, os.O_RDWR | os.O_CREAT, 0o600))
+            os.chmod(db_path, 0o600)
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS answers (key TEXT PRIMARY KEY, doc_id TEXT, ts REAL, res TEXT)")
+            self._db.execute("CREATE INDEX IF NOT EXISTS answers_doc ON answers(doc_id)")
+            self._db.execute("CREATE INDEX IF NOT EXISTS answers_ts ON answers(ts)")
+            self._prune_db()
+
+    def _prune_db(self) -> None:
+        self._db.execute("DELETE FROM answers WHERE ts < ?", (time.time() - self._ttl,))
+        self._db.execute("DELETE FROM answers WHERE key IN "
+                         "(SELECT key FROM answers ORDER BY ts DESC LIMIT -1 OFFSET ?)", (self._db_rows,))
+        self._db.commit()
+
+    def _remember(self, key: str, ts: float, doc_id: str, res: dict) -> None:
+        self._mem[key] = (ts, doc_id, res)
+        self._mem.move_to_end(key)
+        while len(self._mem) > self._size:
+            self._mem.popitem(last=False)
+
+    def get(self, key: str) -> tuple[dict, float] | None:
+        now = time.time()
+        with self._lock:
+            hit = self._mem.get(key)
+            if hit is None and self._db is not None:
+                row = self._db.execute("SELECT ts, doc_id, res FROM answers WHERE key = ?", (key,)).fetchone()
+                if row:
+                    hit = (row[0], row[1], json.loads(row[2]))
+                    self._remember(key, *hit)
+            if hit is None:
+                return None
+            ts, _, res = hit
+            if now - ts > self._ttl:
+                self._mem.pop(key, None)
+                if self._db is not None:
+                    self._db.execute("DELETE FROM answers WHERE key = ?", (key,))
+                    self._db.commit()
+                return None
+            self._mem.move_to_end(key)
+            return dict(res), now - ts  # callers fill in fields; the cached dict stays as stored
+
+    def put(self, key: str, doc_id: str, res: dict) -> None:
+        ts = time.time()
+        with self._lock:
+            self._remember(key, ts, doc_id, dict(res))
+            if self._db is not None:
+                self._db.execute("INSERT OR REPLACE INTO answers VALUES (?, ?, ?, ?)",
+                                 (key, doc_id, ts, json.dumps(res, ensure_ascii=False)))
+                self._db.commit()
+                self._puts += 1
+                if self._puts % _PRUNE_EVERY == 0:
+                    self._prune_db()
+
+    def invalidate_doc(self, doc_id: str) -> None:
+        with self._lock:
+            for k in [k for k, (_, d, _) in self._mem.items() if d == doc_id]:
+                del self._mem[k]
+            if self._db is not None:
+                self._db.execute("DELETE FROM answers WHERE doc_id = ?", (doc_id,))
+                self._db.commit()
+
+
+_CACHE = _AnswerCache(ANSWER_CACHE_SIZE, ANSWER_CACHE_TTL_S, ANSWER_CACHE_DB, ANSWER_CACHE_DB_ROWS)
+
+def get_cached_answer(key: str) -> tuple[dict, float] | None:
+    """Return (result, age in seconds) for a cached answer, or None."""
+    return _CACHE.get(key)
+
+def put_cached_answer(key: str, doc_id: str, res: dict) -> None:
+    if res.get("answer") and not res.get("error"):
+        _CACHE.put(key, doc_id, res)
+
+def invalidate_doc_answers(doc_id: str | None) -> None:
+    """Forget every cached answer for a document, e.g. after it was re-processed."""
+    if doc_id:
+        _CACHE.invalidate_doc(doc_id)
@@ -0,0 +1,153 @@
+import csv
+import io
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Iterator
+
+from config import QUERY_PATH
+from helpers import _req
+from answer_cache import answer_cache_key, get_cached_answer, put_cached_answer
+
+# ==================== Config ====================
+BATCH_MAX_CONCURRENCY   = int(os.getenv("UI_BATCH_MAX_CONCURRENCY", "8"))
+BATCH_TIMEOUT_S         = float(os.getenv("UI_BATCH_TIMEOUT", "120"))
+BATCH_MAX_QUESTIONS     = int(os.getenv("UI_BATCH_MAX_QUESTIONS", "500"))
+
+BATCH_COLUMNS = ["#", "question", "answer", "confidence", "latency_s", "status"]
+
+
+def parse_questions(text: str | None = None, csv_bytes: bytes | None = None) -> list[str]:
+    """Questions from pasted text (one per line) and/or a CSV (a 'question' column, else the first one)."""
+    out: list[str] = []
+    if csv_bytes:
+        rows = list(csv.reader(io.StringIO(csv_bytes.decode("utf-8-sig", errors="replace"))))
+        col = 0
+        if rows:
+            header = [h.strip().lower() for h in rows[0]]
+            if "question" in header:
+                col = header.index("question")
+                rows = rows[1:]
+        out += [r[col].strip() for r in rows if len(r) > col and r[col].strip()]
+    if text:
+        out += [line.strip() for line in text.splitlines() if line.strip()]
+    return out[:BATCH_MAX_QUESTIONS]
+
+
+def query_one(question: str, base_payload: dict, user_id: str, headers: dict,
+              timeout_s: float | None = None) -> tuple[str, dict]:
+    """Ask one question (answer cache first). Returns (status, result); status is "ok", "cached" or an error."""
+    p = base_payload
+    key = answer_cache_key(user_id, p["doc_id"], question, p.get("lang_hint"), p.get("context_id"),
+                           p.get("do_verify"), p.get("do_followups"))
+    cached = get_cached_answer(key)
+    if cached:
+        return "cached", cached[0]
+    r = _req("POST", QUERY_PATH, user_id=user_id, json={**p, "question": question},
+             headers=dict(headers), timeout_s=timeout_s)
+    if getattr(r, "ok", False):
+        res = r.json() or {}
+        put_cached_answer(key, p["doc_id"], res)
+        return "ok", res
+    if not getattr(r, "status_code", 0):
+        return getattr(r, "text", "network error"), {}
+    return f"HTTP {r.status_code}", {"error": getattr(r, "text", "")}
+
+
+def _ask_one(idx: int, question: str, base_payload: dict, user_id: str, headers: dict,
+             timeout_s: float) -> dict:
+    t0 = time.perf_counter()
+    status, res = query_one(question, base_payload, user_id, headers, timeout_s)
+    conf = res.get("confidence_score")
+    return {
+        "#": idx + 1,
+        "question": question,
+        "answer": res.get("answer", ""),
+        "confidence": conf if isinstance(conf, (int, float)) else (str(conf) if conf is not None else ""),
+        "latency_s": round(time.perf_counter() - t0, 2),
+        "status": status,
+    }
+
+
+def run_batch(questions: list[str], base_payload: dict, user_id: str, headers: dict,
+              concurrency: int = 4, timeout_s: float = BATCH_TIMEOUT_S) -> Iterator[dict]:
+    """Ask every question with at most ``concurrency`` requests in flight; yield rows as they finish.
+
+    Worker threads only do HTTP; the caller (the script thread) does all rendering.
+    Closing the generator early (e.g. a rerun stops the script) cancels the queued
+    questions and returns at once instead of waiting for the in-flight ones.
+    """
+    concurrency = max(1, min(int(concurrency), BATCH_MAX_CONCURRENCY))
+    pool = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="batch-qa")
+    try:
+        futures = {
+            pool.submit(_ask_one, i, q, base_payload, user_id, headers, timeout_s): i
+            for i, q in enumerate(questions)
+        }
+        for fut in as_completed(futures):
+            try:
+                yield fut.result()
+            except Exception as e:
+                i = futures[fut]
+                yield {"#": i + 1, "question": questions[i], "answer": "", "confidence": "",
+                       "latency_s": None, "status": f"{type(e).__name__}: {e}"}
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def ask_documents(question: str, base_payload: dict, docs: list[tuple[str, str]], user_id: str,
+                  headers: dict, timeout_s: float | None = None) -> list[tuple[str, str, dict]]:
+    """Fan one question out to several (doc_id, name) documents; returns (name, status, result) in input order."""
+    workers = max(1, min(len(docs), BATCH_MAX_CONCURRENCY))
+    pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="multi-doc-qa")
+    try:
+        futures = [pool.submit(query_one, question, {**base_payload, "doc_id": doc_id}, user_id, headers, timeout_s)
+                   for doc_id, _ in docs]
+        return [(name, *fut.result()) for (_, name), fut in zip(docs, futures)]
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def merge_results(results: list[tuple[str, str, dict]]) -> dict:
+    """Merge per-document results into one QUERY_PATH-shaped dict (answers sectioned by document)."""
+    ok = [(name, res) for name, status, res in results if status in ("ok", "cached")]
+    if not ok:
+        return {}
+    sections, citations, confs, models = [], [], [], []
+    clarify, deepen = [], []
+    for name, res in ok:
+        sections.append(f"**{name}**\n\n{res.get('answer', '')}")
+        for c in res.get("citations") or []:
+            citations.append({**c, "doc": name})
+        conf = res.get("confidence_score")
+        if isinstance(conf, (int, float)):
+            confs.append(conf)
+        model = res.get("model") or res.get("model_used")
+        if model and model not in models:
+            models.append(model)
+        f = res.get("followups") or {}
+        clarify += [x for x in f.get("clarify") or [] if x not in clarify]
+        deepen  += [x for x in f.get("deepen") or [] if x not in deepen]
+    failed = [f"{name}: {status}" for name, status, _ in results if status not in ("ok", "cached")]
+    merged = {
+        "answer": "\n\n---\n\n".join(sections),
+        "citations": citations,
+        "confidence_score": round(min(confs), 3) if confs else None,
+        "model": ", ".join(models) or None,
+        "followups": {"clarify": clarify, "deepen": deepen},
+        "documents": [name for name, _ in ok],
+    }
+    if len(ok) == 1:
+        merged["verification"] = ok[0][1].get("verification")
+    if failed:
+        merged["failed_documents"] = failed
+    return merged
+
+
+def rows_to_csv(rows: list[dict]) -> bytes:
+    buf = io.StringIO()
+    w = csv.DictWriter(buf, fieldnames=BATCH_COLUMNS)
+    w.writeheader()
+    for row in sorted(rows, key=lambda r: r["#"]):
+        w.writerow(row)
+    return buf.getvalue().encode("utf-8-sig")
@@ -0,0 +1,65 @@
+import html
+import os
+from itertools import groupby
+
+# ==================== Config ====================
+CITATIONS_EAGER = int(os.getenv("UI_CITATIONS_EAGER", "40"))  # citations shown open; later page groups start collapsed
+
+
+def _page_of(c: dict) -> int | None:
+    try:
+        return int(c.get("page"))
+    except (TypeError, ValueError):
+        return None
+
+def normalize_citations(cits: list | None) -> list[dict]:
+    """Clean and sort a response's citations once, when it arrives.
+
+    Pages become ints (unknown pages last), text fields are stripped strings;
+    the result is what show_citations and the answer cache expect.
+    """
+    out = []
+    for c in cits or []:
+        if not isinstance(c, dict):
+            c = {"snippet": str(c)}
+        out.append({
+            **c,
+            "page": _page_of(c),
+            "section": str(c.get("section") or "").strip(),
+            "doc": str(c.get("doc") or "").strip(),
+            "snippet": str(c.get("snippet") or "").strip(),
+        })
+    out.sort(key=lambda c: (c["page"] is None, c["page"] or 0))
+    return out
+
+
+def _esc(s: str) -> str:
+    # a blank line would end the HTML block and hand the rest to the markdown parser
+    return html.escape(s).replace("\n", "<br>")
+
+def _page_label(page: int | None) -> str:
+    return f"Page {page}" if page is not None else "Page —"
+
+def _item_html(c: dict) -> str:
+    meta = " — ".join(filter(None, [c["doc"], c["section"]]))
+    return (f'<div class="cite-item"><span class="page-pill">{_page_label(c["page"])}</span>'
+            f'<span class="cite-meta">{"— " + _esc(meta) if meta else ""}</span>'
+            f'<div class="cite-snippet">{_esc(c["snippet"])}</div></div>')
+
+def citations_html(cits: list[dict], eager: int = CITATIONS_EAGER) -> str:
+    """Normalized citations as one HTML payload.
+
+    Up to `eager` citations are a flat list. Past that they are grouped per
+    page in <details> blocks, and the groups after the first `eager`
+    citations start closed, so the browser skips laying them out.
+    """
+    if len(cits) <= eager:
+        return '<div class="cite-list">' + "".join(map(_item_html, cits)) + "</div>"
+    parts, shown = [], 0
+    for page, group in groupby(cits, key=lambda c: c["page"]):
+        group = list(group)
+        is_open = " open" if shown < eager else ""
+        parts.append(f'<details class="cite-group"{is_open}><summary>{_page_label(page)} ({len(group)})</summary>'
+                     + "".join(map(_item_html, group)) + "</details>")
+        shown += len(group)
+    return '<div class="cite-list">' + "".join(parts) + "</div>"
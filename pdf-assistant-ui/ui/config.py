@@ -0,0 +1,44 @@
+# ==================== Process-wide config ====================
+# Imported once per process (before helpers, which reads the environment at
+# import time), so .env loading and the secrets probe don't run on every rerun.
+import os
+from pathlib import Path
+
+from dotenv import load_dotenv
+load_dotenv(override=True)
+
+import streamlit as st
+
+# --- Safe secrets/env bootstrap ---
+def _secrets_available() -> bool:
+    # Only probe st.secrets if a secrets file is present
+    return Path(".streamlit/secrets.toml").exists() or Path.home().joinpath(".streamlit/secrets.toml").exists()
+
+if _secrets_available():
+    ST_SECRETS: dict = dict(st.secrets)
+else:
+    ST_SECRETS = {}
+
+# Admin key (prefer secrets, fallback to env loaded by dotenv)
+ak = (ST_SECRETS.get("admin", {}) or {}).get("api_key", "") or os.getenv("UI_ADMIN_API_KEY") or os.getenv("ADMIN_API_KEY", "")
+if ak:
+    os.environ["UI_ADMIN_API_KEY"] = str(ak).strip()
+
+
+# ===== Admin/API diagnostics =====
+API_BASE = os.getenv("API_BASE_URL", "http://localhost:8000")
+
+def _mask(s: str | None) -> str:
+    if not s:
+        return "—"
+    return (s[:3] + "..." + s[-3:]) if len(s) > 8 else "***"
+
+ADMIN_KEY = os.getenv("UI_ADMIN_API_KEY") or os.getenv("ADMIN_API_KEY")
+
+# ==================== CONFIG ====================
+UPLOAD_PATH         = os.getenv("UPLOAD_PATH", "/documents")
+QUERY_PATH          = os.getenv("QUERY_PATH", "/documents/query")
+UPLOAD_FILE_FIELD   = os.getenv("UPLOAD_FILE_FIELD", "pdf")
+MIN_QUESTION_CHARS  = int(os.getenv("MIN_QUESTION_CHARS", "10"))
+STREAM_ANSWERS      = os.getenv("UI_STREAM_ANSWERS", "1").lower() in ("1", "true", "yes")
+DEBUG_HTTP_TIMING   = os.getenv("UI_DEBUG_TIMING", "").lower() in ("1", "true", "yes")
@@ -0,0 +1,63 @@
+# ==================== Document contexts ====================
+CONTEXTS = {
+    "755890001": {
+        "label_en":"📜 Legal text",
+        "label_fr":"📜 Texte juridique",
+        "label_nl":"📜 Juridische tekst",
+        "label_de":"📜 Rechtstext",
+        "followup_hint":"Ask for article numbers, definitions, exceptions, effective dates."
+        },
+    "755890002": {
+        "label_en":"🧩 Specifications",
+        "label_fr":"🧩 Cahier des charges",
+        "label_nl":"🧩 Lastenboek",
+        "label_de":"🧩 Pflichtenheft",
+        "followup_hint":"Probe priorities, acceptance criteria, dependencies, deadlines."
+        },
+    "755890003": {
+        "label_en":"🔧 User manual",
+        "label_fr":"🔧 Mode d’emploi",
+        "label_nl":"🔧 Handleiding",
+        "label_de":"🔧 Bedienungsanleitung",
+        "followup_hint":"Offer variants per OS/model, safety notes, quick-start tips."
+        },
+    "755890004": {
+        "label_en":"📘 Course",
+        "label_fr":"📘 Cours",
+        "label_nl":"📘 Cursus",
+        "label_de":"📘 Kurs",
+        "followup_hint":"Suggest exercises, prerequisite refreshers, exam-style questions."
+        },
+    "755890005": {
+        "label_en":"📊 Financial report",
+        "label_fr":"📊 Rapport financier",
+        "label_nl":"📊 Financieel rapport",
+        "label_de":"📊 Finanzbericht",
+        "followup_hint":"Probe unusual variances, accounting policies, and segment notes."
+        },
+    "755890006": {
+        "label_en":"🔬 Scientific paper",
+        "label_fr":"🔬 Article scientifique",
+        "label_nl":"🔬 Wetenschappelijk artikel",
+        "label_de":"🔬 Wissenschaftliche Arbeit",
+        "followup_hint":"Ask about sample size, controls, effect sizes, confidence intervals."
+        },
+    "755890007": {
+        "label_en":"📑 Policy / Compliance",
+        "label_fr":"📑 Politique / Conformité",
+        "label_nl":"📑 Beleid / Compliance",
+        "label_de":"📑 Richtlinie / Compliance",
+        "followup_hint":"Probe ownership, timelines, and evidence needed for compliance."
+        },
+}
+LANG_LABEL_TO_CODE = {"NL":"nl","FR":"fr","DE":"de","EN":"en"}
+
+# (context_id, ui language) -> label, resolved once
+_LABELS: dict[tuple[str, str], str] = {
+    (cid, lang): d.get(f"label_{lang}") or d.get("label_en") or cid
+    for cid, d in CONTEXTS.items()
+    for lang in ("en", "fr", "nl", "de")
+}
+
+def ctx_label(cid: str, lang_code: str) -> str:
+    return _LABELS.get((cid, (lang_code or "en").lower())) or _LABELS.get((cid, "en")) or cid
@@ -1,45 +1,152 @@
 
+import logging
+import os
+import threading
+import time
 import pandas as pd
-from dash import Dash, html, dcc, Input, Output
+from dash import Dash, html, dcc, ctx, Input, Output, State, Patch, no_update
+from flask import g, request
 import plotly.express as px
+from dashboard_data import (TIMESHEET_CSV, AGREED_CSV, CsvTail, load_timesheet, load_agreed,
+                            append_rows, data_version, file_stat)
+from dashboard_cache import memoize
 
-df = pd.read_csv("pdf-assistant-ui/raw_data/epz_timesheet_demo.csv", parse_dates=["date"])
-agreed = pd.read_csv("pdf-assistant-ui/raw_data/epz_agreed_hours.csv")
-df["month_name"] = df["date"].dt.strftime("%b")
-df["year"] = df["date"].dt.year
+REFRESH_S   = float(os.getenv("DASH_REFRESH_S", "15"))
+LOG_PAYLOAD = os.getenv("DASH_LOG_PAYLOAD", "").lower() in ("1", "true", "yes")
+
+_log = logging.getLogger("dashboard")
+if LOG_PAYLOAD:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(message)s")
+
+# Columnar load: categorical strings, typed date, year/month_name precomputed (see dashboard_data.py)
+_tail = CsvTail(TIMESHEET_CSV)
+_tail.mark()
+df = load_timesheet(upto=_tail.offset)
+agreed = load_agreed()
+_agreed_stat = file_stat(AGREED_CSV)
+DATA_VERSION = data_version(_tail.state, _agreed_stat)
+
+# Pre-aggregated cube: hours per combination of every filter and chart
+# dimension, built once at load. Callbacks slice it instead of masking df.
+CUBE_DIMS = ["year", "region", "psychologist_name", "riziv_number", "month", "function", "care_place", "client_type"]
+
+def build_cube(d):
+    keys = {c: d[c].astype("category") for c in CUBE_DIMS}
+    cube = (d.assign(**keys)
+             .groupby(CUBE_DIMS, observed=True, sort=True)
+             .agg(hours=("hours", "sum"), rows=("hours", "size"), last_date=("date", "max")))
+    return cube.sort_index()
+
+def fold_cube(c, tail):
+    """Add the cube of newly appended rows onto an existing cube."""
+    both = pd.concat([c, build_cube(tail)])
+    return (both.groupby(level=CUBE_DIMS, observed=True, sort=True)
+                .agg(hours=("hours", "sum"), rows=("rows", "sum"), last_date=("last_date", "max")))
+
+cube = build_cube(df)
+
+# Cascading filter options: year -> region -> name -> riziv, precomputed from the cube's
+# filter levels so a dropdown change is a dict lookup. Each entry holds the ready-to-send
+# options list and a set for validating the current value.
+def build_filter_index(c):
+    combos = c.index.droplevel(CUBE_DIMS[4:]).unique().to_frame(index=False)
+    idx = {}
+    def put(key, values):
+        vals = sorted(set(values.tolist()))
+        idx[key] = ([{"label":"Alle","value":"Alle"}] + [{"label":v,"value":v} for v in vals], frozenset(vals))
+    for year, gy in combos.groupby("year", observed=True):
+        year = int(year)
+        put(("region", year), gy["region"])
+        for region, gr in [("Alle", gy), *gy.groupby("region", observed=True)]:
+            put(("name", year, region), gr["psychologist_name"])
+            for name, gn in [("Alle", gr), *gr.groupby("psychologist_name", observed=True)]:
+                put(("riziv", year, region, name), gn["riziv_number"])
+    return idx
+
+filter_index = build_filter_index(cube)
+_NO_OPTIONS = ([{"label":"Alle","value":"Alle"}], frozenset())
+
+def filter_options(*key):
+    return filter_index.get(key, _NO_OPTIONS)
+
+# Incremental refresh: polled from the callback path at most every REFRESH_S seconds.
+# Only the rows appended since the last poll are parsed; a replaced file is reloaded in full.
+_refresh_lock = threading.Lock()
+_next_poll = time.monotonic() + REFRESH_S
+
+def refresh_data():
+    """Fold new CSV rows into df/cube and return the data version the callbacks should key on."""
+    global df, cube, filter_index, agreed, _agreed_stat, DATA_VERSION, _next_poll
+    if time.monotonic() < _next_poll or not _refresh_lock.acquire(blocking=False):
+        return DATA_VERSION
+    try:
+        _next_poll = time.monotonic() + REFRESH_S
+        tail = _tail.read_new()
+        if tail is None:
+            _tail.mark()
+            df = load_timesheet(upto=_tail.offset)
+            cube = build_cube(df)
+        elif not tail.empty:
+            df = append_rows(df, tail)
+            cube = fold_cube(cube, tail)
+        if tail is None or not tail.empty:
+            filter_index = build_filter_index(cube)
+        if file_stat(AGREED_CSV) != _agreed_stat:
+            _agreed_stat = file_stat(AGREED_CSV)
+            agreed = load_agreed()
+        DATA_VERSION = data_version(_tail.state, _agreed_stat)
+        return DATA_VERSION
+    finally:
+        _refresh_lock.release()
+
+def cube_slice(year, region, name, riziv):
+    key = tuple(slice(None) if v == "Alle" else v for v in (year, region, name, riziv))
+    try:
+        c = cube.loc[key, :]
+    except (KeyError, TypeError):
+        return cube.iloc[0:0]
+    # .loc drops the filter levels when they are all scalars; the chart levels always remain
+    return c if isinstance(c.index, pd.MultiIndex) else cube.iloc[0:0]
 
 app = Dash(__name__)
 server = app.server
 
-def layout_controls():
+def layout_controls(year):
     return html.Div([
         html.Div([html.Label("RIZIV/KBO nummer"),
-                  dcc.Dropdown(options=[{"label":"Alle","value":"Alle"}] + [{"label":r,"value":r} for r in sorted(df["riziv_number"].unique())],
+                  dcc.Dropdown(options=filter_options("riziv", year, "Alle", "Alle")[0],
                                value="Alle", id="dd-riziv")], style={"width":"22%","display":"inline-block","padding":"0 10px"}),
         html.Div([html.Label("Naam"),
-                  dcc.Dropdown(options=[{"label":"Alle","value":"Alle"}] + [{"label":n,"value":n} for n in sorted(df["psychologist_name"].unique())],
+                  dcc.Dropdown(options=filter_options("name", year, "Alle")[0],
                                value="Alle", id="dd-name")], style={"width":"28%","display":"inline-block","padding":"0 10px"}),
         html.Div([html.Label("Regionaam"),
-                  dcc.Dropdown(options=[{"label":"Alle","value":"Alle"}] + [{"label":r,"value":r} for r in sorted(df["region"].unique())],
+                  dcc.Dropdown(options=filter_options("region", year)[0],
                                value="Alle", id="dd-region")], style={"width":"28%","display":"inline-block","padding":"0 10px"}),
         html.Div([html.Label("Jaar"),
                   dcc.Dropdown(options=[{"label":int(y),"value":int(y)} for y in sorted(df["year"].unique())],
-                               value=int(df["year"].max()), id="dd-year")], style={"width":"12%","display":"inline-block","padding":"0 10px"}),
+                               value=year, id="dd-year")], style={"width":"12%","display":"inline-block","padding":"0 10px"}),
     ])
 
 def kpi_card(label, value):
     return html.Div([html.H4(label, style={"margin":"0"}), html.H2(value, style={"margin":"0"})],
                     style={"display":"inline-block","padding":"12px 18px","border":"1px solid #eee","borderRadius":"8px","marginRight":"12px"})
 
-app.layout = html.Div([
-    html.H1("EPZ Dashboard (demo)"),
-    layout_controls(),
-    html.Div(id="kpis", style={"margin":"16px 0"}),
-    html.Div([dcc.Graph(id="g-uren-per-maand"), dcc.Graph(id="g-tov-overeengekomen")],
-             style={"display":"grid","gridTemplateColumns":"1fr 1fr","gap":"16px"}),
-    html.Div([dcc.Graph(id="g-verdeling-functie"), dcc.Graph(id="g-zorgplaats"), dcc.Graph(id="g-clienttype")],
-             style={"display":"grid","gridTemplateColumns":"1fr 1fr 1fr","gap":"16px","marginTop":"16px"}),
-], style={"fontFamily":"Segoe UI, Arial"})
+def serve_layout():
+    # Built per page load so dropdown options include names that arrived since startup.
+    # The figures are rendered in full once here; filter changes only patch their data.
+    year = int(df["year"].max())
+    s = summarize(year, "Alle", "Alle", "Alle")
+    return html.Div([
+        html.H1("EPZ Dashboard (demo)"),
+        layout_controls(year),
+        html.Div(kpis_from(s), id="kpis", style={"margin":"16px 0"}),
+        dcc.Store(id="monthly-traces", data=monthly_traces(s)),
+        html.Div([dcc.Graph(id="g-uren-per-maand", figure=monthly_figure(s)),
+                  dcc.Graph(id="g-tov-overeengekomen", figure=comparison_figure(s))],
+                 style={"display":"grid","gridTemplateColumns":"1fr 1fr","gap":"16px"}),
+        html.Div([dcc.Graph(id=gid, figure=breakdown_figure(s, dim)) for gid, dim in BREAKDOWNS],
+                 style={"display":"grid","gridTemplateColumns":"1fr 1fr 1fr","gap":"16px","marginTop":"16px"}),
+    ], style={"fontFamily":"Segoe UI, Arial"})
 
 def filter_df(year, region, name, riziv):
     d = df[df["year"]==year]
@@ -51,38 +158,134 @@ def filter_df(year, region, name, riziv):
         d = d[d["riziv_number"]==riziv]
     return d
 
-@app.callback(
-    Output("kpis","children"),
-    Output("g-uren-per-maand","figure"),
-    Output("g-tov-overeengekomen","figure"),
-    Output("g-verdeling-functie","figure"),
-    Output("g-zorgplaats","figure"),
-    Output("g-clienttype","figure"),
-    Input("dd-year","value"), Input("dd-region","value"), Input("dd-name","value"), Input("dd-riziv","value"),
-)
-def update(year, region, name, riziv):
-    d = filter_df(year, region, name, riziv)
-    total_hours = d["hours"].sum()
-    max_functie3 = int((d["function"]=="functie3").sum())
-    functie3_pct = (d[d["function"]=="functie3"]["hours"].sum()/total_hours*100) if total_hours>0 else 0
-    last_update = d["date"].max().strftime("%-d %B %Y") if len(d)>0 else "-"
-    kpis = [kpi_card("Laatste status update", last_update),
-            kpi_card("Totaal uren", f"{int(total_hours)}"),
-            kpi_card("Max functie 3", f"{max_functie3}"),
-            kpi_card("Functie 3 %", f"{functie3_pct:.0f}%")]
-    hours_month = d.groupby(["month","function"])["hours"].sum().reset_index()
-    import plotly.express as px
-    fig1 = px.bar(hours_month, x="month", y="hours", color="function", title="Gepresteerde uren per maand (stacked)")
+FILTERS = [Input("dd-year","value"), Input("dd-region","value"), Input("dd-name","value"), Input("dd-riziv","value")]
+BREAKDOWNS = [("g-verdeling-functie", "function"), ("g-zorgplaats", "care_place"), ("g-clienttype", "client_type")]
+TITLES = {"function": "Naar functie", "care_place": "Naar zorgplaats", "client_type": "Naar clienttype"}
+
+# Everything the outputs need for one filter tuple, as plain lists: cheap to cache and to share
+# between the callbacks below. Results are shared across users and workers; new data gives a
+# new version and a cold cache.
+@memoize(refresh_data)
+def summarize(year, region, name, riziv):
+    c = cube_slice(year, region, name, riziv)
+    by_function = c.groupby(level="function", observed=True)[["hours", "rows"]].sum()
+    total_hours = c["hours"].sum()
+    f3 = by_function.loc["functie3"] if "functie3" in by_function.index else None
     if region != "Alle":
         agreed_val = agreed[(agreed["year"]==year) & (agreed["region"]==region)]["agreed_hours"].sum()
     else:
         agreed_val = agreed[agreed["year"]==year]["agreed_hours"].sum()
-    comp = pd.DataFrame({"type":["Gepresteerd","Overeengekomen"], "uren":[total_hours, agreed_val]})
-    fig2 = px.bar(comp, x="type", y="uren", title="T.o.v. overeengekomen")
-    fig3 = px.bar(d.groupby("function")["hours"].sum().reset_index(), x="function", y="hours", title="Naar functie")
-    fig4 = px.bar(d.groupby("care_place")["hours"].sum().reset_index(), x="care_place", y="hours", title="Naar zorgplaats")
-    fig5 = px.bar(d.groupby("client_type")["hours"].sum().reset_index(), x="client_type", y="hours", title="Naar clienttype")
-    return kpis, fig1, fig2, fig3, fig4, fig5
+    hours_month = c.groupby(level=["month","function"], observed=True)["hours"].sum().reset_index()
+    out = {
+        "last_update": c["last_date"].max().strftime("%-d %B %Y") if len(c)>0 else "-",
+        "total_hours": float(total_hours),
+        "max_functie3": int(f3["rows"]) if f3 is not None else 0,
+        "functie3_pct": float(f3["hours"]/total_hours*100) if (total_hours>0 and f3 is not None) else 0,
+        "agreed": float(agreed_val),
+        "monthly": hours_month.to_dict("list"),
+    }
+    for dim in TITLES:
+        g = by_function["hours"] if dim == "function" else c.groupby(level=dim, observed=True)["hours"].sum()
+        out[dim] = {dim: g.index.tolist(), "hours": g.tolist()}
+    return out
+
+def kpis_from(s):
+    return [kpi_card("Laatste status update", s["last_update"]),
+            kpi_card("Totaal uren", f"{int(s['total_hours'])}"),
+            kpi_card("Max functie 3", f"{s['max_functie3']}"),
+            kpi_card("Functie 3 %", f"{s['functie3_pct']:.0f}%")]
+
+def monthly_traces(s):
+    # px.bar makes one trace per function, in order of first appearance
+    return list(dict.fromkeys(s["monthly"]["function"]))
+
+def monthly_figure(s):
+    # categorical like the cube level it came from, so an empty slice still gives zero traces
+    monthly = pd.DataFrame(s["monthly"]).astype({"month": "category", "function": "category"})
+    return px.bar(monthly, x="month", y="hours", color="function",
+                  title="Gepresteerde uren per maand (stacked)")
+
+def comparison_figure(s):
+    comp = pd.DataFrame({"type":["Gepresteerd","Overeengekomen"], "uren":[s["total_hours"], s["agreed"]]})
+    return px.bar(comp, x="type", y="uren", title="T.o.v. overeengekomen")
+
+def breakdown_figure(s, dim):
+    return px.bar(pd.DataFrame(s[dim]), x=dim, y="hours", title=TITLES[dim])
+
+# Narrow the dependent dropdowns and reset a selection the new parent no longer contains.
+# Dash holds the figure callbacks until this one has settled the values.
+@app.callback(Output("dd-region","options"), Output("dd-name","options"), Output("dd-riziv","options"),
+              Output("dd-region","value"), Output("dd-name","value"), Output("dd-riziv","value"),
+              *FILTERS, prevent_initial_call=True)
+def cascade_filters(year, region, name, riziv):
+    regions, region_set = filter_options("region", year)
+    new_region = region if region in region_set else "Alle"
+    names, name_set = filter_options("name", year, new_region)
+    new_name = name if name in name_set else "Alle"
+    rizivs, riziv_set = filter_options("riziv", year, new_region, new_name)
+    new_riziv = riziv if riziv in riziv_set else "Alle"
+    # only the lists below the changed dropdown can differ
+    level = {"dd-year": 0, "dd-region": 1, "dd-name": 2}.get(ctx.triggered_id, 3)
+    return (regions if level < 1 else no_update,
+            names if level < 2 else no_update,
+            rizivs if level < 3 else no_update,
+            *(new if new != old else no_update
+              for new, old in ((new_region, region), (new_name, name), (new_riziv, riziv))))
+
+# One callback per output group so each is computed and sent on its own. The figures
+# already hold their layout and template, so a filter change only patches trace data.
+@app.callback(Output("kpis","children"), *FILTERS, prevent_initial_call=True)
+def update_kpis(year, region, name, riziv):
+    return kpis_from(summarize(year, region, name, riziv))
+
+@app.callback(Output("g-uren-per-maand","figure"), Output("monthly-traces","data"),
+              *FILTERS, State("monthly-traces","data"), prevent_initial_call=True)
+def update_monthly(year, region, name, riziv, shown):
+    s = summarize(year, region, name, riziv)
+    traces = monthly_traces(s)
+    if traces != shown:
+        # different set of functions: the trace list itself changes, send the full figure
+        return monthly_figure(s), traces
+    m = s["monthly"]
+    fig = Patch()
+    for i, fn in enumerate(traces):
+        fig["data"][i]["x"] = [x for x, f in zip(m["month"], m["function"]) if f == fn]
+        fig["data"][i]["y"] = [y for y, f in zip(m["hours"], m["function"]) if f == fn]
+    return fig, no_update
+
+@app.callback(Output("g-tov-overeengekomen","figure"), *FILTERS, prevent_initial_call=True)
+def update_comparison(year, region, name, riziv):
+    s = summarize(year, region, name, riziv)
+    fig = Patch()
+    fig["data"][0]["y"] = [s["total_hours"], s["agreed"]]
+    return fig
+
+@app.callback(*(Output(gid, "figure") for gid, _ in BREAKDOWNS), *FILTERS, prevent_initial_call=True)
+def update_breakdowns(year, region, name, riziv):
+    s = summarize(year, region, name, riziv)
+    out = []
+    for _, dim in BREAKDOWNS:
+        fig = Patch()
+        fig["data"][0]["x"] = s[dim][dim]
+        fig["data"][0]["y"] = s[dim]["hours"]
+        out.append(fig)
+    return out
+
+# Payload size and server time of every callback round trip (DASH_LOG_PAYLOAD=1)
+if LOG_PAYLOAD:
+    @server.before_request
+    def _start_timer():
+        g.t0 = time.perf_counter()
+
+    @server.after_request
+    def _log_payload(resp):
+        if request.path.endswith("/_dash-update-component"):
+            outputs = (request.get_json(silent=True) or {}).get("output", "")
+            _log.info("%s %d B %.1f ms", outputs.strip("."), resp.content_length or len(resp.get_data()),
+                      (time.perf_counter() - g.t0) * 1000)
+        return resp
+
+app.layout = serve_layout
 
 if __name__ == "__main__":
     app.run_server(debug=True)
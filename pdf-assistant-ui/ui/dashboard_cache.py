@@ -0,0 +1,136 @@
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from pathlib import Path
+from typing import Callable
+
+# ==================== Config ====================
+DASH_CACHE_SIZE = int(os.getenv("DASH_CACHE_SIZE", "256"))
+DASH_CACHE_MEM  = int(os.getenv("DASH_CACHE_MEM", "64"))
+DASH_CACHE_TTL  = float(os.getenv("DASH_CACHE_TTL", str(24 * 3600)))
+# Directory shared by the workers of one deployment; empty (default) = in-process only.
+# It must be private to the service user: entries are pickles.
+DASH_CACHE_DIR  = os.getenv("DASH_CACHE_DIR", "")
+
+
+class _ResultCache:
+    """Bounded LRU of callback results: a small in-process tier in front of a directory of pickles.
+
+    File names start with the data version, so results computed on older
+    data are never served; they age out through the TTL and size cap like
+    any other entry (another worker may still be on that version). LRU
+    order on disk is the file mtime, bumped on every hit.
+
+    The directory is only used when it is owned by this user and not
+    accessible to group/other, since loading a planted pickle runs code.
+    """
+    def __init__(self, size: int, mem_size: int, ttl_s: float, directory: str = ""):
+        self._size = size
+        self._mem_size = mem_size
+        self._ttl_s = ttl_s
+        self._lock = threading.Lock()
+        self._mem: "OrderedDict[str, object]" = OrderedDict()
+        self._dir = None
+        if directory:
+            try:
+                os.makedirs(directory, mode=0o700, exist_ok=True)
+                st = os.stat(directory)
+            except OSError:
+                return
+            # Refuse a directory someone else could write pickles into
+            if st.st_uid == os.getuid() and not st.st_mode & 0o077:
+                self._dir = Path(directory)
+
+    def _path(self, key: str) -> Path:
+        return self._dir / f"{key}.pkl"
+
+    def _remember(self, key: str, value) -> None:
+        self._mem[key] = value
+        self._mem.move_to_end(key)
+        while len(self._mem) > self._mem_size:
+            self._mem.popitem(last=False)
+
+    def get(self, key: str):
+        with self._lock:
+            if key in self._mem:
+                self._mem.move_to_end(key)
+                return self._mem[key]
+        if self._dir is None:
+            return None
+        p = self._path(key)
+        try:
+            with open(p, "rb") as fh:
+                value = pickle.load(fh)
+            os.utime(p)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+        with self._lock:
+            self._remember(key, value)
+        return value
+
+    def put(self, key: str, value) -> None:
+        with self._lock:
+            self._remember(key, value)
+        if self._dir is None:
+            return
+        fd, tmp = tempfile.mkstemp(dir=self._dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                pickle.dump(value, fh, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, self._path(key))
+        except OSError:
+            Path(tmp).unlink(missing_ok=True)
+            return
+        self._prune()
+
+    def _prune(self) -> None:
+        cutoff = time.time() - self._ttl_s
+        entries = []
+        for p in self._dir.glob("*.pkl"):
+            try:
+                mtime = p.stat().st_mtime
+            except OSError:
+                continue
+            if mtime < cutoff:
+                p.unlink(missing_ok=True)
+            else:
+                entries.append((mtime, p))
+        entries.sort()
+        for _, p in entries[:max(0, len(entries) - self._size)]:
+            p.unlink(missing_ok=True)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._mem.clear()
+        if self._dir is not None:
+            for p in self._dir.glob("*.pkl"):
+                p.unlink(missing_ok=True)
+
+
+_CACHE = _ResultCache(DASH_CACHE_SIZE, DASH_CACHE_MEM, DASH_CACHE_TTL, DASH_CACHE_DIR)
+
+def memoize(version: Callable[[], str]):
+    """Memoize a callback on its (JSON-serialisable) arguments and the current data version."""
+    def deco(fn):
+        @wraps(fn)
+        def wrapper(*args):
+            ver = version()
+            digest = hashlib.sha256(json.dumps([fn.__name__, *args], default=str).encode("utf-8")).hexdigest()
+            key = f"{ver}-{digest[:32]}"
+            hit = _CACHE.get(key)
+            if hit is not None:
+                return hit
+            out = fn(*args)
+            _CACHE.put(key, out)
+            return out
+        return wrapper
+    return deco
+
+def clear_result_cache() -> None:
+    _CACHE.clear()
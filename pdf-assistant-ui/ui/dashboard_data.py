@@ -0,0 +1,289 @@
+"""Columnar data source for the dashboard.
+
+The timesheet CSV is converted once to a Parquet sidecar with dictionary
+encoded (categorical) string columns, a typed date and the derived
+year/month_name columns. Later starts read the sidecar; it is rebuilt
+whenever the CSV is newer or has grown past the bytes it was built from.
+Without pyarrow everything falls back to the CSV.
+With DASH_ARROW_MMAP=1 the sidecar is an uncompressed Arrow IPC file that is
+memory-mapped instead, so worker processes share one copy of the columns.
+
+    python pdf-assistant-ui/ui/dashboard_data.py --report
+"""
+import hashlib
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+TIMESHEET_CSV = os.getenv("DASH_TIMESHEET_CSV", "pdf-assistant-ui/raw_data/epz_timesheet_demo.csv")
+AGREED_CSV    = os.getenv("DASH_AGREED_CSV", "pdf-assistant-ui/raw_data/epz_agreed_hours.csv")
+USE_PARQUET   = os.getenv("DASH_PARQUET", "1").lower() in ("1", "true", "yes")
+# Uncompressed Arrow IPC sidecar read through a memory map: the column buffers are file-backed
+# pages that every worker process on the host shares instead of each holding its own copy.
+USE_MMAP      = os.getenv("DASH_ARROW_MMAP", "").lower() in ("1", "true", "yes")
+
+CATEGORY_COLS = ["region", "psychologist_name", "riziv_number", "function", "care_place", "client_type"]
+# Schema metadata key: how many CSV bytes a sidecar was built from
+_COVERS_KEY = b"epz_csv_bytes"
+
+
+def _parquet_path(csv_path: str) -> Path:
+    return Path(csv_path).with_suffix(".parquet")
+
+def _arrow_path(csv_path: str) -> Path:
+    return Path(csv_path).with_suffix(".arrow")
+
+def _sidecar_path(csv_path: str) -> Path:
+    return _arrow_path(csv_path) if USE_MMAP else _parquet_path(csv_path)
+
+def _have_pyarrow() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+def prepare_timesheet(d: pd.DataFrame) -> pd.DataFrame:
+    """Typed columns plus the derived year/month_name used by the dashboard."""
+    for c in CATEGORY_COLS:
+        if c in d.columns and d[c].dtype != "category":
+            d[c] = d[c].astype("category")
+    d["hours"] = d["hours"].astype("float64")
+    # strftime per distinct date, not per row
+    d["month_name"] = d["date"].map(dict(zip(u := d["date"].unique(), pd.DatetimeIndex(u).strftime("%b")))).astype("category")
+    d["year"] = d["date"].dt.year.astype("int16")
+    return d
+
+def read_timesheet_csv(csv_path: str = TIMESHEET_CSV, upto: int | None = None) -> pd.DataFrame:
+    """Parse the timesheet; with ``upto`` only its first ``upto`` bytes (a CsvTail offset)."""
+    src = csv_path
+    if upto is not None:
+        with open(csv_path, "rb") as fh:
+            src = io.BytesIO(fh.read(upto))
+    return prepare_timesheet(pd.read_csv(src, parse_dates=["date"], dtype={c: "category" for c in CATEGORY_COLS}))
+
+def _write_sidecar(d: pd.DataFrame, path: Path, covers: int | None = None) -> bool:
+    """Write ``d`` to ``path`` atomically; False when it was not written (no pyarrow, I/O, unconvertible column)."""
+    try:
+        import pyarrow as pa
+    except ImportError:
+        return False
+    tmp = None
+    try:
+        # unique temp name: several workers may rebuild the same sidecar at once
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=path.name + ".", suffix=".tmp")
+        os.close(fd)
+        table = pa.Table.from_pandas(d, preserve_index=False)
+        if covers is not None:
+            table = table.replace_schema_metadata({**(table.schema.metadata or {}), _COVERS_KEY: str(covers).encode()})
+        if path.suffix == ".arrow":
+            from pyarrow import feather
+            feather.write_feather(table, tmp, compression="uncompressed")
+        else:
+            import pyarrow.parquet as pq
+            pq.write_table(table, tmp)
+        os.replace(tmp, path)
+        return True
+    except (OSError, pa.ArrowException):
+        if tmp:
+            Path(tmp).unlink(missing_ok=True)
+        return False
+
+def _sidecar_covers(path: Path) -> int | None:
+    """CSV byte count the sidecar was built from, None if unknown."""
+    import pyarrow as pa
+    try:
+        if path.suffix == ".arrow":
+            meta = pa.ipc.open_file(pa.memory_map(str(path))).schema.metadata
+        else:
+            import pyarrow.parquet as pq
+            meta = pq.read_schema(path).metadata
+    except (OSError, pa.ArrowException):
+        return None
+    raw = (meta or {}).get(_COVERS_KEY)
+    return int(raw) if raw else None
+
+def read_arrow_mmap(path: Path) -> pd.DataFrame:
+    """Frame over a memory-mapped Arrow file; numeric and date columns stay views of the mapping."""
+    import pyarrow as pa
+    table = pa.ipc.open_file(pa.memory_map(str(path))).read_all()
+    return table.to_pandas(split_blocks=True, self_destruct=True)
+
+def _read_sidecar(path: Path) -> pd.DataFrame:
+    return read_arrow_mmap(path) if path.suffix == ".arrow" else pd.read_parquet(path)
+
+def convert_sidecar(csv_path: str = TIMESHEET_CSV, upto: int | None = None) -> pd.DataFrame:
+    d = read_timesheet_csv(csv_path, upto)
+    path = _sidecar_path(csv_path)
+    written = _write_sidecar(d, path, upto)
+    # the mapped copy is what later starts and the other workers will use;
+    # if writing failed, whatever is at path is stale: keep the CSV frame
+    return _read_sidecar(path) if USE_MMAP and written else d
+
+def load_timesheet(csv_path: str = TIMESHEET_CSV, upto: int | None = None) -> pd.DataFrame:
+    """Full load. Pass ``upto=tail.offset`` right after ``tail.mark()`` so the frame holds exactly
+    the rows before the mark and anything appended meanwhile is left for ``tail.read_new()``."""
+    if not ((USE_PARQUET or USE_MMAP) and _have_pyarrow()):
+        return read_timesheet_csv(csv_path, upto)
+    path = _sidecar_path(csv_path)
+    if (path.exists() and path.stat().st_mtime >= Path(csv_path).stat().st_mtime
+            and (upto is None or _sidecar_covers(path) == upto)):
+        return _read_sidecar(path)
+    return convert_sidecar(csv_path, upto)
+
+def load_agreed(csv_path: str = AGREED_CSV) -> pd.DataFrame:
+    return pd.read_csv(csv_path)
+
+def data_version(*parts) -> str:
+    """Short fingerprint of whatever identifies the loaded data (file stats, consumed offsets)."""
+    return hashlib.sha256(repr(parts).encode("utf-8")).hexdigest()[:16]
+
+def file_stat(path: str) -> tuple:
+    try:
+        st = os.stat(path)
+        return st.st_ino, st.st_mtime_ns, st.st_size
+    except OSError:
+        return ()
+
+
+# ==================== Incremental refresh ====================
+class CsvTail:
+    """Remembers how far a CSV has been consumed so appended rows can be parsed on their own."""
+    def __init__(self, path: str):
+        self.path = path
+        self.ino = None
+        self.offset = 0
+        self.header = b""
+
+    @property
+    def state(self) -> tuple:
+        return self.path, self.ino, self.offset
+
+    def mark(self) -> None:
+        """Record the end of the last complete line; load the file up to ``offset`` afterwards."""
+        st = os.stat(self.path)
+        with open(self.path, "rb") as fh:
+            self.header = fh.readline()
+            # stop at the last complete line; a half-written row is picked up next time
+            fh.seek(max(0, st.st_size - 65536))
+            block = fh.read(st.st_size - fh.tell())
+        cut = block.rfind(b"\n")
+        self.offset = st.st_size - len(block) + cut + 1 if cut >= 0 else st.st_size
+        self.ino = st.st_ino
+
+    def read_new(self) -> pd.DataFrame | None:
+        """Rows appended since the last call (possibly empty).
+
+        None means the file was replaced, truncated or got a new header,
+        and the caller has to do a full reload.
+        """
+        try:
+            st = os.stat(self.path)
+            if st.st_ino != self.ino or st.st_size < self.offset:
+                return None
+            if st.st_size == self.offset:
+                return _EMPTY
+            with open(self.path, "rb") as fh:
+                if fh.read(len(self.header)) != self.header:
+                    return None
+                fh.seek(self.offset)
+                chunk = fh.read(st.st_size - self.offset)
+        except OSError:
+            return _EMPTY
+        cut = chunk.rfind(b"\n") + 1
+        if cut == 0:
+            return _EMPTY
+        self.offset += cut
+        return prepare_timesheet(pd.read_csv(io.BytesIO(self.header + chunk[:cut]), parse_dates=["date"],
+                                             dtype={c: "category" for c in CATEGORY_COLS}))
+
+_EMPTY = pd.DataFrame()
+
+def append_rows(d: pd.DataFrame, tail: pd.DataFrame) -> pd.DataFrame:
+    """Concatenate new rows onto the frame, widening categories instead of falling back to object dtype.
+
+    The result is a new, process-private frame: with DASH_ARROW_MMAP a worker stops
+    sharing the mapped columns after its first append, until a full reload maps the
+    rebuilt sidecar again.
+    """
+    if tail.empty:
+        return d
+    cats = {}
+    for c in d.columns:
+        if isinstance(d[c].dtype, pd.CategoricalDtype):
+            extra = tail[c].cat.categories.difference(d[c].cat.categories)
+            dtype = pd.CategoricalDtype(d[c].cat.categories.append(extra))
+            cats[c] = dtype
+    d = d.astype(cats)
+    tail = tail[d.columns].astype(cats)
+    return pd.concat([d, tail], ignore_index=True)
+
+
+# ==================== Startup report ====================
+def _rss_mb() -> float:
+    # VmHWM belongs to this process image; ru_maxrss would carry over the parent's peak across exec
+    try:
+        with open("/proc/self/status") as fh:
+            for line in fh:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+def _measure(mode: str, csv_path: str) -> dict:
+    t0 = time.perf_counter()
+    if mode == "csv":
+        d = read_timesheet_csv(csv_path)
+    elif mode == "arrow":
+        d = read_arrow_mmap(_arrow_path(csv_path))
+    else:
+        d = pd.read_parquet(_parquet_path(csv_path))
+    return {
+        "mode": mode,
+        "rows": len(d),
+        "load_s": round(time.perf_counter() - t0, 3),
+        "frame_mb": round(d.memory_usage(deep=True).sum() / 1e6, 1),
+        "peak_rss_mb": round(_rss_mb(), 1),
+    }
+
+def main(argv: list[str]) -> int:
+    import argparse
+    ap = argparse.ArgumentParser(description="Compare CSV and Parquet startup for the dashboard timesheet")
+    ap.add_argument("--csv", default=TIMESHEET_CSV)
+    ap.add_argument("--report", action="store_true", help="measure both paths in fresh processes")
+    ap.add_argument("--measure", choices=["csv", "parquet", "arrow"], help=argparse.SUPPRESS)
+    args = ap.parse_args(argv)
+
+    if args.measure:
+        print(json.dumps(_measure(args.measure, args.csv)))
+        return 0
+    tail = CsvTail(args.csv)
+    tail.mark()
+    d = read_timesheet_csv(args.csv, tail.offset)
+    for path in (_parquet_path(args.csv), _arrow_path(args.csv)):
+        if not _write_sidecar(d, path, tail.offset):
+            print(f"could not write {path} (pyarrow missing, I/O error or a column Arrow cannot convert)", file=sys.stderr)
+            return 1
+    if not args.report:
+        print(f"wrote {_parquet_path(args.csv)} and {_arrow_path(args.csv)}")
+        return 0
+    for mode in ("csv", "parquet", "arrow"):
+        out = subprocess.run([sys.executable, __file__, "--csv", args.csv, "--measure", mode],
+                             check=True, capture_output=True, text=True).stdout
+        r = json.loads(out)
+        print(f"{r['mode']:>8}: {r['rows']} rows, load {r['load_s']} s, frame {r['frame_mb']} MB, peak RSS {r['peak_rss_mb']} MB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
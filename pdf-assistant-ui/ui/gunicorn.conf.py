@@ -0,0 +1,23 @@
+import gc
+import multiprocessing
+import os
+
+# ==================== Config ====================
+wsgi_app    = "wsgi:application"
+pythonpath  = os.path.dirname(os.path.abspath(__file__))
+bind        = f"0.0.0.0:{os.getenv('PORT', '8050')}"
+workers     = int(os.getenv("DASH_WORKERS", str(min(4, multiprocessing.cpu_count()))))
+threads     = int(os.getenv("DASH_THREADS", "2"))
+timeout     = int(os.getenv("DASH_TIMEOUT", "60"))
+# Import dashboard.py (load + aggregate) once in the master; workers inherit it through fork
+preload_app = True
+
+# Memory-map the Arrow sidecar so the column buffers are shared page cache, including for
+# workers that re-load after an incremental refresh found a replaced file.
+os.environ.setdefault("DASH_ARROW_MMAP", "1")
+
+
+def pre_fork(server, worker):
+    # Move everything loaded so far out of the collector's reach: a GC pass in a worker
+    # would otherwise write to those object headers and un-share their pages.
+    gc.freeze()
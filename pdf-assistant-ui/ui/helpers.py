@@ -1,6 +1,18 @@
+import json
 import os
 import re
+import random
+import socket
+import threading
+import time
+from http.cookiejar import DefaultCookiePolicy
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.connection import allowed_gai_family
+
+from http_metrics import record_http
 
 # ==================== Validators ====================
 NAME_RE   = re.compile(r"^[A-Za-zÀ-ÖØ-öø-ÿ' -]{2,40}$")
@@ -12,6 +24,146 @@ EMAIL_RE  = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
 API_BASE           = os.getenv("API_BASE_URL", "http://localhost:8000")
 USER_ID_HEADER     = os.getenv("USER_ID_HEADER", "X-User-Id")
 FORM_SUBMIT_PATH = os.getenv("FORM_SUBMIT_PATH", "/forms/submit")
+HTTP_POOL_SIZE     = int(os.getenv("UI_HTTP_POOL_SIZE", "20"))
+HTTP_RETRIES       = int(os.getenv("UI_HTTP_RETRIES", "2"))
+HTTP_BACKOFF_S     = float(os.getenv("UI_HTTP_BACKOFF", "0.3"))
+HTTP_BACKOFF_MAX_S = float(os.getenv("UI_HTTP_BACKOFF_MAX", "5"))
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+RETRY_STATUSES     = frozenset({502, 503, 504})
+
+
+# ==================== Connection pool ====================
+# One Session per process: Streamlit re-runs scripts in threads of the same
+# process, so every user session reuses the same keep-alive connections.
+_POOL_STATS = {"checkouts": 0, "new_connections": 0, "retries": 0}
+_POOL_LOCK = threading.Lock()
+
+def _count(key: str, n: int = 1) -> None:
+    with _POOL_LOCK:
+        _POOL_STATS[key] += n
+
+class _CountingPoolMixin:
+    # _get_conn hands out a pooled connection or falls back to _new_conn.
+    def _get_conn(self, timeout=None):
+        _count("checkouts")
+        return super()._get_conn(timeout=timeout)
+
+    def _new_conn(self):
+        _count("new_connections")
+        return super()._new_conn()
+
+# ==================== Per-phase timing ====================
+# _req opens a timing dict for the calling thread; the connection hooks below add
+# the phases they see to it. requests runs the whole call on that thread.
+_TIMING = threading.local()
+
+def _phase(name: str, seconds: float) -> None:
+    t = getattr(_TIMING, "cur", None)
+    if t is not None:
+        t[name] = t.get(name, 0.0) + seconds
+
+def _setup_s() -> float:
+    t = getattr(_TIMING, "cur", None) or {}
+    return t.get("dns", 0.0) + t.get("connect", 0.0) + t.get("tls", 0.0)
+
+class _TimedConnectionMixin:
+    def _new_conn(self):
+        # Resolve once (timed), then connect to each address in turn as create_connection would.
+        host = self._dns_host
+        t0 = time.perf_counter()
+        try:
+            infos = socket.getaddrinfo(host, self.port, allowed_gai_family(), socket.SOCK_STREAM)
+        except OSError:
+            infos = []
+        t1 = time.perf_counter()
+        _phase("dns", t1 - t0)
+        if not infos:
+            return super()._new_conn()  # let urllib3 raise its usual resolution error
+        err = None
+        try:
+            for *_, addr in infos:
+                self._dns_host = addr[0]
+                try:
+                    return super()._new_conn()
+                except Exception as e:
+                    err = e
+            raise err
+        finally:
+            self._dns_host = host
+            _phase("connect", time.perf_counter() - t1)
+
+    def request(self, *args, **kwargs):
+        # Sending headers + body; a lazy connect inside it is already counted above.
+        before, t0 = _setup_s(), time.perf_counter()
+        try:
+            return super().request(*args, **kwargs)
+        finally:
+            _phase("send", max(0.0, time.perf_counter() - t0 - (_setup_s() - before)))
+
+    def getresponse(self):
+        # Waiting for the status line and headers: backend processing time as the client sees it.
+        t0 = time.perf_counter()
+        try:
+            return super().getresponse()
+        finally:
+            now = time.perf_counter()
+            _phase("ttfb", now - t0)
+            t = getattr(_TIMING, "cur", None)
+            if t is not None:
+                t["_headers_at"] = now
+
+class _TimedHTTPConnection(_TimedConnectionMixin, HTTPConnection):
+    pass
+
+class _TimedHTTPSConnection(_TimedConnectionMixin, HTTPSConnection):
+    def connect(self):
+        before, t0 = _setup_s(), time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            # whatever connect() spent beyond DNS + TCP is the TLS handshake
+            _phase("tls", max(0.0, time.perf_counter() - t0 - (_setup_s() - before)))
+
+class _CountingHTTPPool(_CountingPoolMixin, HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+class _CountingHTTPSPool(_CountingPoolMixin, HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+class _PooledAdapter(HTTPAdapter):
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {"http": _CountingHTTPPool, "https": _CountingHTTPSPool}
+
+_SESSION: requests.Session | None = None
+_SESSION_LOCK = threading.Lock()
+
+def http_session() -> requests.Session:
+    """Process-wide keep-alive session shared by all Streamlit sessions."""
+    global _SESSION
+    if _SESSION is None:
+        with _SESSION_LOCK:
+            if _SESSION is None:
+                s = requests.Session()
+                # Shared by every user: never keep a Set-Cookie, or it would be replayed on others' requests
+                s.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+                adapter = _PooledAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE, max_retries=0)
+                s.mount("http://", adapter)
+                s.mount("https://", adapter)
+                _SESSION = s
+    return _SESSION
+
+def http_pool_stats() -> dict:
+    """Connection reuse counters: a hit is a checkout served by an idle pooled connection."""
+    with _POOL_LOCK:
+        stats = dict(_POOL_STATS)
+    stats["hits"] = max(stats["checkouts"] - stats["new_connections"], 0)
+    stats["misses"] = stats["new_connections"]
+    return stats
+
+def _backoff_delay(attempt: int) -> float:
+    # "Full jitter": spread retries uniformly so concurrent reruns don't retry in lockstep.
+    return random.uniform(0, min(HTTP_BACKOFF_MAX_S, HTTP_BACKOFF_S * (2 ** attempt)))
 
 
 # ==================== HTTP core ====================
@@ -31,44 +183,315 @@ def _req(
     connect_timeout = float(connect_timeout_s if connect_timeout_s is not None else float(os.getenv("UI_CONNECT_TIMEOUT", "10")))
     timeouts = (connect_timeout, read_timeout)
 
+    retries = HTTP_RETRIES if method.upper() in IDEMPOTENT_METHODS else 0
+
+    timing: dict = {}
+    _TIMING.cur = timing
+    t0 = time.perf_counter()
+    try:
+        r = _send(method, url, headers, timeouts, retries, **kwargs)
+    finally:
+        _TIMING.cur = None
+    _finish_timing(r, method.upper(), path, timing, t0, bool(kwargs.get("stream")))
+    if user_id and getattr(r, "status_code", 0) == 403:
+        # The user's rights changed since the access index was loaded: reload it on the next lookup
+        invalidate_access_index()
+    return r
+
+def _send(method: str, url: str, headers: dict, timeouts: tuple, retries: int, **kwargs):
+    for attempt in range(retries + 1):
+        try:
+            r = http_session().request(method, url, headers=headers, timeout=timeouts, **kwargs)
+        except requests.ConnectionError as e:
+            if attempt < retries:
+                _count("retries")
+                time.sleep(_backoff_delay(attempt))
+                continue
+            return _network_error(e)
+        except requests.RequestException as e:
+            return _network_error(e)
+        if r.status_code in RETRY_STATUSES and attempt < retries:
+            r.close()
+            _count("retries")
+            time.sleep(_backoff_delay(attempt))
+            continue
+        return r
+
+def _finish_timing(r, method: str, path: str, timing: dict, t0: float, stream: bool) -> None:
+    """Complete the phase timings of one _req call, attach them as r.timing and record them."""
+    end = time.perf_counter()
+    headers_at = timing.pop("_headers_at", None)
+    timing["total"] = end - t0
+    status = getattr(r, "status_code", 0)
+    pending = stream and bool(status)
+    if pending:
+        # the body is read later by the caller; only its announced size is known here
+        length = (getattr(r, "headers", {}) or {}).get("Content-Length")
+        timing["bytes"] = int(length) if length and length.isdigit() else None
+    else:
+        if headers_at is not None:
+            timing["download"] = end - headers_at
+        timing["bytes"] = len(r.content) if status else 0
+    for k, v in timing.items():
+        if isinstance(v, float):
+            timing[k] = round(v, 6)
+    try:
+        r.timing = timing
+    except AttributeError:
+        pass
+    if pending:
+        r._timing_pending = (method, path, status, end)  # recorded by finish_stream_timing
+    else:
+        record_http(method, path, status, timing)
+
+def finish_stream_timing(r) -> None:
+    """Record a stream=True call once the caller is done with its body (EOF, break or close).
+
+    ``download`` runs from the headers to now and ``total`` grows by it; ``bytes``
+    is what was actually read off the connection. Later calls are no-ops.
+    """
+    pending = getattr(r, "_timing_pending", None)
+    if pending is None:
+        return
+    r._timing_pending = None
+    method, path, status, headers_end = pending
+    timing = r.timing
+    download = time.perf_counter() - headers_end
+    timing["download"] = round(download, 6)
+    timing["total"] = round(timing["total"] + download, 6)
+    try:
+        timing["bytes"] = int(r.raw.tell())
+    except (AttributeError, TypeError, ValueError):
+        pass
+    record_http(method, path, status, timing)
+
+def _network_error(e: Exception):
+    class _R:
+        ok=False; status_code=0; text=f"Network error: {e}"
+        def json(self): return {"error": self.text}
+    return _R()
+
+# ==================== Streaming responses ====================
+STREAM_CONTENT_TYPES = ("text/event-stream", "application/x-ndjson", "application/jsonl", "application/stream+json")
+
+def is_event_stream(r) -> bool:
+    ctype = (getattr(r, "headers", {}) or {}).get("Content-Type", "")
+    return ctype.split(";")[0].strip().lower() in STREAM_CONTENT_TYPES
+
+def _parse_event_data(raw: str):
+    try:
+        return json.loads(raw)
+    except ValueError:
+        return {"text": raw}
+
+def _event_name(default: str, data) -> str:
+    if isinstance(data, dict):
+        return str(data.get("event") or data.get("type") or default)
+    return default
+
+def iter_stream_events(r):
+    """Yield (event, data) pairs from an SSE or NDJSON response opened with stream=True.
+
+    The call's timings are recorded when the stream ends or the generator is closed.
+    """
     try:
-        return requests.request(method, url, headers=headers, timeout=timeouts, **kwargs)
-    except requests.RequestException as e:
-        class _R:
-            ok=False; status_code=0; text=f"Network error: {e}"
-            def json(self): return {"error": self.text}
-        return _R()
+        yield from _stream_events(r)
+    finally:
+        finish_stream_timing(r)
+
+def _stream_events(r):
+    ctype = r.headers.get("Content-Type", "").split(";")[0].strip().lower()
+    lines = r.iter_lines(decode_unicode=True)
+    if ctype != "text/event-stream":
+        for line in lines:
+            if line and line.strip():
+                data = _parse_event_data(line)
+                yield _event_name("message", data), data
+        return
+
+    event, buf = None, []
+    for line in lines:
+        if line is None:
+            continue
+        if line == "":
+            if buf:
+                data = _parse_event_data("\n".join(buf))
+                yield event or _event_name("message", data), data
+            event, buf = None, []
+        elif line.startswith(":"):
+            continue  # SSE comment / keep-alive
+        elif line.startswith("event:"):
+            event = line[6:].strip()
+        elif line.startswith("data:"):
+            buf.append(line[5:][1:] if line[5:6] == " " else line[5:])
+    if buf:
+        data = _parse_event_data("\n".join(buf))
+        yield event or _event_name("message", data), data
+
+TOKEN_EVENTS = ("token", "delta", "answer_delta", "chunk")
+
+def apply_answer_event(res: dict, event: str, data) -> str | None:
+    """Fold one streamed event into a QUERY_PATH-shaped result dict; return the part that changed."""
+    d = data if isinstance(data, dict) else {}
+    if event in TOKEN_EVENTS:
+        piece = d.get("text") or d.get("delta") or d.get("token") or ""
+        res["answer"] = (res.get("answer") or "") + str(piece)
+        return "answer"
+    if event == "answer":
+        res["answer"] = d.get("answer", d.get("text", ""))
+        return "answer"
+    if event == "verification":
+        res["verification"] = d.get("verification", d)
+        return "verification"
+    if event == "citations":
+        res["citations"] = data if isinstance(data, list) else d.get("citations") or []
+        return "citations"
+    if event == "followups":
+        res["followups"] = d.get("followups", d)
+        return "followups"
+    if event == "error":
+        res["error"] = d.get("error") or d.get("detail") or d.get("text") or "stream error"
+        return "error"
+    if event in ("done", "final", "result", "meta", "message"):
+        for k, v in d.items():
+            if k not in ("event", "type"):
+                res[k] = v
+        return "done"
+    return None
 
 # ==================== Admin-key lookup for UI ====================
 def _get_admin_api_key() -> str | None:
     return os.getenv("UI_ADMIN_API_KEY") or os.getenv("ADMIN_API_KEY")
 
-def fetch_user_access_via_admin(user_id: str) -> dict:
-    admin_key = _get_admin_api_key()
-    if not admin_key:
-        return {"error": "NO_ADMIN_KEY"}
-    r = _req("GET", "/admin/keys", headers={"X-API-Key": admin_key})
-    if not getattr(r, "ok", False):
-        return {"error": f"HTTP_{getattr(r,'status_code',0)}", "detail": getattr(r, "text", "")}
-    data = r.json() or {}
-    items = data.get("keys") or []
-    matches = [it for it in items if it.get("user_id") == user_id and bool(it.get("enabled", True))]
+ACCESS_INDEX_TTL_S          = float(os.getenv("UI_ACCESS_INDEX_TTL", "60"))
+ACCESS_INDEX_MISS_REFRESH_S = float(os.getenv("UI_ACCESS_INDEX_MISS_REFRESH", "5"))
+
+def _merge_access(items: list) -> dict:
     rights = set(); role = None
-    for it in matches:
+    for it in items:
         rts = set(it.get("rights") or [])
         rights |= rts
         if it.get("role") == "admin" or "*" in rts:
             role = "admin"
-    if role != "admin" and matches:
+    if role != "admin" and items:
         role = "user"
     return {
         "role": role,
         "rights": sorted(list(rights)),
         "can_upload": ("*" in rights) or ("upload" in rights),
         "can_query":  ("*" in rights) or ("query" in rights),
-        "matches": len(matches),
+        "matches": len(items),
     }
 
+class _AccessIndex:
+    """Process-wide user_id -> merged access index built from /admin/keys.
+
+    Refreshed in a background thread every ACCESS_INDEX_TTL_S using a
+    conditional GET, so a login is a dict lookup instead of a download.
+    Refreshes are single-flight: sessions that need one while another is in
+    progress wait for it and reuse its result.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._by_user: dict[str, dict] = {}
+        self._etag: str | None = None
+        self._loaded_at = 0.0
+        self._error: dict | None = None
+        self._worker: threading.Thread | None = None
+
+    def refresh(self, force: bool = False) -> dict | None:
+        admin_key = _get_admin_api_key()
+        if not admin_key:
+            return {"error": "NO_ADMIN_KEY"}
+        headers = {"X-API-Key": admin_key}
+        with self._lock:
+            if self._etag and not force:
+                headers["If-None-Match"] = self._etag
+        r = _req("GET", "/admin/keys", headers=headers)
+        status = getattr(r, "status_code", 0)
+        if status == 304:
+            with self._lock:
+                self._loaded_at = time.monotonic()
+                self._error = None
+            return None
+        if not getattr(r, "ok", False):
+            err = {"error": f"HTTP_{status}", "detail": getattr(r, "text", "")}
+            with self._lock:
+                self._error = err
+            return err
+        data = r.json() or {}
+        grouped: dict[str, list] = {}
+        for it in data.get("keys") or []:
+            if it.get("user_id") and bool(it.get("enabled", True)):
+                grouped.setdefault(it["user_id"], []).append(it)
+        by_user = {uid: _merge_access(items) for uid, items in grouped.items()}
+        with self._lock:
+            self._by_user = by_user
+            self._etag = r.headers.get("ETag")
+            self._loaded_at = time.monotonic()
+            self._error = None
+        return None
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._etag = None
+            self._loaded_at = 0.0
+
+    def _refresh_once(self, seen: float) -> dict | None:
+        """Refresh unless another thread completed one since ``seen`` (the _loaded_at the caller read)."""
+        with self._refresh_lock:
+            with self._lock:
+                if self._loaded_at != seen:
+                    return None
+            return self.refresh()
+
+    def lookup(self, user_id: str) -> dict:
+        self._ensure_worker()
+        with self._lock:
+            seen = self._loaded_at
+            hit = self._by_user.get(user_id)
+        age = time.monotonic() - seen
+        if not seen or age > ACCESS_INDEX_TTL_S * 2:
+            # Cold start or a stalled worker: refresh inline rather than serve stale rights.
+            err = self._refresh_once(seen)
+            if err:
+                return err
+        elif hit is None and age > ACCESS_INDEX_MISS_REFRESH_S:
+            # The key may have been created since the last refresh; a 304 makes this cheap.
+            self._refresh_once(seen)
+        with self._lock:
+            hit = self._by_user.get(user_id)
+        return dict(hit) if hit else _merge_access([])
+
+    def _ensure_worker(self) -> None:
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name="access-index-refresh", daemon=True)
+                self._worker.start()
+
+    def _run(self) -> None:
+        while True:
+            time.sleep(ACCESS_INDEX_TTL_S)
+            try:
+                with self._refresh_lock:
+                    self.refresh()
+            except Exception:
+                pass
+
+_ACCESS_INDEX = _AccessIndex()
+
+def fetch_user_access_via_admin(user_id: str) -> dict:
+    if not _get_admin_api_key():
+        return {"error": "NO_ADMIN_KEY"}
+    return _ACCESS_INDEX.lookup(user_id)
+
+def invalidate_access_index() -> None:
+    """Drop the cached /admin/keys index; the next lookup reloads it inline (single-flight)."""
+    _ACCESS_INDEX.invalidate()
+
 def submit_access_request(user_id: str, payload: dict) -> tuple[bool, dict | str]:
     r = _req("POST", FORM_SUBMIT_PATH, user_id=user_id, json=payload)
     if getattr(r, "ok", False):
@@ -87,4 +510,9 @@ def _mask_first_last(s: str | None) -> str:
 def _fmt_secs(s: float) -> str:
     return f"{s*1000:.0f} ms" if s < 1 else f"{s:.1f} s"
 
-
+def _fmt_age(s: float) -> str:
+    if s < 60:
+        return f"{s:.0f} s"
+    if s < 3600:
+        return f"{s/60:.0f} min"
+    return f"{s/3600:.1f} h"
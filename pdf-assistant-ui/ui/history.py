@@ -0,0 +1,184 @@
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import deque
+from typing import NamedTuple
+
+# ==================== Config ====================
+HISTORY_KEEP  = int(os.getenv("UI_HISTORY_KEEP", "20"))   # newest entries kept in session state
+# Private per-user file (0600 in a 0700 directory); empty = drop older entries
+HISTORY_DB    = os.getenv("UI_HISTORY_DB", os.path.join(os.getenv("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"),
+                                                        "pdf-assistant-ui", "history.sqlite3"))
+HISTORY_TTL_S = float(os.getenv("UI_HISTORY_TTL", str(7 * 24 * 3600)))
+HISTORY_PAGE  = int(os.getenv("UI_HISTORY_PAGE", "10"))   # entries per history page
+_PRUNE_EVERY_S = 600  # between TTL passes over the spill file
+
+
+class HistoryEntry(NamedTuple):
+    """What the history view shows for one question; citations, verification and follow-ups are not kept.
+
+    ``answer`` is None for a disk entry listed on a page but not opened yet.
+    """
+    n: int
+    ts: float
+    q: str
+    answer: str | None
+    confidence: float | str | None
+    model: str
+    total_s: float | None
+    ttft_s: float | None
+    api_s: float | None
+
+def history_entry(n: int, q: str, res: dict, total_s: float | None,
+                  ttft_s: float | None = None, api_s: float | None = None) -> HistoryEntry:
+    return HistoryEntry(
+        n, time.time(), q, res.get("answer") or "",
+        res.get("confidence_score", 0),
+        res.get("model") or res.get("model_used") or "unknown",
+        total_s, ttft_s, api_s,
+    )
+
+
+class _SpillStore:
+    """Process-wide SQLite file holding the history entries sessions no longer keep in memory.
+
+    Opened on the first spill, so short sessions never touch the disk; rows
+    older than HISTORY_TTL_S (sessions that ended without a reset) are pruned
+    then and on a spill at most every _PRUNE_EVERY_S after that.
+    """
+    def __init__(self, db_path: str, ttl_s: float):
+        self._path = db_path
+        self._ttl = ttl_s
+        self._lock = threading.Lock()
+        self._db = None
+        self._failed = not db_path
+        self._pruned_at = 0.0
+
+    def _conn(self):
+        if self._db is None and not self._failed:
+            try:
+                # questions and answers: create the file readable by this user only
+                os.makedirs(os.path.dirname(os.path.abspath(self._path)), mode=0o700, exist_ok=True)
+                os.close(os.open(self._path, os.O_RDWR | os.O_CREAT, 0o600))
+                os.chmod(self._path, 0o600)
+                db = sqlite3.connect(self._path, check_same_thread=False)
+                cols = {row[1] for row in db.execute("PRAGMA table_info(history)")}
+                if cols and "api_s" not in cols:
+                    db.execute("DROP TABLE history")  # older layout; spilled rows are disposable
+                db.execute(
+                    "CREATE TABLE IF NOT EXISTS history (session TEXT, n INTEGER, ts REAL, q TEXT, answer TEXT, "
+                    "confidence, model TEXT, total_s REAL, ttft_s REAL, api_s REAL, "
+                    "PRIMARY KEY (session, n)) WITHOUT ROWID")
+                db.execute("CREATE INDEX IF NOT EXISTS history_ts ON history(ts)")
+                self._prune(db)
+                self._db = db
+            except (OSError, sqlite3.Error):
+                self._failed = True  # unwritable path: older entries are simply dropped
+        return self._db
+
+    def _prune(self, db) -> None:
+        db.execute("DELETE FROM history WHERE ts < ?", (time.time() - self._ttl,))
+        db.commit()
+        self._pruned_at = time.monotonic()
+
+    def put(self, session: str, e: HistoryEntry) -> bool:
+        """Spill one entry; False if it could not be stored (and is gone)."""
+        with self._lock:
+            db = self._conn()
+            if db is None:
+                return False
+            try:
+                db.execute("INSERT OR REPLACE INTO history VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", (session, *e))
+                db.commit()
+                if time.monotonic() - self._pruned_at > _PRUNE_EVERY_S:
+                    self._prune(db)
+            except sqlite3.Error:
+                return False
+            return True
+
+    def load(self, session: str, lo: int, hi: int, with_answer: bool = True) -> list[HistoryEntry]:
+        """Entries lo..hi (inclusive), newest first; without the answer text unless asked."""
+        answer = "answer" if with_answer else "NULL"
+        with self._lock:
+            db = self._conn()
+            if db is None:
+                return []
+            rows = db.execute(
+                f"SELECT n, ts, q, {answer}, confidence, model, total_s, ttft_s, api_s FROM history "
+                "WHERE session = ? AND n BETWEEN ? AND ? ORDER BY n DESC", (session, lo, hi)).fetchall()
+        return [HistoryEntry(*row) for row in rows]
+
+    def drop(self, session: str) -> None:
+        with self._lock:
+            if self._db is not None:
+                self._db.execute("DELETE FROM history WHERE session = ?", (session,))
+                self._db.commit()
+
+
+_STORE = _SpillStore(HISTORY_DB, HISTORY_TTL_S)
+
+
+class SessionHistory:
+    """Question history of one session: the newest `keep` entries in memory, older ones spilled to SQLite.
+
+    Entries are numbered 1..count; ``oldest`` is the first one that can still be
+    read back (a spill that could not be stored drops it and everything older).
+    """
+    def __init__(self, keep: int = HISTORY_KEEP):
+        self.session = uuid.uuid4().hex
+        self.keep = max(1, keep)
+        self.recent: deque[HistoryEntry] = deque()
+        self.count = 0
+        self.oldest = 1
+
+    def __len__(self) -> int:
+        """Entries that can be shown: in memory or on disk."""
+        return self.count - self.oldest + 1
+
+    @property
+    def spilled(self) -> int:
+        """Number of entries no longer in memory (on disk, or dropped)."""
+        return self.count - len(self.recent)
+
+    def add(self, q: str, res: dict, total_s: float | None,
+            ttft_s: float | None = None, api_s: float | None = None) -> HistoryEntry:
+        self.count += 1
+        e = history_entry(self.count, q, res, total_s, ttft_s, api_s)
+        self.recent.append(e)
+        while len(self.recent) > self.keep:
+            old = self.recent.popleft()
+            if not _STORE.put(self.session, old):
+                self.oldest = old.n + 1
+        return e
+
+    def pages(self, size: int = HISTORY_PAGE) -> int:
+        return max(1, -(-len(self) // size))
+
+    def page(self, page: int, size: int = HISTORY_PAGE) -> list[HistoryEntry]:
+        """One page, newest first (page 0 = newest); disk entries come without their answer text."""
+        hi = self.count - page * size
+        lo = max(self.oldest, hi - size + 1)
+        if hi < self.oldest:
+            return []
+        first_mem = self.spilled + 1
+        out = [self.recent[n - first_mem] for n in range(hi, max(lo, first_mem) - 1, -1)]
+        if lo < first_mem:
+            out += _STORE.load(self.session, lo, min(hi, first_mem - 1), with_answer=False)
+        return out
+
+    def get(self, n: int) -> HistoryEntry | None:
+        """One full entry, from memory or disk."""
+        if n > self.spilled:
+            return self.recent[n - self.spilled - 1] if n <= self.count else None
+        if n < self.oldest:
+            return None
+        rows = _STORE.load(self.session, n, n)
+        return rows[0] if rows else None
+
+    def clear(self) -> None:
+        _STORE.drop(self.session)
+        self.recent.clear()
+        self.count = 0
+        self.oldest = 1
@@ -0,0 +1,167 @@
+import bisect
+import json
+import os
+import re
+import threading
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# ==================== Config ====================
+METRICS_PORT   = int(os.getenv("UI_METRICS_PORT", "0"))      # 0 = no /metrics endpoint
+METRICS_LOG    = os.getenv("UI_HTTP_METRICS_LOG", "")        # JSONL file, one line per request
+METRICS_WINDOW = int(os.getenv("UI_HTTP_METRICS_WINDOW", "500"))
+
+PHASES  = ("dns", "connect", "tls", "send", "ttfb", "download", "total")
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+# Path segments that are ids (upload sessions, content hashes, doc ids) collapse to {id}
+_ID_SEGMENT = re.compile(r"^(?=[^/]*\d)[A-Za-z0-9_.~-]{8,}$")
+
+def route_tag(path: str) -> str:
+    """Low-cardinality label for a request path, e.g. /documents/uploads/{id}."""
+    path = path.split("?", 1)[0]
+    return "/".join("{id}" if _ID_SEGMENT.match(seg) else seg for seg in path.split("/"))
+
+
+def _pct(xs: list[float], p: float) -> float:
+    xs = sorted(xs)
+    return xs[min(len(xs) - 1, int(round(p / 100 * (len(xs) - 1))))]
+
+class _HttpMetrics:
+    """Per (method, route) phase histograms since start, plus a rolling window for quantiles."""
+    def __init__(self, window: int):
+        self._window = window
+        self._lock = threading.Lock()
+        self._series: dict[tuple[str, str], dict] = {}
+
+    def _new_series(self) -> dict:
+        return {
+            "count": 0, "errors": 0, "bytes": 0,
+            "n":       {p: 0 for p in PHASES},
+            "sum":     {p: 0.0 for p in PHASES},
+            "buckets": {p: [0] * (len(BUCKETS) + 1) for p in PHASES},
+            "recent":  deque(maxlen=self._window),
+        }
+
+    def observe(self, method: str, route: str, status: int, timing: dict) -> None:
+        with self._lock:
+            s = self._series.get((method, route))
+            if s is None:
+                s = self._series[(method, route)] = self._new_series()
+            s["count"] += 1
+            if not status or status >= 500:
+                s["errors"] += 1
+            s["bytes"] += timing.get("bytes") or 0
+            for p in PHASES:
+                v = timing.get(p)
+                if v is None:
+                    continue
+                s["n"][p] += 1
+                s["sum"][p] += v
+                s["buckets"][p][bisect.bisect_left(BUCKETS, v)] += 1
+            s["recent"].append(dict(timing))
+
+    def snapshot(self) -> dict:
+        """{"METHOD route": {count, errors, bytes, <phase>: {p50, p95}}} over the rolling window."""
+        out = {}
+        with self._lock:
+            items = [(k, s["count"], s["errors"], s["bytes"], list(s["recent"])) for k, s in self._series.items()]
+        for (method, route), count, errors, nbytes, recent in items:
+            row = {"count": count, "errors": errors, "bytes": nbytes}
+            for p in PHASES:
+                xs = [t[p] for t in recent if t.get(p) is not None]
+                if xs:
+                    row[p] = {"p50": round(_pct(xs, 50), 4), "p95": round(_pct(xs, 95), 4)}
+            out[f"{method} {route}"] = row
+        return out
+
+    def render_prometheus(self) -> str:
+        lines = [
+            "# HELP ui_http_phase_seconds Time spent per phase of backend HTTP calls.",
+            "# TYPE ui_http_phase_seconds histogram",
+        ]
+        tail = [
+            "# HELP ui_http_requests_total Backend HTTP calls.",
+            "# TYPE ui_http_requests_total counter",
+        ]
+        nbytes = [
+            "# HELP ui_http_response_bytes_total Response body bytes received.",
+            "# TYPE ui_http_response_bytes_total counter",
+        ]
+        with self._lock:
+            for (method, route), s in sorted(self._series.items()):
+                base = f'method="{method}",route="{route}"'
+                for p in PHASES:
+                    if not s["n"][p]:
+                        continue
+                    acc = 0
+                    for le, c in zip(BUCKETS, s["buckets"][p]):
+                        acc += c
+                        lines.append(f'ui_http_phase_seconds_bucket{{{base},phase="{p}",le="{le}"}} {acc}')
+                    lines.append(f'ui_http_phase_seconds_bucket{{{base},phase="{p}",le="+Inf"}} {s["n"][p]}')
+                    lines.append(f'ui_http_phase_seconds_sum{{{base},phase="{p}"}} {s["sum"][p]:.6f}')
+                    lines.append(f'ui_http_phase_seconds_count{{{base},phase="{p}"}} {s["n"][p]}')
+                tail.append(f'ui_http_requests_total{{{base},outcome="ok"}} {s["count"] - s["errors"]}')
+                tail.append(f'ui_http_requests_total{{{base},outcome="error"}} {s["errors"]}')
+                nbytes.append(f'ui_http_response_bytes_total{{{base}}} {s["bytes"]}')
+        return "\n".join(lines + tail + nbytes) + "\n"
+
+
+_METRICS = _HttpMetrics(METRICS_WINDOW)
+_LOG_LOCK = threading.Lock()
+_SERVER_LOCK = threading.Lock()
+_SERVER: ThreadingHTTPServer | None = None
+_SERVER_FAILED = False
+
+def record_http(method: str, path: str, status: int, timing: dict) -> None:
+    route = route_tag(path)
+    _METRICS.observe(method, route, status, timing)
+    if METRICS_PORT:
+        ensure_metrics_server()
+    if METRICS_LOG:
+        line = json.dumps({"method": method, "route": route, "status": status, **timing})
+        try:
+            with _LOG_LOCK, open(METRICS_LOG, "a", encoding="utf-8") as fh:
+                fh.write(line + "\n")
+        except OSError:
+            pass
+
+def http_metrics_snapshot() -> dict:
+    return _METRICS.snapshot()
+
+
+# ==================== /metrics endpoint ====================
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.startswith("/metrics.json"):
+            body, ctype = json.dumps(_METRICS.snapshot()).encode(), "application/json"
+        elif self.path.startswith("/metrics"):
+            body, ctype = _METRICS.render_prometheus().encode(), "text/plain; version=0.0.4"
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", ctype)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+def ensure_metrics_server(port: int = METRICS_PORT) -> bool:
+    """Serve /metrics (Prometheus text) and /metrics.json on localhost:port, once per process."""
+    global _SERVER, _SERVER_FAILED
+    if _SERVER is not None or _SERVER_FAILED or not port:
+        return _SERVER is not None
+    with _SERVER_LOCK:
+        if _SERVER is None and not _SERVER_FAILED:
+            try:
+                srv = ThreadingHTTPServer((os.getenv("UI_METRICS_HOST", "127.0.0.1"), port), _MetricsHandler)
+            except OSError:
+                _SERVER_FAILED = True  # port taken, e.g. by another Streamlit process
+                return False
+            srv.daemon_threads = True
+            threading.Thread(target=srv.serve_forever, name="http-metrics", daemon=True).start()
+            _SERVER = srv
+    return True
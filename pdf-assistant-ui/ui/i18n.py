@@ -0,0 +1,183 @@
+# ==================== UI translations ====================
+# Imported once per process; the Streamlit script only does lookups.
+
+UI_LANGS = {"en":"English", "fr":"Français", "nl":"Nederlands", "de":"Deutsch"}
+
+I18N = {
+    # App / navigation
+    "app_title":   {"en":"📕 PDF Assistant", "fr":"📕 Assistant PDF", "nl":"📕 PDF-assistent", "de":"📕 PDF-Assistent"},
+    "nav_home":    {"en":"📕 PDF Assistant", "fr":"📕 Assistant PDF", "nl":"📕 PDF-assistent", "de":"📕 PDF-Assistent"},
+    "nav_how":     {"en":"📘 How to use",    "fr":"📘 Mode d’emploi",  "nl":"📘 Handleiding",   "de":"📘 Anleitung"},
+
+    # Sidebar — section
+    "sidebar_user":        {"en":"Access information", "fr":"Données d'accès", "nl":"Gebruikerstoegang", "de":"Benutzer"},
+    "user_id":             {"en":"User ID", "fr":"Identifiant", "nl":"Gebruikers-ID", "de":"Benutzer-ID"},
+    "user_id_ph":          {"en":"Enter the ID you received to use the tool",
+                            "fr":"Entrez l’identifiant reçu pour utiliser l’outil",
+                            "nl":"Voer de ontvangen ID in om de tool te gebruiken",
+                            "de":"Geben Sie die erhaltene ID ein, um das Tool zu nutzen"},
+    "user_id_help":        {"en":"An ID can be requested by email or by clicking on request button",
+                            "fr":"Un identifiant peut être demandé par e-mail ou via le bouton de demande",
+                            "nl":"Een ID kan per e-mail of via de aanvraagknop worden aangevraagd",
+                            "de":"Eine ID kann per E-Mail oder über die Anforderungsschaltfläche angefordert werden"},
+    "user_id_locked":      {"en":"User ID (locked)", "fr":"Identifiant (verrouillé)", "nl":"Gebruikers-ID (vergrendeld)", "de":"Benutzer-ID (gesperrt)"},
+    "user_locked_note":    {"en":"🔒 User ID is locked. Use **Reset** to change it.",
+                            "fr":"🔒 Identifiant verrouillé. Utilisez **Réinitialiser** pour le modifier.",
+                            "nl":"🔒 ID is vergrendeld. Gebruik **Reset** om te wijzigen.",
+                            "de":"🔒 ID ist gesperrt. Mit **Zurücksetzen** ändern."},
+
+    # Sidebar — buttons
+    "btn_start":   {"en":"Start session", "fr":"Démarrer la session", "nl":"Sessie starten", "de":"Sitzung starten"},
+    "btn_request": {"en":"Request access", "fr":"Demander l’accès", "nl":"Toegang aanvragen", "de":"Zugang anfordern"},
+    "btn_reset":   {"en":"Reset session", "fr":"Réinitialiser", "nl":"Reset sessie", "de":"Sitzung zurücksetzen"},
+    "already_have_access_help": {"en":"Disabled because you already have access.",
+                                 "fr":"Désactivé car vous avez déjà l’accès.",
+                                 "nl":"Uitgeschakeld omdat je al toegang hebt.",
+                                 "de":"Deaktiviert, da Sie bereits Zugang haben."},
+
+    # Status banner
+    "status_role":   {"en":"Role", "fr":"Rôle", "nl":"Rol", "de":"Rolle"},
+    "status_access": {"en":"Access", "fr":"Accès", "nl":"Toegang", "de":"Zugriff"},
+    "status_rights": {"en":"Rights", "fr":"Droits", "nl":"Rechten", "de":"Berechtigungen"},
+
+    # Upload
+    "h_upload":       {"en":"📄 Upload PDF", "fr":"📄 Charger un PDF", "nl":"📄 PDF uploaden", "de":"📄 PDF hochladen"},
+    "uploader_label": {"en":"Choose a PDF", "fr":"Choisissez un PDF", "nl":"Kies een PDF", "de":"Wählen Sie eine PDF"},
+    "btn_process":    {"en":"Process PDF", "fr":"Traiter le PDF", "nl":"PDF verwerken", "de":"PDF verarbeiten"},
+    "no_processed":   {"en":"No processed document yet.", "fr":"Aucun document traité.", "nl":"Nog geen verwerkt document.", "de":"Noch kein verarbeitetes Dokument."},
+    "new_selected":   {"en":"New file selected — not processed yet.", "fr":"Nouveau fichier sélectionné — non traité.", "nl":"Nieuw bestand geselecteerd — nog niet verwerkt.", "de":"Neue Datei ausgewählt — noch nicht verarbeitet."},
+    "processed":      {"en":"Processed ✓", "fr":"Traité ✓", "nl":"Verwerkt ✓", "de":"Verarbeitet ✓"},
+    "upload_failed":  {"en":"Upload failed", "fr":"Échec du chargement", "nl":"Upload mislukt", "de":"Upload fehlgeschlagen"},
+    "already_processed":{"en":"Already processed — reusing it", "fr":"Déjà traité — réutilisé", "nl":"Al verwerkt — wordt hergebruikt", "de":"Bereits verarbeitet — wird wiederverwendet"},
+    "uploading":      {"en":"Uploading… {p}%", "fr":"Chargement… {p} %", "nl":"Uploaden… {p}%", "de":"Hochladen… {p} %"},
+
+    # Context & language (UI)
+    "h_ctx_lang":     {"en":"⚙️ Context & language", "fr":"⚙️ Contexte & langue", "nl":"⚙️ Context & taal", "de":"⚙️ Kontext & Sprache"},
+    "answer_lang":    {"en":"Answer language", "fr":"Langue de réponse", "nl":"Antwoordtaal", "de":"Antwortsprache"},
+    "answer_lang_help":{"en":"This does not depend on the PDF’s language; it controls the answer language.",
+                        "fr":"Indépendant de la langue du PDF ; définit la langue de réponse.",
+                        "nl":"Staat los van de taal van de PDF; bepaalt de antwoordtaal.",
+                        "de":"Unabhängig von der PDF-Sprache; steuert die Antwortsprache."},
+    "ctx_label":      {"en":"Context", "fr":"Contexte", "nl":"Context", "de":"Kontext"},
+    "ctx_help":       {"en":"Choose how the assistant should read your document.",
+                       "fr":"Choisissez comment l’assistant doit lire votre document.",
+                       "nl":"Kies hoe de assistent je document moet lezen.",
+                       "de":"Wählen Sie, wie der Assistent Ihr Dokument lesen soll."},
+    "selected":       {"en":"Selected", "fr":"Sélection", "nl":"Gekozen", "de":"Auswahl"},
+
+    # Q&A
+    "h_ask":          {"en":"❓ Ask a question", "fr":"❓ Poser une question", "nl":"❓ Stel een vraag", "de":"❓ Frage stellen"},
+    "your_q":         {"en":"Your question", "fr":"Votre question", "nl":"Je vraag", "de":"Deine Frage"},
+    "q_ph":           {"en":"At least {n} characters…", "fr":"Au moins {n} caractères…", "nl":"Minstens {n} tekens…", "de":"Mindestens {n} Zeichen…"},
+    "verify":         {"en":"Verification", "fr":"Vérification", "nl":"Verificatie", "de":"Verifikation"},
+    "followups":      {"en":"Suggest follow-up questions", "fr":"Suggérer des questions de suivi", "nl":"Vervolgvragen voorstellen", "de":"Rückfragen vorschlagen"},
+    "btn_answer":     {"en":"Get answer", "fr":"Obtenir la réponse", "nl":"Antwoord ophalen", "de":"Antwort abrufen"},
+    "working":        {"en":"Working on your answer…", "fr":"Préparation de votre réponse…", "nl":"Bezig met je antwoord…", "de":"Antwort wird vorbereitet…"},
+    "answer_received":{"en":"Answer received in {s}", "fr":"Réponse reçue en {s}", "nl":"Antwoord ontvangen in {s}", "de":"Antwort erhalten in {s}"},
+    "req_failed":     {"en":"Request failed", "fr":"Échec de la requête", "nl":"Aanvraag mislukt", "de":"Anfrage fehlgeschlagen"},
+    "query_failed":   {"en":"Query failed", "fr":"Échec de la requête", "nl":"Aanvraag mislukt", "de":"Anfrage fehlgeschlagen"},
+
+    # Answer + meta
+    "h_answer":       {"en":"💬 Answer", "fr":"💬 Réponse", "nl":"💬 Antwoord", "de":"💬 Antwort"},
+    "meta_conf":      {"en":"Confidence", "fr":"Confiance", "nl":"Betrouwbaarheid", "de":"Konfidenz"},
+    "meta_model":     {"en":"Model", "fr":"Modèle", "nl":"Model", "de":"Modell"},
+    "meta_time":      {"en":"Time", "fr":"Durée", "nl":"Tijd", "de":"Zeit"},
+    "meta_cached":    {"en":"cached, {age} old", "fr":"en cache, il y a {age}", "nl":"uit cache, {age} oud", "de":"aus Cache, {age} alt"},
+    "meta_http":      {"en":"Network", "fr":"Réseau", "nl":"Netwerk", "de":"Netzwerk"},
+
+    # Follow-ups
+    "h_fu":           {"en":"🔍 Follow-up questions", "fr":"🔍 Questions de suivi", "nl":"🔍 Vervolgvragen", "de":"🔍 Rückfragen"},
+    "fu_clarify":     {"en":"Clarify", "fr":"Clarifier", "nl":"Verduidelijken", "de":"Klarstellen"},
+    "fu_deepen":      {"en":"Deepen", "fr":"Approfondir", "nl":"Verdiepen", "de":"Vertiefen"},
+    "fu_none_c":      {"en":"No clarify suggestions", "fr":"Aucune suggestion pour clarifier", "nl":"Geen verduidelijkingsvoorstellen", "de":"Keine Klarstellen-Vorschläge"},
+    "fu_none_d":      {"en":"No deepen suggestions", "fr":"Aucune suggestion pour approfondir", "nl":"Geen verdiepingsvoorstellen", "de":"Keine Vertiefungs-Vorschläge"},
+
+    # Citations & history
+    "h_citations":    {"en":"📝 Citations", "fr":"📝 Citations", "nl":"📝 Bronnen", "de":"📝 Quellen"},
+    "target_docs":    {"en":"Documents to ask", "fr":"Documents à interroger", "nl":"Te bevragen documenten", "de":"Abzufragende Dokumente"},
+    "h_batch":        {"en":"📋 Batch questions", "fr":"📋 Questions en lot", "nl":"📋 Vragen in bulk", "de":"📋 Fragen im Stapel"},
+    "batch_paste":    {"en":"Questions (one per line)", "fr":"Questions (une par ligne)", "nl":"Vragen (één per regel)", "de":"Fragen (eine pro Zeile)"},
+    "batch_csv":      {"en":"…or a CSV with a 'question' column", "fr":"…ou un CSV avec une colonne « question »", "nl":"…of een CSV met een kolom 'question'", "de":"…oder eine CSV mit einer Spalte „question“"},
+    "batch_conc":     {"en":"Parallel requests", "fr":"Requêtes en parallèle", "nl":"Parallelle aanvragen", "de":"Parallele Anfragen"},
+    "batch_count":    {"en":"{n} question(s) ready", "fr":"{n} question(s) prête(s)", "nl":"{n} vraag/vragen klaar", "de":"{n} Frage(n) bereit"},
+    "btn_batch":      {"en":"Run batch", "fr":"Lancer le lot", "nl":"Bulk starten", "de":"Stapel starten"},
+    "batch_download": {"en":"Download results (CSV)", "fr":"Télécharger les résultats (CSV)", "nl":"Resultaten downloaden (CSV)", "de":"Ergebnisse herunterladen (CSV)"},
+    "h_history":      {"en":"📚 Session history", "fr":"📚 Historique de session", "nl":"📚 Sessiegeschiedenis", "de":"📚 Sitzungsverlauf"},
+    "history_page":   {"en":"Page {p} of {n}", "fr":"Page {p} sur {n}", "nl":"Pagina {p} van {n}", "de":"Seite {p} von {n}"},
+
+    # General/misc
+"unknown": {"en":"unknown","fr":"inconnu","nl":"onbekend","de":"unbekannt"},
+"info_enter_id": {
+  "en":"Enter a **User ID** in the sidebar, then click **Start session**.",
+  "fr":"Saisissez un **identifiant** dans la barre latérale, puis cliquez **Démarrer la session**.",
+  "nl":"Voer een **Gebruikers-ID** in de zijbalk in en klik **Sessie starten**.",
+  "de":"Geben Sie in der Seitenleiste eine **Benutzer-ID** ein und klicken Sie auf **Sitzung starten**."
+},
+"admin_check_failed": {
+  "en":"Admin check failed (missing/invalid admin key or /admin/keys error).",
+  "fr":"Vérification admin échouée (clé admin manquante/invalide ou erreur /admin/keys).",
+  "nl":"Admincontrole mislukt (ontbrekende/ongeldige adminkey of /admin/keys-fout).",
+  "de":"Admin-Prüfung fehlgeschlagen (fehlender/ungültiger Admin-Schlüssel oder /admin/keys-Fehler)."
+},
+
+# Rights labels (for the toast)
+"rights_all":           {"en":"✅ all rights","fr":"✅ tous droits","nl":"✅ alle rechten","de":"✅ alle Rechte"},
+"rights_upload_query":  {"en":"✅ upload + query","fr":"✅ upload + requête","nl":"✅ upload + query","de":"✅ Upload + Abfrage"},
+"rights_upload_only":   {"en":"⬆️ upload only","fr":"⬆️ upload seulement","nl":"⬆️ alleen uploaden","de":"⬆️ nur Upload"},
+"rights_query_only":    {"en":"🔎 query only","fr":"🔎 requête seulement","nl":"🔎 alleen query","de":"🔎 nur Abfrage"},
+"rights_none":          {"en":"⛔ no rights","fr":"⛔ aucun droit","nl":"⛔ geen rechten","de":"⛔ keine Rechte"},
+
+"h_access_request": {"en":"✉️ Access request","fr":"✉️ Demande d’accès","nl":"✉️ Toegangsaanvraag","de":"✉️ Zugriffsanfrage"},
+"first_name": {"en":"First name*","fr":"Prénom*","nl":"Voornaam*","de":"Vorname*"},
+"last_name":  {"en":"Last name*","fr":"Nom*","nl":"Achternaam*","de":"Nachname*"},
+"email_lbl":  {"en":"Email*","fr":"Email*","nl":"E-mail*","de":"E-Mail*"},
+"mobile_opt": {"en":"Mobile phone (optional)","fr":"Téléphone portable (optionnel)","nl":"Mobiele telefoon (optioneel)","de":"Mobiltelefon (optional)"},
+"company":    {"en":"Company / Organization*","fr":"Entreprise / Organisation*","nl":"Bedrijf / Organisatie*","de":"Firma / Organisation*"},
+"reason_lbl": {"en":"Reason for request*","fr":"Motif de la demande*","nl":"Reden voor aanvraag*","de":"Grund der Anfrage*"},
+"reason_ph":  {"en":"Tell us briefly why you need access…","fr":"Expliquez brièvement pourquoi vous avez besoin d’un accès…","nl":"Leg kort uit waarom je toegang nodig hebt…","de":"Warum benötigen Sie Zugriff? (kurz)…"},
+"human_q":    {"en":"Human check: what is {a} + {b} ?","fr":"Vérification : combien font {a} + {b} ?","nl":"Menscheck: wat is {a} + {b} ?","de":"Prüfung: Wie viel ist {a} + {b} ?"},
+"btn_submit": {"en":"Submit request","fr":"Envoyer la demande","nl":"Aanvraag versturen","de":"Anfrage senden"},
+"form_success":{"en":"Thank you! Your request has been sent. We will be shortly in contact.",
+                "fr":"Merci ! Votre demande a été envoyée. Nous vous contacterons prochainement.",
+                "nl":"Bedankt! Je aanvraag is verzonden. We nemen spoedig contact op.",
+                "de":"Danke! Ihre Anfrage wurde gesendet. Wir melden uns in Kürze."},
+"form_failed": {"en":"Sending request failed.","fr":"Échec de l’envoi de la demande.","nl":"Verzenden van de aanvraag mislukt.","de":"Senden der Anfrage fehlgeschlagen."},
+"backend_recorded":{"en":"Request recorded by backend.","fr":"Demande enregistrée par le backend.","nl":"Aanvraag door backend geregistreerd.","de":"Anfrage im Backend erfasst."},
+
+# validation
+"err_firstname":{"en":"First name invalid (2–40 letters, spaces, hyphens, apostrophes).",
+                 "fr":"Prénom invalide (2–40 lettres, espaces, traits d’union, apostrophes).",
+                 "nl":"Voornaam ongeldig (2–40 letters, spaties, koppeltekens, apostrofs).",
+                 "de":"Vorname ungültig (2–40 Buchstaben, Leerzeichen, Bindestriche, Apostrophe)."},
+"err_lastname":{"en":"Last name invalid (2–40 letters, spaces, hyphens, apostrophes).",
+                "fr":"Nom invalide (2–40 lettres, espaces, traits d’union, apostrophes).",
+                "nl":"Achternaam ongeldig (2–40 letters, spaties, koppeltekens, apostrofs).",
+                "de":"Nachname ungültig (2–40 Buchstaben, Leerzeichen, Bindestriche, Apostrophe)."},
+"err_email":{"en":"Please provide a valid email address.","fr":"Veuillez fournir une adresse e-mail valide.","nl":"Geef een geldig e-mailadres op.","de":"Bitte eine gültige E-Mail-Adresse angeben."},
+"err_company":{"en":"Company / Organization is required.","fr":"Entreprise / Organisation obligatoire.","nl":"Bedrijf / Organisatie is verplicht.","de":"Firma / Organisation ist erforderlich."},
+"err_reason":{"en":"Reason should be at least 10 characters.","fr":"Le motif doit contenir au moins 10 caractères.","nl":"Reden moet minstens 10 tekens bevatten.","de":"Der Grund muss mindestens 10 Zeichen haben."},
+"err_mobile":{"en":"Mobile phone must be a valid international number (e.g., +3212345678).",
+              "fr":"Le téléphone portable doit être un numéro international valide (ex. +3212345678).",
+              "nl":"Mobiel nummer moet een geldig internationaal nummer zijn (bijv. +3212345678).",
+              "de":"Mobilnummer muss eine gültige internationale Nummer sein (z. B. +3212345678)."},
+"err_human_wrong":{"en":"Human check failed. Please try again.","fr":"Vérification échouée. Réessayez.","nl":"Menscheck mislukt. Probeer opnieuw.","de":"Prüfung fehlgeschlagen. Bitte erneut versuchen."},
+"err_human_nan":{"en":"Human check failed. Please enter a number.","fr":"Vérification échouée. Entrez un nombre.","nl":"Menscheck mislukt. Voer een getal in.","de":"Prüfung fehlgeschlagen. Bitte eine Zahl eingeben."},
+"ui_lang_label": {
+  "en":"Interface language",
+  "fr":"Langue de l’interface",
+  "nl":"Taal van de interface",
+  "de":"Sprache der Oberfläche"
+},
+}
+
+# Flat (key, lang) -> text table with the English fallback already resolved,
+# so a lookup is a single dict access on every rerun.
+_FLAT: dict[tuple[str, str], str] = {
+    (key, lang): (texts.get(lang) or texts.get("en") or key)
+    for key, texts in I18N.items()
+    for lang in UI_LANGS
+}
+
+def tr(key: str, lang: str, **fmt) -> str:
+    val = _FLAT.get((key, lang)) or _FLAT.get((key, "en")) or key
+    return val.format(**fmt) if fmt else val
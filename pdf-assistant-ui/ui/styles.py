@@ -0,0 +1,54 @@
+# ==================== Styles ====================
+# All custom CSS, emitted once per rerun instead of once per rendered block.
+
+APP_CSS = """
+<style>
+/* hide any anchor linking to your repo anywhere on the page */
+a[href*="github.com/your-org/your-repo"] { display: none !important; }
+
+/* hide a specific image (choose one selector that matches yours) */
+img[src*="avatars.githubusercontent.com/"] { display: none !important; }  /* GH avatar */
+img[alt="Your Avatar"] { display: none !important; }                      /* by alt text */
+
+/* Hide Streamlit's default sidebar nav */
+[data-testid='stSidebarNav']{display:none}
+
+/* Verification card */
+.verif-title{
+  font-weight:800;
+  font-size:1.1rem;
+  margin:0 0 .25rem 0;
+}
+.verif-meta{ opacity:.9; margin-bottom:.5rem }
+.verif-list li{ margin-bottom:.15rem }
+
+/* Citations */
+.cite-item{
+  border:1px solid rgba(49,51,63,.15);
+  border-radius:.5rem;
+  padding:.6rem .75rem;
+  margin:.5rem 0;
+  background: rgba(240,242,246,.25);
+}
+.page-pill{
+  display:inline-block;
+  padding:.15rem .6rem;
+  border-radius:999px;
+  font-weight:700;
+  border:1px solid rgba(49,51,63,.25);
+  margin-right:.5rem;
+}
+.cite-meta{
+  font-weight:600;
+  opacity:.85;
+}
+.cite-snippet{
+  margin-top:.35rem;
+}
+.cite-group > summary{
+  cursor:pointer;
+  font-weight:700;
+  margin:.4rem 0;
+}
+</style>
+"""
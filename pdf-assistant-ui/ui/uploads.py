@@ -0,0 +1,267 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable
+
+from config import UPLOAD_PATH, UPLOAD_FILE_FIELD
+from helpers import _req, _backoff_delay
+
+# ==================== Config ====================
+UPLOAD_SESSION_PATH   = os.getenv("UPLOAD_SESSION_PATH", f"{UPLOAD_PATH}/uploads")
+UPLOAD_CHUNK_BYTES    = int(os.getenv("UI_UPLOAD_CHUNK_MB", "8")) * 1024 * 1024
+UPLOAD_RESUME_TRIES   = int(os.getenv("UI_UPLOAD_RESUME_TRIES", "5"))
+READ_BLOCK_BYTES      = 64 * 1024
+DOC_BY_HASH_PATH      = os.getenv("DOC_BY_HASH_PATH", f"{UPLOAD_PATH}/by-hash/{{sha}}")
+HASH_CACHE_SIZE       = int(os.getenv("UI_HASH_CACHE_SIZE", "2048"))
+HASH_BLOCK_BYTES      = 1024 * 1024
+INGEST_WORKERS        = int(os.getenv("UI_INGEST_WORKERS", "4"))
+
+ProgressFn = Callable[[int, int], None]
+
+
+# ==================== Zero-copy request bodies ====================
+class _BufferReader:
+    """File-like view over a slice of a memoryview.
+
+    requests sends objects with read() in blocks, so only one block at a time
+    is materialised; __len__ lets it set Content-Length instead of chunked TE.
+    """
+    def __init__(self, parts: list, on_read: Callable[[int], None] | None = None):
+        self._parts = [p for p in parts if len(p)]
+        self._len = sum(len(p) for p in self._parts)
+        self._idx = 0
+        self._pos = 0
+        self._on_read = on_read
+
+    def __len__(self) -> int:
+        return self._len
+
+    def read(self, n: int = -1) -> bytes:
+        if self._idx >= len(self._parts):
+            return b""
+        part = self._parts[self._idx]
+        n = READ_BLOCK_BYTES if n is None or n < 0 else n
+        block = bytes(part[self._pos:self._pos + n])
+        self._pos += len(block)
+        if self._pos >= len(part):
+            self._idx += 1
+            self._pos = 0
+        if self._on_read:
+            self._on_read(len(block))
+        return block
+
+
+def _multipart_body(field: str, filename: str, content_type: str, data: memoryview,
+                    on_read: Callable[[int], None] | None = None) -> tuple[_BufferReader, str]:
+    boundary = f"----pdfassistant{os.urandom(12).hex()}"
+    safe_name = filename.replace('"', "%22").replace("\r", "").replace("\n", "")
+    head = (
+        f"--{boundary}\r\n"
+        f'Content-Disposition: form-data; name="{field}"; filename="{safe_name}"\r\n'
+        f"Content-Type: {content_type}\r\n\r\n"
+    ).encode("utf-8")
+    tail = f"\r\n--{boundary}--\r\n".encode("ascii")
+    body = _BufferReader([memoryview(head), data, memoryview(tail)], on_read=on_read)
+    return body, f"multipart/form-data; boundary={boundary}"
+
+
+# ==================== Content-hash dedup ====================
+# Keyed by (user_id, sha) so a doc_id is only ever reused for the user who uploaded it.
+_HASH_CACHE: "OrderedDict[tuple[str, str], str]" = OrderedDict()
+_HASH_LOCK = threading.Lock()
+
+def sha256_of(upload) -> str:
+    """SHA-256 of an UploadedFile, hashed block by block straight from its buffer."""
+    h = hashlib.sha256()
+    data = upload.getbuffer()
+    try:
+        for i in range(0, len(data), HASH_BLOCK_BYTES):
+            h.update(data[i:i + HASH_BLOCK_BYTES])
+    finally:
+        data.release()
+    return h.hexdigest()
+
+def remember_doc_hash(user_id: str, sha: str, doc_id: str) -> None:
+    if not (sha and doc_id):
+        return
+    with _HASH_LOCK:
+        _HASH_CACHE[(user_id, sha)] = doc_id
+        _HASH_CACHE.move_to_end((user_id, sha))
+        while len(_HASH_CACHE) > HASH_CACHE_SIZE:
+            _HASH_CACHE.popitem(last=False)
+
+def lookup_doc_by_hash(sha: str, user_id: str, headers: dict) -> str | None:
+    """Return the doc_id of an already processed PDF with this hash, if any."""
+    with _HASH_LOCK:
+        doc_id = _HASH_CACHE.get((user_id, sha))
+    if doc_id:
+        return doc_id
+    path = DOC_BY_HASH_PATH.format(sha=sha)
+    r = _req("HEAD", path, user_id=user_id, headers=dict(headers), timeout_s=15)
+    if not getattr(r, "ok", False):
+        return None
+    doc_id = r.headers.get("X-Doc-Id")
+    if not doc_id:
+        # HEAD carries no body; ask for it only when the header is missing.
+        r = _req("GET", path, user_id=user_id, headers=dict(headers), timeout_s=15)
+        doc_id = _json_or_empty(r).get("doc_id") if getattr(r, "ok", False) else None
+    if doc_id:
+        remember_doc_hash(user_id, sha, doc_id)
+    return doc_id
+
+
+# ==================== Upload strategies ====================
+def _offset_from(r) -> int | None:
+    hdr = (getattr(r, "headers", {}) or {}).get("Upload-Offset")
+    if hdr is not None:
+        try:
+            return int(hdr)
+        except ValueError:
+            return None
+    try:
+        off = (r.json() or {}).get("offset")
+        return int(off) if off is not None else None
+    except Exception:
+        return None
+
+def _json_or_empty(r) -> dict:
+    try:
+        return r.json() or {}
+    except Exception:
+        return {}
+
+def _upload_multipart(filename: str, data: memoryview, user_id: str, headers: dict,
+                      on_progress: ProgressFn | None) -> tuple[bool, dict | str]:
+    total = len(data)
+    sent = [0]
+
+    def _tick(n: int):
+        sent[0] = min(sent[0] + n, total)
+        if on_progress:
+            on_progress(sent[0], total)
+
+    body, ctype = _multipart_body(UPLOAD_FILE_FIELD, filename, "application/pdf", data, on_read=_tick)
+    r = _req("POST", UPLOAD_PATH, user_id=user_id, data=body, headers={**headers, "Content-Type": ctype})
+    if getattr(r, "ok", False):
+        return True, _json_or_empty(r)
+    return False, f"{getattr(r, 'status_code', '?')} {getattr(r, 'text', '')}"
+
+def _upload_chunked(filename: str, data: memoryview, user_id: str, headers: dict,
+                    state: dict, on_progress: ProgressFn | None) -> tuple[bool, dict | str] | None:
+    total = len(data)
+
+    upload_id = state.get("upload_id")
+    offset = 0
+    if upload_id:
+        # Resuming across reruns: ask the backend how far the previous attempt got.
+        r = _req("HEAD", f"{UPLOAD_SESSION_PATH}/{upload_id}", user_id=user_id, headers=dict(headers))
+        offset = _offset_from(r) if getattr(r, "ok", False) else None
+        if offset is None:
+            upload_id = None
+            offset = 0
+    if not upload_id:
+        r = _req("POST", UPLOAD_SESSION_PATH, user_id=user_id, headers=dict(headers),
+                 json={"filename": filename, "size": total, "content_type": "application/pdf"})
+        if getattr(r, "status_code", 0) in (404, 405, 501):
+            return None  # backend has no resumable endpoint: caller falls back to multipart
+        if not getattr(r, "ok", False):
+            return False, f"{getattr(r, 'status_code', '?')} {getattr(r, 'text', '')}"
+        upload_id = _json_or_empty(r).get("upload_id")
+        if not upload_id:
+            return None
+        offset = _offset_from(r) or 0
+    state["upload_id"] = upload_id
+    state["offset"] = offset
+
+    url = f"{UPLOAD_SESSION_PATH}/{upload_id}"
+    failures = 0
+    result: dict = {}
+    while offset < total:
+        if on_progress:
+            on_progress(offset, total)
+        end = min(offset + UPLOAD_CHUNK_BYTES, total)
+        sent = [offset]
+
+        def _tick(n: int):
+            sent[0] = min(sent[0] + n, total)
+            if on_progress:
+                on_progress(sent[0], total)
+
+        body = _BufferReader([data[offset:end]], on_read=_tick)
+        chunk_headers = {
+            **headers,
+            "Content-Type": "application/offset+octet-stream",
+            "Upload-Offset": str(offset),
+            "Upload-Length": str(total),
+        }
+        r = _req("PATCH", url, user_id=user_id, data=body, headers=chunk_headers)
+        status = getattr(r, "status_code", 0)
+        if getattr(r, "ok", False):
+            acked = _offset_from(r)
+            offset = acked if acked is not None else end
+            state["offset"] = offset
+            result = _json_or_empty(r)
+            failures = 0
+            continue
+        if 400 <= status < 500 and status not in (408, 409, 423, 429):
+            return False, f"{status} {getattr(r, 'text', '')}"
+        # Network drop, 5xx or offset conflict: resync from the last acknowledged offset.
+        failures += 1
+        if failures > UPLOAD_RESUME_TRIES:
+            return False, f"{status} {getattr(r, 'text', '')}"
+        time.sleep(_backoff_delay(failures - 1))
+        h = _req("HEAD", url, user_id=user_id, headers=dict(headers))
+        acked = _offset_from(h) if getattr(h, "ok", False) else None
+        if acked is not None:
+            offset = acked
+            state["offset"] = offset
+
+    if on_progress:
+        on_progress(total, total)
+    if not result.get("doc_id"):
+        r = _req("POST", f"{url}/complete", user_id=user_id, headers=dict(headers))
+        if not getattr(r, "ok", False):
+            return False, f"{getattr(r, 'status_code', '?')} {getattr(r, 'text', '')}"
+        result = _json_or_empty(r)
+    state.clear()
+    return True, result
+
+def upload_pdf(upload, user_id: str, headers: dict, state: dict | None = None,
+               on_progress: ProgressFn | None = None, sha: str | None = None) -> tuple[bool, dict | str]:
+    """Stream an UploadedFile to the backend without copying its bytes.
+
+    Uses the resumable chunk endpoint when the backend offers it and a
+    streaming multipart POST otherwise. ``state`` carries the upload id and
+    acknowledged offset across reruns so a retry resumes instead of restarting.
+    """
+    state = state if state is not None else {}
+    if sha:
+        headers = {**headers, "X-Content-SHA256": sha}
+    data = upload.getbuffer()
+    try:
+        out = _upload_chunked(upload.name, data, user_id, headers, state, on_progress)
+        if out is None:
+            state.clear()
+            out = _upload_multipart(upload.name, data, user_id, headers, on_progress)
+    finally:
+        data.release()
+    if out[0] and sha:
+        remember_doc_hash(user_id, sha, (out[1] or {}).get("doc_id"))
+    return out
+
+def ingest_pdf(upload, user_id: str, headers: dict, state: dict | None = None,
+               on_progress: ProgressFn | None = None, sha: str | None = None) -> tuple[bool, dict | str, bool, str]:
+    """Hash, dedup and upload one PDF. Returns (ok, result, reused, sha).
+
+    Safe to call from a worker thread: it does no Streamlit calls itself.
+    """
+    sha = sha or sha256_of(upload)
+    doc_id = lookup_doc_by_hash(sha, user_id, headers)
+    if doc_id:
+        if on_progress:
+            on_progress(1, 1)
+        return True, {"doc_id": doc_id}, True, sha
+    ok, resp = upload_pdf(upload, user_id, headers, state=state, on_progress=on_progress, sha=sha)
+    return ok, resp, False, sha
@@ -1,220 +1,44 @@
 import os
-from dotenv import load_dotenv
-load_dotenv(override=True)
-from pathlib import Path
+import config  # loads .env/secrets once per process; must precede helpers
+from config import QUERY_PATH, MIN_QUESTION_CHARS, STREAM_ANSWERS, DEBUG_HTTP_TIMING
 import streamlit as st
 st.set_page_config(page_title="PDF Assistant", page_icon="📕", layout="wide", initial_sidebar_state="expanded",)
 import time
 import random
+from concurrent.futures import ThreadPoolExecutor, wait
 from helpers import (
     NAME_RE, PHONE_RE, EMAIL_RE,
     _req,
+    is_event_stream,
+    iter_stream_events,
+    finish_stream_timing,
+    apply_answer_event,
     fetch_user_access_via_admin,
+    invalidate_access_index,
     submit_access_request,
     _mask_first_last,
     _fmt_secs,
+    _fmt_age,
 )
+from uploads import ingest_pdf, INGEST_WORKERS
+from batch import parse_questions, run_batch, rows_to_csv, ask_documents, merge_results, BATCH_MAX_CONCURRENCY, BATCH_COLUMNS
+from answer_cache import answer_cache_key, get_cached_answer, put_cached_answer, invalidate_doc_answers
+from history import SessionHistory, HistoryEntry
+from citations import normalize_citations, citations_html
+from i18n import UI_LANGS, tr
+from contexts import CONTEXTS, LANG_LABEL_TO_CODE, ctx_label
+from styles import APP_CSS
 
 # === UI language & i18n ===
 if "ui_lang" not in st.session_state:
     # Default UI language: map from your existing answer-language code if present
     st.session_state.ui_lang = (st.session_state.get("lang_code") or "en")
 
-UI_LANGS = {"en":"English", "fr":"Français", "nl":"Nederlands", "de":"Deutsch"}
-
-I18N = {
-    # App / navigation
-    "app_title":   {"en":"📕 PDF Assistant", "fr":"📕 Assistant PDF", "nl":"📕 PDF-assistent", "de":"📕 PDF-Assistent"},
-    "nav_home":    {"en":"📕 PDF Assistant", "fr":"📕 Assistant PDF", "nl":"📕 PDF-assistent", "de":"📕 PDF-Assistent"},
-    "nav_how":     {"en":"📘 How to use",    "fr":"📘 Mode d’emploi",  "nl":"📘 Handleiding",   "de":"📘 Anleitung"},
-
-    # Sidebar — section
-    "sidebar_user":        {"en":"Access information", "fr":"Données d'accès", "nl":"Gebruikerstoegang", "de":"Benutzer"},
-    "user_id":             {"en":"User ID", "fr":"Identifiant", "nl":"Gebruikers-ID", "de":"Benutzer-ID"},
-    "user_id_ph":          {"en":"Enter the ID you received to use the tool",
-                            "fr":"Entrez l’identifiant reçu pour utiliser l’outil",
-                            "nl":"Voer de ontvangen ID in om de tool te gebruiken",
-                            "de":"Geben Sie die erhaltene ID ein, um das Tool zu nutzen"},
-    "user_id_help":        {"en":"An ID can be requested by email or by clicking on request button",
-                            "fr":"Un identifiant peut être demandé par e-mail ou via le bouton de demande",
-                            "nl":"Een ID kan per e-mail of via de aanvraagknop worden aangevraagd",
-                            "de":"Eine ID kann per E-Mail oder über die Anforderungsschaltfläche angefordert werden"},
-    "user_id_locked":      {"en":"User ID (locked)", "fr":"Identifiant (verrouillé)", "nl":"Gebruikers-ID (vergrendeld)", "de":"Benutzer-ID (gesperrt)"},
-    "user_locked_note":    {"en":"🔒 User ID is locked. Use **Reset** to change it.",
-                            "fr":"🔒 Identifiant verrouillé. Utilisez **Réinitialiser** pour le modifier.",
-                            "nl":"🔒 ID is vergrendeld. Gebruik **Reset** om te wijzigen.",
-                            "de":"🔒 ID ist gesperrt. Mit **Zurücksetzen** ändern."},
-
-    # Sidebar — buttons
-    "btn_start":   {"en":"Start session", "fr":"Démarrer la session", "nl":"Sessie starten", "de":"Sitzung starten"},
-    "btn_request": {"en":"Request access", "fr":"Demander l’accès", "nl":"Toegang aanvragen", "de":"Zugang anfordern"},
-    "btn_reset":   {"en":"Reset session", "fr":"Réinitialiser", "nl":"Reset sessie", "de":"Sitzung zurücksetzen"},
-    "already_have_access_help": {"en":"Disabled because you already have access.",
-                                 "fr":"Désactivé car vous avez déjà l’accès.",
-                                 "nl":"Uitgeschakeld omdat je al toegang hebt.",
-                                 "de":"Deaktiviert, da Sie bereits Zugang haben."},
-
-    # Status banner
-    "status_role":   {"en":"Role", "fr":"Rôle", "nl":"Rol", "de":"Rolle"},
-    "status_access": {"en":"Access", "fr":"Accès", "nl":"Toegang", "de":"Zugriff"},
-    "status_rights": {"en":"Rights", "fr":"Droits", "nl":"Rechten", "de":"Berechtigungen"},
-
-    # Upload
-    "h_upload":       {"en":"📄 Upload PDF", "fr":"📄 Charger un PDF", "nl":"📄 PDF uploaden", "de":"📄 PDF hochladen"},
-    "uploader_label": {"en":"Choose a PDF", "fr":"Choisissez un PDF", "nl":"Kies een PDF", "de":"Wählen Sie eine PDF"},
-    "btn_process":    {"en":"Process PDF", "fr":"Traiter le PDF", "nl":"PDF verwerken", "de":"PDF verarbeiten"},
-    "no_processed":   {"en":"No processed document yet.", "fr":"Aucun document traité.", "nl":"Nog geen verwerkt document.", "de":"Noch kein verarbeitetes Dokument."},
-    "new_selected":   {"en":"New file selected — not processed yet.", "fr":"Nouveau fichier sélectionné — non traité.", "nl":"Nieuw bestand geselecteerd — nog niet verwerkt.", "de":"Neue Datei ausgewählt — noch nicht verarbeitet."},
-    "processed":      {"en":"Processed ✓", "fr":"Traité ✓", "nl":"Verwerkt ✓", "de":"Verarbeitet ✓"},
-    "upload_failed":  {"en":"Upload failed", "fr":"Échec du chargement", "nl":"Upload mislukt", "de":"Upload fehlgeschlagen"},
-
-    # Context & language (UI)
-    "h_ctx_lang":     {"en":"⚙️ Context & language", "fr":"⚙️ Contexte & langue", "nl":"⚙️ Context & taal", "de":"⚙️ Kontext & Sprache"},
-    "answer_lang":    {"en":"Answer language", "fr":"Langue de réponse", "nl":"Antwoordtaal", "de":"Antwortsprache"},
-    "answer_lang_help":{"en":"This does not depend on the PDF’s language; it controls the answer language.",
-                        "fr":"Indépendant de la langue du PDF ; définit la langue de réponse.",
-                        "nl":"Staat los van de taal van de PDF; bepaalt de antwoordtaal.",
-                        "de":"Unabhängig von der PDF-Sprache; steuert die Antwortsprache."},
-    "ctx_label":      {"en":"Context", "fr":"Contexte", "nl":"Context", "de":"Kontext"},
-    "ctx_help":       {"en":"Choose how the assistant should read your document.",
-                       "fr":"Choisissez comment l’assistant doit lire votre document.",
-                       "nl":"Kies hoe de assistent je document moet lezen.",
-                       "de":"Wählen Sie, wie der Assistent Ihr Dokument lesen soll."},
-    "selected":       {"en":"Selected", "fr":"Sélection", "nl":"Gekozen", "de":"Auswahl"},
-
-    # Q&A
-    "h_ask":          {"en":"❓ Ask a question", "fr":"❓ Poser une question", "nl":"❓ Stel een vraag", "de":"❓ Frage stellen"},
-    "your_q":         {"en":"Your question", "fr":"Votre question", "nl":"Je vraag", "de":"Deine Frage"},
-    "q_ph":           {"en":"At least {n} characters…", "fr":"Au moins {n} caractères…", "nl":"Minstens {n} tekens…", "de":"Mindestens {n} Zeichen…"},
-    "verify":         {"en":"Verification", "fr":"Vérification", "nl":"Verificatie", "de":"Verifikation"},
-    "followups":      {"en":"Suggest follow-up questions", "fr":"Suggérer des questions de suivi", "nl":"Vervolgvragen voorstellen", "de":"Rückfragen vorschlagen"},
-    "btn_answer":     {"en":"Get answer", "fr":"Obtenir la réponse", "nl":"Antwoord ophalen", "de":"Antwort abrufen"},
-    "working":        {"en":"Working on your answer…", "fr":"Préparation de votre réponse…", "nl":"Bezig met je antwoord…", "de":"Antwort wird vorbereitet…"},
-    "answer_received":{"en":"Answer received in {s}", "fr":"Réponse reçue en {s}", "nl":"Antwoord ontvangen in {s}", "de":"Antwort erhalten in {s}"},
-    "req_failed":     {"en":"Request failed", "fr":"Échec de la requête", "nl":"Aanvraag mislukt", "de":"Anfrage fehlgeschlagen"},
-    "query_failed":   {"en":"Query failed", "fr":"Échec de la requête", "nl":"Aanvraag mislukt", "de":"Anfrage fehlgeschlagen"},
-
-    # Answer + meta
-    "h_answer":       {"en":"💬 Answer", "fr":"💬 Réponse", "nl":"💬 Antwoord", "de":"💬 Antwort"},
-    "meta_conf":      {"en":"Confidence", "fr":"Confiance", "nl":"Betrouwbaarheid", "de":"Konfidenz"},
-    "meta_model":     {"en":"Model", "fr":"Modèle", "nl":"Model", "de":"Modell"},
-    "meta_time":      {"en":"Time", "fr":"Durée", "nl":"Tijd", "de":"Zeit"},
-
-    # Follow-ups
-    "h_fu":           {"en":"🔍 Follow-up questions", "fr":"🔍 Questions de suivi", "nl":"🔍 Vervolgvragen", "de":"🔍 Rückfragen"},
-    "fu_clarify":     {"en":"Clarify", "fr":"Clarifier", "nl":"Verduidelijken", "de":"Klarstellen"},
-    "fu_deepen":      {"en":"Deepen", "fr":"Approfondir", "nl":"Verdiepen", "de":"Vertiefen"},
-    "fu_none_c":      {"en":"No clarify suggestions", "fr":"Aucune suggestion pour clarifier", "nl":"Geen verduidelijkingsvoorstellen", "de":"Keine Klarstellen-Vorschläge"},
-    "fu_none_d":      {"en":"No deepen suggestions", "fr":"Aucune suggestion pour approfondir", "nl":"Geen verdiepingsvoorstellen", "de":"Keine Vertiefungs-Vorschläge"},
-
-    # Citations & history
-    "h_citations":    {"en":"📝 Citations", "fr":"📝 Citations", "nl":"📝 Bronnen", "de":"📝 Quellen"},
-    "h_history":      {"en":"📚 Session history", "fr":"📚 Historique de session", "nl":"📚 Sessiegeschiedenis", "de":"📚 Sitzungsverlauf"},
-
-    # General/misc
-"unknown": {"en":"unknown","fr":"inconnu","nl":"onbekend","de":"unbekannt"},
-"info_enter_id": {
-  "en":"Enter a **User ID** in the sidebar, then click **Start session**.",
-  "fr":"Saisissez un **identifiant** dans la barre latérale, puis cliquez **Démarrer la session**.",
-  "nl":"Voer een **Gebruikers-ID** in de zijbalk in en klik **Sessie starten**.",
-  "de":"Geben Sie in der Seitenleiste eine **Benutzer-ID** ein und klicken Sie auf **Sitzung starten**."
-},
-"admin_check_failed": {
-  "en":"Admin check failed (missing/invalid admin key or /admin/keys error).",
-  "fr":"Vérification admin échouée (clé admin manquante/invalide ou erreur /admin/keys).",
-  "nl":"Admincontrole mislukt (ontbrekende/ongeldige adminkey of /admin/keys-fout).",
-  "de":"Admin-Prüfung fehlgeschlagen (fehlender/ungültiger Admin-Schlüssel oder /admin/keys-Fehler)."
-},
-
-# Rights labels (for the toast)
-"rights_all":           {"en":"✅ all rights","fr":"✅ tous droits","nl":"✅ alle rechten","de":"✅ alle Rechte"},
-"rights_upload_query":  {"en":"✅ upload + query","fr":"✅ upload + requête","nl":"✅ upload + query","de":"✅ Upload + Abfrage"},
-"rights_upload_only":   {"en":"⬆️ upload only","fr":"⬆️ upload seulement","nl":"⬆️ alleen uploaden","de":"⬆️ nur Upload"},
-"rights_query_only":    {"en":"🔎 query only","fr":"🔎 requête seulement","nl":"🔎 alleen query","de":"🔎 nur Abfrage"},
-"rights_none":          {"en":"⛔ no rights","fr":"⛔ aucun droit","nl":"⛔ geen rechten","de":"⛔ keine Rechte"},
-
-"h_access_request": {"en":"✉️ Access request","fr":"✉️ Demande d’accès","nl":"✉️ Toegangsaanvraag","de":"✉️ Zugriffsanfrage"},
-"first_name": {"en":"First name*","fr":"Prénom*","nl":"Voornaam*","de":"Vorname*"},
-"last_name":  {"en":"Last name*","fr":"Nom*","nl":"Achternaam*","de":"Nachname*"},
-"email_lbl":  {"en":"Email*","fr":"Email*","nl":"E-mail*","de":"E-Mail*"},
-"mobile_opt": {"en":"Mobile phone (optional)","fr":"Téléphone portable (optionnel)","nl":"Mobiele telefoon (optioneel)","de":"Mobiltelefon (optional)"},
-"company":    {"en":"Company / Organization*","fr":"Entreprise / Organisation*","nl":"Bedrijf / Organisatie*","de":"Firma / Organisation*"},
-"reason_lbl": {"en":"Reason for request*","fr":"Motif de la demande*","nl":"Reden voor aanvraag*","de":"Grund der Anfrage*"},
-"reason_ph":  {"en":"Tell us briefly why you need access…","fr":"Expliquez brièvement pourquoi vous avez besoin d’un accès…","nl":"Leg kort uit waarom je toegang nodig hebt…","de":"Warum benötigen Sie Zugriff? (kurz)…"},
-"human_q":    {"en":"Human check: what is {a} + {b} ?","fr":"Vérification : combien font {a} + {b} ?","nl":"Menscheck: wat is {a} + {b} ?","de":"Prüfung: Wie viel ist {a} + {b} ?"},
-"btn_submit": {"en":"Submit request","fr":"Envoyer la demande","nl":"Aanvraag versturen","de":"Anfrage senden"},
-"form_success":{"en":"Thank you! Your request has been sent. We will be shortly in contact.",
-                "fr":"Merci ! Votre demande a été envoyée. Nous vous contacterons prochainement.",
-                "nl":"Bedankt! Je aanvraag is verzonden. We nemen spoedig contact op.",
-                "de":"Danke! Ihre Anfrage wurde gesendet. Wir melden uns in Kürze."},
-"form_failed": {"en":"Sending request failed.","fr":"Échec de l’envoi de la demande.","nl":"Verzenden van de aanvraag mislukt.","de":"Senden der Anfrage fehlgeschlagen."},
-"backend_recorded":{"en":"Request recorded by backend.","fr":"Demande enregistrée par le backend.","nl":"Aanvraag door backend geregistreerd.","de":"Anfrage im Backend erfasst."},
-
-# validation
-"err_firstname":{"en":"First name invalid (2–40 letters, spaces, hyphens, apostrophes).",
-                 "fr":"Prénom invalide (2–40 lettres, espaces, traits d’union, apostrophes).",
-                 "nl":"Voornaam ongeldig (2–40 letters, spaties, koppeltekens, apostrofs).",
-                 "de":"Vorname ungültig (2–40 Buchstaben, Leerzeichen, Bindestriche, Apostrophe)."},
-"err_lastname":{"en":"Last name invalid (2–40 letters, spaces, hyphens, apostrophes).",
-                "fr":"Nom invalide (2–40 lettres, espaces, traits d’union, apostrophes).",
-                "nl":"Achternaam ongeldig (2–40 letters, spaties, koppeltekens, apostrofs).",
-                "de":"Nachname ungültig (2–40 Buchstaben, Leerzeichen, Bindestriche, Apostrophe)."},
-"err_email":{"en":"Please provide a valid email address.","fr":"Veuillez fournir une adresse e-mail valide.","nl":"Geef een geldig e-mailadres op.","de":"Bitte eine gültige E-Mail-Adresse angeben."},
-"err_company":{"en":"Company / Organization is required.","fr":"Entreprise / Organisation obligatoire.","nl":"Bedrijf / Organisatie is verplicht.","de":"Firma / Organisation ist erforderlich."},
-"err_reason":{"en":"Reason should be at least 10 characters.","fr":"Le motif doit contenir au moins 10 caractères.","nl":"Reden moet minstens 10 tekens bevatten.","de":"Der Grund muss mindestens 10 Zeichen haben."},
-"err_mobile":{"en":"Mobile phone must be a valid international number (e.g., +3212345678).",
-              "fr":"Le téléphone portable doit être un numéro international valide (ex. +3212345678).",
-              "nl":"Mobiel nummer moet een geldig internationaal nummer zijn (bijv. +3212345678).",
-              "de":"Mobilnummer muss eine gültige internationale Nummer sein (z. B. +3212345678)."},
-"err_human_wrong":{"en":"Human check failed. Please try again.","fr":"Vérification échouée. Réessayez.","nl":"Menscheck mislukt. Probeer opnieuw.","de":"Prüfung fehlgeschlagen. Bitte erneut versuchen."},
-"err_human_nan":{"en":"Human check failed. Please enter a number.","fr":"Vérification échouée. Entrez un nombre.","nl":"Menscheck mislukt. Voer een getal in.","de":"Prüfung fehlgeschlagen. Bitte eine Zahl eingeben."},
-"ui_lang_label": {
-  "en":"Interface language",
-  "fr":"Langue de l’interface",
-  "nl":"Taal van de interface",
-  "de":"Sprache der Oberfläche"
-},
-}
-
 def _tr(key: str, **fmt) -> str:
-    lang = st.session_state.get("ui_lang", "en")
-    val = (I18N.get(key, {}) or {}).get(lang) or (I18N.get(key, {}) or {}).get("en") or key
-    return val.format(**fmt)
-
-# --- Safe secrets/env bootstrap ---
-def _secrets_available() -> bool:
-    # Only probe st.secrets if a secrets file is present
-    return Path(".streamlit/secrets.toml").exists() or Path.home().joinpath(".streamlit/secrets.toml").exists()
-
-if _secrets_available():
-    ST_SECRETS: dict = dict(st.secrets)
-else:
-    ST_SECRETS = {}
-
-# Admin key (prefer secrets, fallback to env loaded by dotenv)
-ak = (ST_SECRETS.get("admin", {}) or {}).get("api_key", "") or os.getenv("UI_ADMIN_API_KEY") or os.getenv("ADMIN_API_KEY", "")
-if ak:
-    os.environ["UI_ADMIN_API_KEY"] = str(ak).strip()
-
-
-# ===== Admin/API diagnostics =====
-API_BASE = os.getenv("API_BASE_URL", "http://localhost:8000")
-
-def _mask(s: str | None) -> str:
-    if not s:
-        return "—"
-    return (s[:3] + "..." + s[-3:]) if len(s) > 8 else "***"
-
-ADMIN_KEY = os.getenv("UI_ADMIN_API_KEY") or os.getenv("ADMIN_API_KEY")
-
-# ==================== CONFIG ====================
-UPLOAD_PATH         = os.getenv("UPLOAD_PATH", "/documents")
-QUERY_PATH          = os.getenv("QUERY_PATH", "/documents/query")
-UPLOAD_FILE_FIELD   = os.getenv("UPLOAD_FILE_FIELD", "pdf")
-MIN_QUESTION_CHARS  = int(os.getenv("MIN_QUESTION_CHARS", "10"))
-LANG_LABEL_TO_CODE = {"NL":"nl","FR":"fr","DE":"de","EN":"en"}
+    return tr(key, st.session_state.get("ui_lang", "en"), **fmt)
 
 # ---- Global styles + overview (RIGHT BELOW THE TITLE) ----
+st.markdown(APP_CSS, unsafe_allow_html=True)
 st.title(_tr("app_title"))
 
 # ==================== UI helpers ====================
@@ -230,18 +54,6 @@ def show_verification(v: dict | None):
     icon  = "✅" if ok else "⚠️"
     #title = "Accurate" if ok else "Please double-check"
 
-    st.markdown("""
-    <style>
-
-      .verif-title{
-        font-weight:800;
-        font-size:1.1rem;
-        margin:0 0 .25rem 0;
-      }
-      .verif-meta{ opacity:.9; margin-bottom:.5rem }
-      .verif-list li{ margin-bottom:.15rem }
-    </style>
-    """, unsafe_allow_html=True)
 
     st.subheader(f"🚦{_tr('verify')}")   # same level/size as “💬 Answer”
     st.markdown("<div class='verif-card'>", unsafe_allow_html=True)
@@ -276,58 +88,79 @@ def show_verification(v: dict | None):
 #        st.markdown(f"- **{meta}** — {snippet}")
 
 def show_citations(cits: list | None):
+    # `cits` went through normalize_citations when the answer arrived: no sorting here
     if not cits:
         return
+    with st.expander(f"{_tr('h_citations')} ({len(cits)})", expanded=False):
+        st.markdown(citations_html(cits), unsafe_allow_html=True)
+
+def show_followups(f: dict | None):
+    f = f or {}
+    clarify = f.get("clarify") or []
+    deepen  = f.get("deepen") or []
+    if not (clarify or deepen):
+        return
+    st.subheader(_tr("h_fu"))
+
+    col_c, col_d = st.columns(2, gap="large")
+
+    with col_c:
+        st.markdown('<div class="fu-card"><div class="fu-title">🧼 '+_tr("fu_clarify")+'</div>', unsafe_allow_html=True)
+        if clarify:
+            for i, q2 in enumerate(clarify, 1):
+                if st.button(
+                    q2,
+                    key=f"clarify_{i}_{abs(hash(q2))}",
+                    use_container_width=True,
+                    on_click=_choose_followup,
+                    args=(q2,),
+                    ):
+                    st.session_state.followup_q = q2   # triggers auto-run on next render
+                    st.session_state.q_text = q2
+                    st.rerun(scope="fragment")
+        else:
+            st.markdown('<div class="fu-empty">'+_tr("fu_none_c")+'</div>', unsafe_allow_html=True)
+        st.markdown('</div>', unsafe_allow_html=True)
+
+    with col_d:
+        st.markdown('<div class="fu-card"><div class="fu-title">🧠 '+_tr("fu_deepen")+'</div>', unsafe_allow_html=True)
+        if deepen:
+            for i, q2 in enumerate(deepen, 1):
+                if st.button(
+                    q2,
+                    key=f"deepen_{i}_{abs(hash(q2))}",
+                    use_container_width=True,
+                    on_click=_choose_followup,
+                    args=(q2,),
+                    ):
+                    st.session_state.followup_q = q2   # triggers auto-run on next render
+                    st.session_state.q_text = q2
+                    st.rerun(scope="fragment")
+        else:
+            st.markdown('<div class="fu-empty">'+_tr("fu_none_d")+'</div>', unsafe_allow_html=True)
+        st.markdown('</div>', unsafe_allow_html=True)
+
+def show_answer_meta(res: dict, total_elapsed: float, cache_age: float | None = None):
+    conf = res.get("confidence_score", 0)
+    model = res.get("model") or res.get("model_used") or "unknown"
+    m1, m2, m3 = st.columns([1,1,1])
+    with m1: st.caption(f'🎯 {_tr("meta_conf")}: {conf if isinstance(conf,(int,float)) else str(conf)}')
+    with m2: st.caption(f'🧠 {_tr("meta_model")}: {model}')
+    if cache_age is not None:
+        with m3: st.caption(f'⚡ {_tr("meta_time")}: {_fmt_secs(total_elapsed)} ({_tr("meta_cached", age=_fmt_age(cache_age))})')
+    else:
+        with m3: st.caption(f'⏱️ {_tr("meta_time")}: {_fmt_secs(total_elapsed)}')
+    #with m3: st.caption(f'🌐 Language hint: {st.session_state.lang_code.upper()}')
 
-    # Sort by page if available (so opening the block feels organized)
-    try:
-        cits_sorted = sorted(cits, key=lambda x: (x.get("page") is None, x.get("page")))
-    except Exception:
-        cits_sorted = cits
-
-    st.markdown("""
-    <style>
-      .cite-item{
-        border:1px solid rgba(49,51,63,.15);
-        border-radius:.5rem;
-        padding:.6rem .75rem;
-        margin:.5rem 0;
-        background: rgba(240,242,246,.25);
-      }
-      .page-pill{
-        display:inline-block;
-        padding:.15rem .6rem;
-        border-radius:999px;
-        font-weight:700;
-        border:1px solid rgba(49,51,63,.25);
-        margin-right:.5rem;
-      }
-      .cite-meta{
-        font-weight:600;
-        opacity:.85;
-      }
-      .cite-snippet{
-        margin-top:.35rem;
-      }
-    </style>
-    """, unsafe_allow_html=True)
-
-    with st.expander(f"{_tr('h_citations')} ({len(cits_sorted)})", expanded=False):
-        for c in cits_sorted:
-            page = c.get("page")
-            section = c.get("section")
-            snippet = (c.get("snippet") or "").strip()
-
-            page_txt = f"Page {page}" if page else "Page —"
-            section_txt = f"— {section}" if section else ""
-
-            st.markdown(f"""
-            <div class="cite-item">
-              <span class="page-pill">{page_txt}</span>
-              <span class="cite-meta">{section_txt}</span>
-              <div class="cite-snippet">{snippet}</div>
-            </div>
-            """, unsafe_allow_html=True)
+def show_http_timing(timing: dict | None):
+    # Debug only (UI_DEBUG_TIMING=1): where the backend call spent its time
+    if not timing:
+        return
+    parts = [f"{k} {timing[k] * 1000:.0f} ms" for k in ("dns", "connect", "tls", "send", "ttfb", "download")
+             if timing.get(k) is not None]
+    if timing.get("bytes"):
+        parts.append(f"{timing['bytes'] / 1024:.1f} KB")
+    st.caption(f'🔬 {_tr("meta_http")}: ' + " · ".join(parts))
 
 # ==================== SESSION ====================
 for k, v in {
@@ -335,7 +168,7 @@ for k, v in {
     "role": None,
     "can_query": False,
     "doc_id": None,
-    "history": [],
+    "history": None,
     "q_text": "",
     "lang_code": "fr",  # default FR
     "show_request_form": False,
@@ -349,20 +182,15 @@ for k, v in {
     "processed_name": None,
     "processed_size": None,
     "context_id": "755890001",
+    "docs": {},
+    "upload_sha": {},
+    "upload_resume": {},
 }.items():
     if k not in st.session_state:
         st.session_state[k] = v
+if st.session_state.history is None:
+    st.session_state.history = SessionHistory()
 
-st.markdown("""
-<style>
-/* hide any anchor linking to your repo anywhere on the page */
-a[href*="github.com/your-org/your-repo"] { display: none !important; }
-
-/* hide a specific image (choose one selector that matches yours) */
-img[src*="avatars.githubusercontent.com/"] { display: none !important; }  /* GH avatar */
-img[alt="Your Avatar"] { display: none !important; }                      /* by alt text */
-</style>
-""", unsafe_allow_html=True)
 
 # ==================== STATUS BANNER ====================
 uid  = st.session_state["public_user_id"].strip()
@@ -398,9 +226,6 @@ with cols[2]:
 st.markdown("<div style='height:12px'></div>", unsafe_allow_html=True)
 
 # ==================== SIDEBAR ====================
-# Hide Streamlit's default sidebar nav
-st.markdown("<style>[data-testid='stSidebarNav']{display:none}</style>", unsafe_allow_html=True)
-
 # UI language selector
 st.sidebar.radio(
     _tr("ui_lang_label"),
@@ -456,17 +281,19 @@ with st.sidebar:
                 st.session_state.can_query = st.session_state.can_query_right
 
                 rights = set(st.session_state.rights)
+                new_upload = st.session_state.can_upload_right
+                new_query  = st.session_state.can_query_right
                 if "*" in rights:
                     access_icon, access_tip = "✅", _tr("rights_all")
-                elif can_upload and can_query_right:
+                elif new_upload and new_query:
                     access_icon, access_tip = "✅", _tr("rights_upload_query")
-                elif can_upload:
+                elif new_upload:
                     access_icon, access_tip = "⬆️", _tr("rights_upload_only")
-                elif can_query_right:
+                elif new_query:
                     access_icon, access_tip = "🔎", _tr("rights_query_only")
                 else:
                     access_icon, access_tip = "⛔", _tr("rights_none")
-                st.toast(f"{_tr('status_role')}: {st.session_state.role or _tr('unknown')} — {label}", icon=icon)
+                st.toast(f"{_tr('status_role')}: {st.session_state.role or _tr('unknown')} — {access_tip}", icon=access_icon)
 
             # 🔒 Lock the ID after attempting to start the session
             st.session_state.uid_locked = True
@@ -482,6 +309,7 @@ with st.sidebar:
         with c3:
             if st.button(_tr("btn_reset")):
                 # Fully reset: clear widget + app state
+                st.session_state.history.clear()  # also drops the entries spilled to disk
                 for k in (
                     "user_id_input",        # ← the text_input widget's state
                     "public_user_id",
@@ -492,6 +320,8 @@ with st.sidebar:
                     "can_query",
                     "doc_id",
                     "history",
+                    "history_page",
+                    "history_open",
                     "q_text",
                     "show_request_form",
                     "hc_a",
@@ -499,7 +329,12 @@ with st.sidebar:
                     "uid_locked",
                     "processed_token",
                     "processed_name",
-                    "processed_size"
+                    "processed_size",
+                    "upload_resume",
+                    "upload_sha",
+                    "batch_rows",
+                    "docs",
+                    "target_docs",
                 ):
                     st.session_state.pop(k, None)
                 st.rerun()
@@ -588,125 +423,118 @@ st.header(_tr("h_upload"))
 can_upload = bool(st.session_state.can_upload_right)
 
 # Use a stable key so we can reset uploader later if needed
-upload = st.file_uploader(_tr("uploader_label"), type="pdf", disabled=not can_upload, key="pdf_uploader")
+uploads_sel = st.file_uploader(_tr("uploader_label"), type="pdf", disabled=not can_upload,
+                               key="pdf_uploader", accept_multiple_files=True) or []
 
 def _upload_token(u):
     if not u:
         return None
-    try:
-        size = len(u.getbuffer())  # reliable across reruns
-    except Exception:
-        size = len(u.getvalue())
+    size = getattr(u, "size", None)  # UploadedFile knows its size; no buffer access needed
+    if size is None:
+        size = u.seek(0, 2)
+        u.seek(0)
     return f"{u.name}:{size}", u.name, size
 
-# Derive current selection token (if any)
-if upload:
-    current_token, current_name, current_size = _upload_token(upload)
-else:
-    current_token, current_name, current_size = None, None, None
+# Processed documents of this session, keyed by selection token
+docs = st.session_state.docs
+selected = [(u, *_upload_token(u)) for u in uploads_sel]
+pending = [(u, tok, name, size) for u, tok, name, size in selected if tok not in docs]
 
 # Is there a new (unprocessed) selection?
-is_new_unprocessed = bool(upload) and (st.session_state.processed_token != current_token)
+is_new_unprocessed = bool(pending)
 
 # --- Persistent processed status badge ---
 status_col1, status_col2 = st.columns([0.8, 0.2])
 
 with status_col1:
-    if st.session_state.doc_id and not is_new_unprocessed:
-        # Show the processed badge even if no file is currently selected
-        shown_name = current_name or st.session_state.processed_name or "document"
-        st.success(f"{_tr('processed')} — {shown_name}")
-    elif is_new_unprocessed:
-        st.warning(_tr("new_selected"))
-    else:
+    if docs:
+        # Show the processed badges even if no file is currently selected
+        for d in docs.values():
+            st.success(f"{_tr('processed')} — {d['name']}")
+    if is_new_unprocessed:
+        st.warning(_tr("new_selected") + " (" + ", ".join(name for _, _, name, _ in pending) + ")")
+    elif not docs:
         st.info(_tr("no_processed"))
 
 with status_col2:
     # Show "Process PDF" only when a new file is selected
-    show_process_btn = can_upload and is_new_unprocessed and (upload is not None)
-    if show_process_btn and st.button(_tr("btn_process"), type="primary", use_container_width=True):
-        files = {UPLOAD_FILE_FIELD: (upload.name, upload.getvalue(), "application/pdf")}
-
-        # ---- ensure API key is attached ----
-        api_key = os.getenv("UI_ADMIN_API_KEY") or os.getenv("ADMIN_API_KEY") or ""
-        headers = {"X-User-Id": st.session_state.public_user_id.strip()}
-        if api_key:
-            headers["X-API-Key"] = api_key
-
-        r = _req("POST", UPLOAD_PATH, user_id=st.session_state.public_user_id.strip(), files=files, headers=headers)
-        if getattr(r, "ok", False):
-            st.session_state.doc_id = (r.json() or {}).get("doc_id")
-            st.session_state.processed_token = current_token
-            st.session_state.processed_name  = current_name
-            st.session_state.processed_size  = current_size
-            st.toast(_tr("processed"), icon="✅")
-            st.rerun()  # immediately reflect that Q&A can be shown
-        else:
-            st.error(f"{_tr('upload_failed')}: {getattr(r, 'status_code', '?')} {getattr(r, 'text', '')}")
+    show_process_btn = can_upload and is_new_unprocessed
+    process_click = show_process_btn and st.button(_tr("btn_process"), type="primary", use_container_width=True)
+
+if process_click:
+    # ---- ensure API key is attached ----
+    uid_h = st.session_state.public_user_id.strip()
+    api_key = os.getenv("UI_ADMIN_API_KEY") or os.getenv("ADMIN_API_KEY") or ""
+    headers = {"X-User-Id": uid_h}
+    if api_key:
+        headers["X-API-Key"] = api_key
+
+    # Hashes and resume offsets survive reruns, per selected file
+    hashes  = st.session_state.upload_sha
+    resumes = st.session_state.upload_resume
+    progress = {tok: (0, size or 1) for _, tok, _, size in pending}
+    bars = {tok: st.progress(0, text=f"{name} — {_tr('uploading', p=0)}") for _, tok, name, _ in pending}
+
+    def _progress_for(tok):
+        def _set(sent: int, total: int):
+            progress[tok] = (sent, total or 1)  # written by a worker thread, drawn by the script thread
+        return _set
+
+    # Not a `with` block: if a rerun interrupts the wait loop, leave in-flight uploads to
+    # finish in the background (their resume offsets are kept) instead of blocking on them.
+    pool = ThreadPoolExecutor(max_workers=max(1, min(INGEST_WORKERS, len(pending))), thread_name_prefix="ingest")
+    try:
+        futures = {
+            pool.submit(ingest_pdf, u, uid_h, headers, resumes.setdefault(tok, {}),
+                        _progress_for(tok), hashes.get(tok)): (tok, name, size)
+            for u, tok, name, size in pending
+        }
+        waiting = set(futures)
+        while waiting:
+            _, waiting = wait(waiting, timeout=0.25)
+            for _, tok, name, _ in pending:
+                sent, total = progress[tok]
+                pct = min(100, int(sent * 100 / total))
+                bars[tok].progress(pct, text=f"{name} — {_tr('uploading', p=pct)}")
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    errors = []
+    for fut, (tok, name, size) in futures.items():
+        try:
+            ok, resp, reused, sha = fut.result()
+        except Exception as e:
+            ok, resp, reused, sha = False, f"{type(e).__name__}: {e}", False, None
+        if sha:
+            hashes[tok] = sha
+        if not ok:
+            errors.append(f"{name}: {resp}")
+            continue
+        resumes.pop(tok, None)
+        doc_id = (resp or {}).get("doc_id")
+        if not reused:
+            invalidate_doc_answers(doc_id)  # re-processed: old answers may be stale
+        docs[tok] = {"doc_id": doc_id, "name": name, "size": size}
+        st.session_state.doc_id = doc_id
+        st.session_state.processed_token = tok
+        st.session_state.processed_name  = name
+        st.session_state.processed_size  = size
+        st.toast(_tr("already_processed") if reused else f"{_tr('processed')} — {name}", icon="♻️" if reused else "✅")
+    for bar in bars.values():
+        bar.empty()
+    if len(errors) < len(futures):
+        invalidate_access_index()  # an upload may use up a quota or change the key's rights
+    if errors:
+        for e in errors:
+            st.error(f"{_tr('upload_failed')}: {e}")
+    else:
+        st.rerun()  # immediately reflect that Q&A can be shown
 # ==================== Context & language ====================
-CONTEXTS = {
-    "755890001": {
-        "label_en":"📜 Legal text",
-        "label_fr":"📜 Texte juridique",
-        "label_nl":"📜 Juridische tekst",
-        "label_de":"📜 Rechtstext",
-        "followup_hint":"Ask for article numbers, definitions, exceptions, effective dates."
-        },
-    "755890002": {
-        "label_en":"🧩 Specifications",
-        "label_fr":"🧩 Cahier des charges",
-        "label_nl":"🧩 Lastenboek",
-        "label_de":"🧩 Pflichtenheft",
-        "followup_hint":"Probe priorities, acceptance criteria, dependencies, deadlines."
-        },
-    "755890003": {
-        "label_en":"🔧 User manual",
-        "label_fr":"🔧 Mode d’emploi",
-        "label_nl":"🔧 Handleiding",
-        "label_de":"🔧 Bedienungsanleitung",
-        "followup_hint":"Offer variants per OS/model, safety notes, quick-start tips."
-        },
-    "755890004": {
-        "label_en":"📘 Course",
-        "label_fr":"📘 Cours",
-        "label_nl":"📘 Cursus",
-        "label_de":"📘 Kurs",
-        "followup_hint":"Suggest exercises, prerequisite refreshers, exam-style questions."
-        },
-    "755890005": {
-        "label_en":"📊 Financial report",
-        "label_fr":"📊 Rapport financier",
-        "label_nl":"📊 Financieel rapport",
-        "label_de":"📊 Finanzbericht",
-        "followup_hint":"Probe unusual variances, accounting policies, and segment notes."
-        },
-    "755890006": {
-        "label_en":"🔬 Scientific paper",
-        "label_fr":"🔬 Article scientifique",
-        "label_nl":"🔬 Wetenschappelijk artikel",
-        "label_de":"🔬 Wissenschaftliche Arbeit",
-        "followup_hint":"Ask about sample size, controls, effect sizes, confidence intervals."
-        },
-    "755890007": {
-        "label_en":"📑 Policy / Compliance",
-        "label_fr":"📑 Politique / Conformité",
-        "label_nl":"📑 Beleid / Compliance",
-        "label_de":"📑 Richtlinie / Compliance",
-        "followup_hint":"Probe ownership, timelines, and evidence needed for compliance."
-        },
-}
-LANG_LABEL_TO_CODE = {"NL":"nl","FR":"fr","DE":"de","EN":"en"}
-
-def _ctx_label(cid: str, lang_code: str) -> str:
-    d = CONTEXTS.get(cid, {})
-    key = f"label_{(lang_code or 'en').lower()}"
-    return d.get(key) or d.get("label_en") or cid
-
 def _choose_followup(q2: str):
     st.session_state.q_text = q2
     st.session_state.followup_q = q2    # so the prefill block above runs
     st.session_state._from_followup = True   # optional: to auto-run
-    st.rerun()
+    # No st.rerun(): the click already reruns the Q&A fragment that owns the button
 
 # ==================== Q&A ====================
 can_show_qna = bool(st.session_state.get("doc_id")) and not is_new_unprocessed
@@ -725,7 +553,7 @@ if can_show_qna:
     st.session_state.lang_code = LANG_LABEL_TO_CODE[lang_choice]
 
     # ---- Context (dropdown)
-    label_key = f"label_{st.session_state.ui_lang.lower()}"
+    ui_lang = st.session_state.ui_lang
     ctx_ids = list(CONTEXTS.keys())
     # current index
     cur_idx = next((i for i, cid in enumerate(ctx_ids) if cid == st.session_state.context_id), 0)
@@ -733,13 +561,93 @@ if can_show_qna:
         _tr("ctx_label"),
         options=ctx_ids,
         index=cur_idx,
-        format_func=lambda cid: CONTEXTS[cid].get(label_key) or CONTEXTS[cid]["label_en"],
+        format_func=lambda cid: ctx_label(cid, ui_lang),
         help=_tr("ctx_help")
     )
     st.session_state.context_id = selected_ctx_id
 
     # (optional) tiny caption with the chosen label
-    st.caption(f"{_tr('selected')}: {_ctx_label(st.session_state.context_id, st.session_state.ui_lang)}")
+    st.caption(f"{_tr('selected')}: {ctx_label(st.session_state.context_id, st.session_state.ui_lang)}")
+
+    # ---- Target document(s): only asked when the session holds several
+    doc_names = {d["doc_id"]: d["name"] for d in st.session_state.docs.values()}
+    if not doc_names:
+        doc_names = {st.session_state.doc_id: st.session_state.processed_name or "document"}
+    if len(doc_names) > 1:
+        target_ids = st.multiselect(
+            _tr("target_docs"),
+            options=list(doc_names.keys()),
+            default=[st.session_state.doc_id] if st.session_state.doc_id in doc_names else None,
+            format_func=lambda did: doc_names.get(did, did),
+            key="target_docs",
+        ) or [st.session_state.doc_id]
+    else:
+        target_ids = list(doc_names.keys())
+
+# Each region below is a fragment: interacting inside it (asking, clicking a
+# follow-up, paging) reruns only that region, not the banner/sidebar/uploader.
+
+# ==================== HISTORY ====================
+def _toggle_history_entry(n: int):
+    opened = st.session_state.history_open
+    if n in opened:
+        del opened[n]
+    else:
+        opened[n] = None  # the full entry, once a spilled one has been read
+
+def _history_page_step(delta: int):
+    st.session_state.history_page = max(0, st.session_state.history_page + delta)
+
+def show_history_entry(e: HistoryEntry, is_open: bool):
+    # A button instead of an expander: an expander's body is built on every
+    # rerun even when collapsed, this one only while the entry is open.
+    st.button(f"{'▾' if is_open else '▸'} Q{e.n}: {e.q[:80]}…", key=f"hist_{e.n}", use_container_width=True,
+              on_click=_toggle_history_entry, args=(e.n,))
+    if not is_open:
+        return
+    if e.answer is None:
+        # spilled entry: read its answer from disk once, then keep it while the entry stays open
+        opened = st.session_state.history_open
+        if opened.get(e.n) is None:
+            opened[e.n] = st.session_state.history.get(e.n)
+        e = opened[e.n] or e
+    with st.container(border=True):
+        st.write(e.answer or "")
+        conf = e.confidence if e.confidence is not None else 0
+        st.caption(
+            f'🎯 {conf if isinstance(conf,(int,float)) else str(conf)} • '
+            f'🧠 {e.model} • '
+            f'⏱️ {_fmt_secs(e.total_s) if e.total_s is not None else "—"} '
+            #f'• 🔌 {_fmt_secs(e.api_s) if e.api_s is not None else "—"}'
+        )
+
+@st.fragment
+def history_region():
+    history = st.session_state.history
+    if not len(history):
+        return
+    st.header(_tr("h_history"))
+    st.session_state.setdefault("history_page", 0)
+    st.session_state.setdefault("history_open", {})
+    n_pages = history.pages()
+    page = st.session_state.history_page = min(st.session_state.history_page, n_pages - 1)
+
+    # Only this page is built, so a rerun costs the same after 10 or 1000 questions
+    for e in history.page(page):
+        show_history_entry(e, e.n in st.session_state.history_open)
+
+    if n_pages > 1:
+        c1, c2, c3 = st.columns([1, 2, 1])
+        with c1: st.button("◀", key="hist_newer", disabled=page == 0, on_click=_history_page_step, args=(-1,),
+                           use_container_width=True)
+        with c2: st.caption(_tr("history_page", p=page + 1, n=n_pages))
+        with c3: st.button("▶", key="hist_older", disabled=page >= n_pages - 1, on_click=_history_page_step, args=(1,),
+                           use_container_width=True)
+
+@st.fragment
+def qna_region(uid: str, can_query_right: bool, doc_names: dict, target_ids: list):
+    target_doc_id = target_ids[0]
+    multi_doc = len(target_ids) > 1
     st.header(_tr("h_ask"))
     auto_q = st.session_state.pop("followup_q", None)
     if auto_q:
@@ -770,13 +678,15 @@ if can_show_qna:
                 #status.write("Preparing answer")
                 #prog.progress(10)
                 payload = {
-                    "doc_id": st.session_state.doc_id,
+                    "doc_id": target_doc_id,
                     "question": q,
                     "do_verify": do_verify,
                     "do_followups": do_followups,
                     "lang_hint": st.session_state.lang_code,
                     "context_id": st.session_state.context_id,
                 }
+                if STREAM_ANSWERS:
+                    payload["stream"] = True
 
                 status.update(label=_tr("working"))
                 #prog.progress(40)
@@ -785,92 +695,125 @@ if can_show_qna:
                 headers = {"X-User-Id": uid}
                 if api_key:
                     headers["X-API-Key"] = api_key
+                if STREAM_ANSWERS:
+                    headers["Accept"] = "text/event-stream, application/x-ndjson, application/json"
+
+                cache_key = answer_cache_key(uid, target_doc_id, q, st.session_state.lang_code,
+                                             st.session_state.context_id, do_verify, do_followups)
+                cached = None if multi_doc else get_cached_answer(cache_key)
 
-                # ⏱️ API timing
+                # ⏱️ API timing (for a streamed answer the body is still being produced here)
                 t_api_start = time.perf_counter()
-                r = _req("POST", QUERY_PATH, user_id=uid, json=payload, headers=headers)
+                if multi_doc:
+                    # Fan out to every selected document in parallel, then merge
+                    r, streaming = None, False
+                    base = {k: v for k, v in payload.items() if k not in ("question", "stream")}
+                    per_doc = ask_documents(q, base, [(did, doc_names.get(did, did)) for did in target_ids],
+                                            uid, {k: v for k, v in headers.items() if k != "Accept"})
+                    multi_res = merge_results(per_doc)
+                elif cached:
+                    r, streaming = None, False
+                else:
+                    r = _req("POST", QUERY_PATH, user_id=uid, json=payload, headers=headers, stream=STREAM_ANSWERS)
+                    streaming = getattr(r, "ok", False) and is_event_stream(r)
+                    if not streaming and getattr(r, "status_code", 0):
+                        _ = r.content  # read the whole JSON (or error) body inside the timed section
+                        finish_stream_timing(r)
                 api_elapsed = time.perf_counter() - t_api_start
 
                 #prog.progress(100)
                 total_elapsed = time.perf_counter() - t_total_start
-                status.update(label=_tr("answer_received", s=_fmt_secs(total_elapsed)), state="complete")
+                if not streaming:
+                    status.update(label=_tr("answer_received", s=_fmt_secs(total_elapsed)), state="complete")
 
             prog_ph.empty()
             status_ph.empty()
 
-            if not getattr(r, "ok", False):
+            if multi_doc and not multi_res:
+                st.error(f"{_tr('query_failed')}: " + "; ".join(f"{n}: {st_}" for n, st_, _ in per_doc))
+            elif not multi_doc and not cached and not getattr(r, "ok", False):
                 status.update(label="❌ " + _tr("req_failed"), state="error")
                 st.error(f"{_tr('query_failed')}: {r.status_code} {r.text}")
             else:
-                res = r.json() or {}
                 st.subheader(_tr("h_answer"))
-                st.write(res.get("answer", ""))
-                conf = res.get("confidence_score", 0)
-                model = res.get("model") or res.get("model_used") or "unknown"
+                answer_ph = st.empty()
+                meta_ph   = st.empty()
+                verif_ph  = st.empty()
+                cits_ph   = st.empty()
+                fu_ph     = st.empty()
+                ttft_elapsed = None
+                cache_age = None
+                cits_norm = None   # the citations list already normalized for this answer
+                shown = {}         # part -> value drawn while streaming
+                stream_error = False
+
+                if streaming:
+                    res = {}
+                    try:
+                        for event, data in iter_stream_events(r):
+                            part = apply_answer_event(res, event, data)
+                            if part == "answer":
+                                if ttft_elapsed is None:
+                                    ttft_elapsed = time.perf_counter() - t_total_start
+                                answer_ph.markdown(res.get("answer", "") + " ▌")
+                            elif part == "verification":
+                                shown["verification"] = res.get("verification")
+                                with verif_ph.container():
+                                    show_verification(shown["verification"])
+                            elif part == "citations":
+                                res["citations"] = cits_norm = shown["citations"] = normalize_citations(res.get("citations"))
+                                with cits_ph.container():
+                                    show_citations(cits_norm)
+                            elif part == "followups" and "followups" not in shown:
+                                shown["followups"] = res.get("followups")
+                                with fu_ph.container():
+                                    show_followups(shown["followups"])
+                            elif part == "error":
+                                stream_error = True
+                                st.error(f"{_tr('query_failed')}: {res['error']}")
+                                break
+                    finally:
+                        finish_stream_timing(r)  # also after a break, before the generator is collected
+                        r.close()
+                    api_elapsed = time.perf_counter() - t_api_start
+                elif multi_doc:
+                    res = multi_res
+                    for failed in res.get("failed_documents") or []:
+                        st.warning(f"{_tr('query_failed')}: {failed}")
+                elif cached:
+                    res, cache_age = cached
+                else:
+                    res = r.json() or {}
+                # Also for cache hits: entries cached before normalization existed hold raw citations
+                if res.get("citations") is not cits_norm:
+                    res["citations"] = normalize_citations(res.get("citations"))
+                if not cached and not multi_doc and not stream_error:
+                    put_cached_answer(cache_key, target_doc_id, res)
+
                 total_elapsed = time.perf_counter() - t_total_start
-                m1, m2, m3 = st.columns([1,1,1])
-                with m1: st.caption(f'🎯 {_tr("meta_conf")}: {conf if isinstance(conf,(int,float)) else str(conf)}')
-                with m2: st.caption(f'🧠 {_tr("meta_model")}: {model}')
-                with m3: st.caption(f'⏱️ {_tr("meta_time")}: {_fmt_secs(total_elapsed)}')
-                #with m3: st.caption(f'🌐 Language hint: {st.session_state.lang_code.upper()}')
-
-                # Verification & citations
-                show_verification(res.get("verification"))
-                show_citations(res.get("citations"))
-
-                # Follow-ups (clickable) — this block stays as-is; see tweak below
-                f = res.get("followups") or {}
-                clarify = f.get("clarify") or []
-                deepen  = f.get("deepen") or []
-                if clarify or deepen:
-                    st.subheader(_tr("h_fu"))
-
-                    col_c, col_d = st.columns(2, gap="large")
-
-                    with col_c:
-                        st.markdown('<div class="fu-card"><div class="fu-title">🧼 '+_tr("fu_clarify")+'</div>', unsafe_allow_html=True)
-                        if clarify:
-                            for i, q2 in enumerate(clarify, 1):
-                                if st.button(
-                                    q2,
-                                    key=f"clarify_{i}_{abs(hash(q2))}",
-                                    use_container_width=True,
-                                    on_click=_choose_followup,
-                                    args=(q2,),
-                                    ):
-                                    st.session_state.followup_q = q2   # triggers auto-run on next render
-                                    st.session_state.q_text = q2
-                                    st.rerun()
-                        else:
-                            st.markdown('<div class="fu-empty">'+_tr("fu_none_c")+'</div>', unsafe_allow_html=True)
-                        st.markdown('</div>', unsafe_allow_html=True)
-
-                    with col_d:
-                        st.markdown('<div class="fu-card"><div class="fu-title">🧠 '+_tr("fu_deepen")+'</div>', unsafe_allow_html=True)
-                        if deepen:
-                            for i, q2 in enumerate(deepen, 1):
-                                if st.button(
-                                    q2,
-                                    key=f"deepen_{i}_{abs(hash(q2))}",
-                                    use_container_width=True,
-                                    on_click=_choose_followup,
-                                    args=(q2,),
-                                    ):
-                                    st.session_state.followup_q = q2   # triggers auto-run on next render
-                                    st.session_state.q_text = q2
-                                    st.rerun()
-                        else:
-                            st.markdown('<div class="fu-empty">'+_tr("fu_none_d")+'</div>', unsafe_allow_html=True)
-                        st.markdown('</div>', unsafe_allow_html=True)
-
-                # Session history
-                st.session_state.history.append({
-                    "q": q,
-                    "res": res,
-                    "ts": time.time(),
-                    "total_s": total_elapsed,
-                    "api_s": api_elapsed,
-                    })
+                answer_ph.write(res.get("answer", ""))
+                if ttft_elapsed is None:
+                    ttft_elapsed = time.perf_counter() - t_total_start
+                with meta_ph.container():
+                    show_answer_meta(res, total_elapsed, cache_age)
+                    if DEBUG_HTTP_TIMING and r is not None:
+                        show_http_timing(getattr(r, "timing", None))
+
+                # Verification & citations: whatever streaming did not draw, or a final event replaced
+                for part, ph, show in (("verification", verif_ph, show_verification),
+                                       ("citations", cits_ph, show_citations)):
+                    if part not in shown or shown[part] is not res.get(part):
+                        with ph.container():
+                            show(res.get(part))
+
+                # Follow-ups (clickable; drawn once, their buttons have fixed keys)
+                if "followups" not in shown:
+                    with fu_ph.container():
+                        show_followups(res.get("followups"))
+
+                # Session history: only what the history view shows (not a failed stream)
+                if not stream_error:
+                    st.session_state.history.add(q, res, total_elapsed, ttft_elapsed, api_elapsed)
 
         except Exception as e:
             # Make sure the loaders are gone even on error
@@ -878,24 +821,61 @@ if can_show_qna:
             status_ph.empty()
             st.error(f"Something went wrong: {type(e).__name__}: {e}")
 
+    # Nested here, not a sibling: the entry just added shows without a full rerun
+    # (which would wipe the answer above); paging it still reruns only the history.
+    history_region()
+
+# ---- Batch mode: many questions against the same document
+@st.fragment
+def batch_region(uid: str, can_query_right: bool, target_doc_id: str):
+    do_verify    = st.session_state.get("opt_verify", True)
+    do_followups = st.session_state.get("opt_followups", True)
+    with st.expander(_tr("h_batch"), expanded=False):
+        b_text = st.text_area(_tr("batch_paste"), key="batch_text", height=140, disabled=not can_query_right)
+        b_csv  = st.file_uploader(_tr("batch_csv"), type="csv", key="batch_csv", disabled=not can_query_right)
+        b_conc = st.slider(_tr("batch_conc"), 1, BATCH_MAX_CONCURRENCY, min(4, BATCH_MAX_CONCURRENCY), key="batch_conc")
+        b_questions = parse_questions(b_text, b_csv.getvalue() if b_csv else None)
+        st.caption(_tr("batch_count", n=len(b_questions)))
+        table_ph = st.empty()
+
+        if st.button(_tr("btn_batch"), disabled=(not can_query_right or not b_questions)):
+            base_payload = {
+                "doc_id": target_doc_id,
+                "do_verify": do_verify,
+                "do_followups": do_followups,
+                "lang_hint": st.session_state.lang_code,
+                "context_id": st.session_state.context_id,
+            }
+            api_key = (os.getenv("UI_ADMIN_API_KEY") or os.getenv("ADMIN_API_KEY") or "").strip()
+            headers = {"X-User-Id": uid}
+            if api_key:
+                headers["X-API-Key"] = api_key
+
+            rows = []
+            prog = st.progress(0.0)
+            last_draw = 0.0
+            for row in run_batch(b_questions, base_payload, uid, headers, concurrency=b_conc):
+                rows.append(row)
+                prog.progress(len(rows) / len(b_questions), text=f"{len(rows)}/{len(b_questions)}")
+                # Redraw the table at most a few times per second
+                if time.perf_counter() - last_draw > 0.5 or len(rows) == len(b_questions):
+                    last_draw = time.perf_counter()
+                    table_ph.dataframe(sorted(rows, key=lambda r: r["#"]), column_order=BATCH_COLUMNS,
+                                       use_container_width=True, hide_index=True)
+            prog.empty()
+            st.session_state.batch_rows = rows
+        elif st.session_state.get("batch_rows"):
+            table_ph.dataframe(sorted(st.session_state.batch_rows, key=lambda r: r["#"]), column_order=BATCH_COLUMNS,
+                               use_container_width=True, hide_index=True)
+
+        if st.session_state.get("batch_rows"):
+            st.download_button(_tr("batch_download"), data=rows_to_csv(st.session_state.batch_rows),
+                               file_name="batch_answers.csv", mime="text/csv")
+
+
+if can_show_qna:
+    qna_region(uid, can_query_right, doc_names, target_ids)
+    batch_region(uid, can_query_right, target_ids[0])
+else:
+    history_region()
 
-# ==================== HISTORY ====================
-if st.session_state.get("history"):
-    st.header(_tr("h_history"))
-    total_count = len(st.session_state.history)
-    for idx, item in enumerate(reversed(st.session_state.history), start=1):
-        q = item["q"]; res = item["res"]
-        with st.expander(f"Q{total_count - idx + 1}: {q[:80]}…"):
-            st.write(res.get("answer", ""))
-            conf  = res.get("confidence_score", 0)
-            model = res.get("model") or res.get("model_used") or "unknown"
-
-            total_s = item.get("total_s")
-            api_s   = item.get("api_s")
-
-            st.caption(
-                f'🎯 {conf if isinstance(conf,(int,float)) else str(conf)} • '
-                f'🧠 {model} • '
-                f'⏱️ {_fmt_secs(total_s) if total_s is not None else "—"} '
-                #f'• 🔌 {_fmt_secs(api_s) if api_s is not None else "—"}'
-            )
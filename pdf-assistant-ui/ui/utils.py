@@ -1,28 +1,155 @@
-import os, time, requests, streamlit as st
+import os, time, json, base64, threading, requests, streamlit as st
 from dotenv import load_dotenv; load_dotenv()
 
 API_BASE = os.getenv("API_BASE_URL","http://localhost:8000")
 
-def _ensure_id_token() -> str:
-    """Return a valid (fresh) ID token; refresh if close to expiry."""
+# ==================== Config ====================
+TOKEN_REFRESH_AHEAD_S = float(os.getenv("UI_TOKEN_REFRESH_AHEAD", "300"))   # background refresh this long before exp
+TOKEN_MIN_VALID_S     = float(os.getenv("UI_TOKEN_MIN_VALID", "60"))        # refresh inline below this
+TOKEN_IDLE_S          = float(os.getenv("UI_TOKEN_IDLE", "3600"))           # stop background refresh for idle sessions
+TOKEN_MIN_DELAY_S     = float(os.getenv("UI_TOKEN_MIN_DELAY", "30"))        # never re-arm the timer sooner than this
+TOKEN_DEFAULT_TTL_S   = 3600                                                # Firebase ID tokens, if exp is unreadable
+
+_AUTH = None
+
+def _auth():
+    """pyrebase auth from app.py, imported once instead of on every refresh."""
+    global _AUTH
+    if _AUTH is None:
+        from app import auth
+        _AUTH = auth
+    return _AUTH
+
+def _jwt_exp(token: str) -> float | None:
+    """`exp` claim of a JWT (not verified: only used to schedule the refresh)."""
+    try:
+        payload = token.split(".")[1]
+        claims = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+        return float(claims["exp"])
+    except (IndexError, KeyError, TypeError, ValueError):
+        return None
+
+
+class _TokenSlot:
+    """The tokens of one signed-in session, shared by its reruns.
+
+    Refreshes are single-flight: whoever holds the lock refreshes, everyone
+    who waited on it gets the new token. A timer refreshes ahead of `exp`
+    while the session keeps making requests.
+    """
+    def __init__(self, id_token: str, refresh_token: str, exp: float | None):
+        self._lock = threading.Lock()
+        self._timer_lock = threading.Lock()
+        self._timer: threading.Timer | None = None
+        self.id_token = id_token
+        self.refresh_token = refresh_token
+        self.exp = exp or time.time() + TOKEN_DEFAULT_TTL_S
+        self.last_used = time.time()
+        self.closed = False
+
+    def token(self) -> str:
+        """A token valid for at least TOKEN_MIN_VALID_S, refreshing inline only when the worker fell behind."""
+        self.last_used = time.time()
+        token = self.id_token
+        if time.time() > self.exp - TOKEN_MIN_VALID_S:
+            token = self.refresh(stale=token)
+        self._schedule()
+        return token
+
+    def refresh(self, stale: str | None = None) -> str:
+        """Replace `stale` with a new token; a no-op if another caller already did."""
+        with self._lock:
+            if stale is not None and self.id_token != stale:
+                return self.id_token
+            refreshed = _auth().refresh(self.refresh_token)
+            self.id_token = refreshed["idToken"]
+            self.refresh_token = refreshed.get("refreshToken") or self.refresh_token
+            self.exp = _jwt_exp(self.id_token) or time.time() + TOKEN_DEFAULT_TTL_S
+            return self.id_token
+
+    def _schedule(self) -> None:
+        """Arm the timer unless one is pending; a running timer may replace itself."""
+        with self._timer_lock:
+            pending = self._timer is not None and self._timer.is_alive()
+            if self.closed or (pending and self._timer is not threading.current_thread()):
+                return
+            remaining = self.exp - time.time()
+            # Short-lived token (or a clock ahead of the issuer): refresh halfway, not in a loop
+            lead = TOKEN_REFRESH_AHEAD_S if remaining > TOKEN_REFRESH_AHEAD_S else remaining / 2
+            delay = max(TOKEN_MIN_DELAY_S, remaining - lead)
+            # The token this timer replaces: if an inline refresh gets there first, it is a no-op
+            self._timer = threading.Timer(delay, self._background, args=(self.id_token,))
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _background(self, stale: str) -> None:
+        if not self.closed and time.time() - self.last_used <= TOKEN_IDLE_S:
+            try:
+                self.refresh(stale=stale)
+            except Exception:
+                pass  # leave it to the inline path, which surfaces the error
+            else:
+                self._schedule()
+                return
+        with self._timer_lock:
+            if self._timer is threading.current_thread():
+                self._timer = None  # idle, closed or failed: the next token() re-arms it
+
+    def close(self) -> None:
+        with self._timer_lock:
+            self.closed = True
+            if self._timer is not None:
+                self._timer.cancel()
+
+
+def _token_slot() -> _TokenSlot:
     if "id_token" not in st.session_state:
         raise RuntimeError("Not signed in")
-    if time.time() > st.session_state.get("id_token_exp", 0) - 60:
-        from app import auth  # pyrebase auth uit app.py
-        refreshed = auth.refresh(st.session_state["refresh_token"])
-        st.session_state["id_token"] = refreshed["idToken"]
-        st.session_state["id_token_exp"] = time.time() + 55*60
-    return st.session_state["id_token"]
+    slot = st.session_state.get("_id_token_slot")
+    # A sign-in writes a new id_token into session state; anything else came from this slot
+    if slot is None or st.session_state["id_token"] != st.session_state.get("_id_token_seen"):
+        if slot is not None:
+            slot.close()
+        token = st.session_state["id_token"]
+        slot = _TokenSlot(token, st.session_state["refresh_token"],
+                          _jwt_exp(token) or st.session_state.get("id_token_exp"))
+        st.session_state["_id_token_slot"] = slot
+    return slot
+
+def _publish(slot: _TokenSlot) -> None:
+    # keep the session-state keys other pages read in step with the slot
+    st.session_state["id_token"] = st.session_state["_id_token_seen"] = slot.id_token
+    st.session_state["refresh_token"] = slot.refresh_token
+    st.session_state["id_token_exp"] = slot.exp
+
+def _ensure_id_token() -> str:
+    """Return a valid (fresh) ID token; refresh if close to expiry."""
+    slot = _token_slot()
+    token = slot.token()
+    _publish(slot)
+    return token
 
 def api_request(method: str, path: str, **kwargs) -> requests.Response:
-    """Requests wrapper that injects the Firebase ID token header."""
+    """Requests wrapper that injects the Firebase ID token header; retries once on 401 with a new token."""
     token = _ensure_id_token()
     headers = kwargs.pop("headers", {})
     headers["Authorization"] = f"Bearer {token}"
     url = f"{API_BASE}{path}"
     resp = requests.request(method, url, headers=headers, **kwargs)
+    if resp.status_code == 401:
+        # revoked or expired early: one retry, concurrent 401s share a single refresh
+        slot = _token_slot()
+        try:
+            headers["Authorization"] = f"Bearer {slot.refresh(stale=token)}"
+            _publish(slot)
+            resp = requests.request(method, url, headers=headers, **kwargs)
+        except Exception:
+            pass
     if resp.status_code == 401:
         st.warning("Your session expired. Please sign in again.")
-        for k in ("id_token","refresh_token","id_token_exp","email"):
+        slot = st.session_state.get("_id_token_slot")
+        if slot is not None:
+            slot.close()
+        for k in ("id_token","refresh_token","id_token_exp","email","_id_token_slot","_id_token_seen"):
             st.session_state.pop(k, None)
     return resp
@@ -0,0 +1,13 @@
+"""WSGI entry point for serving the dashboard with several workers.
+
+Run from the repository root (the data paths are relative to it):
+
+    gunicorn -c pdf-assistant-ui/ui/gunicorn.conf.py
+
+With preload_app the dataset, cube and filter index are built once in the
+gunicorn master and shared copy-on-write by every forked worker. The
+sharing lasts until the CSV grows: each worker folds appended rows into
+its own copy of the frame (see append_rows), so memory per worker grows
+back towards one full frame after the first incremental refresh.
+"""
+from dashboard import server as application  # noqa: F401